@@ -0,0 +1,157 @@
+"""Server-side store of each session's agent outputs, so later stages can be run by session id."""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from disk_cache import SQLiteCache
+
+# Load environment variables
+load_dotenv()
+
+ARTIFACT_STORE_ENABLED = os.getenv("ARTIFACT_STORE_ENABLED", "true").lower() in ("1", "true", "yes")
+ARTIFACT_STORE_MAX_SESSIONS = int(os.getenv("ARTIFACT_STORE_MAX_SESSIONS", "200"))
+ARTIFACT_STORE_TTL = float(os.getenv("ARTIFACT_STORE_TTL", str(24 * 3600)))
+ARTIFACT_SPILL_ENABLED = os.getenv("ARTIFACT_SPILL_ENABLED", "true").lower() in ("1", "true", "yes")
+ARTIFACT_SPILL_PATH = os.getenv("ARTIFACT_SPILL_PATH", os.path.join("cache", "artifacts.sqlite3"))
+ARTIFACT_SPILL_MAX_ENTRIES = int(os.getenv("ARTIFACT_SPILL_MAX_ENTRIES", "5000"))
+
+# Stages whose outputs are stored
+MARKET_ANALYSIS = "market_analysis"
+PRODUCT_ROADMAP = "product_roadmap"
+TECHNICAL_BLUEPRINT = "technical_blueprint"
+
+
+def _session_key(user_id: str, session_id: str) -> str:
+    return json.dumps([user_id, session_id])
+
+
+class SessionArtifactStore:
+    """
+    Keeps the output of every agent stage per user_id and session_id.
+
+    Sessions are owned by the user that wrote them: the user is part of every key, so a lookup
+    with another user's id never sees them, however the session id was obtained.
+
+    The most recently used sessions are held in memory as plain dicts, so handing a stored
+    report to the next agent costs no JSON parsing at all. When more than `max_sessions` are held
+    the least recently used session is spilled to `spill` (a `SQLiteCache`) if one is given,
+    and dropped otherwise; a spilled session is moved back into memory on its next lookup.
+    Sessions expire `ttl` seconds after their last write.
+
+    Returned artifacts are shared with the store and must be treated as read-only. The store
+    lives in one process, so with several server workers a session is only found by the worker
+    that ran its earlier stages.
+    """
+
+    def __init__(self, max_sessions: int, ttl: float, spill: Optional[SQLiteCache] = None):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.spill = spill
+        self.hits = 0
+        self.spill_hits = 0
+        self.misses = 0
+        self.spilled = 0
+        self._sessions: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, user_id: str, session_id: str, stage: str, artifact: Dict[str, Any]):
+        """
+        Store the output of `stage` for a session, replacing any earlier output of that stage.
+
+        Args:
+            user_id (str): The user owning the session
+            session_id (str): The session the output belongs to
+            stage (str): MARKET_ANALYSIS, PRODUCT_ROADMAP or TECHNICAL_BLUEPRINT
+            artifact (dict): The stage output, without user_id and session_id
+        """
+        key = _session_key(user_id, session_id)
+        with self._lock:
+            artifacts = self._load(key)[0] or {}
+            artifacts[stage] = artifact
+            self._sessions[key] = (artifacts, time.time())
+            self._sessions.move_to_end(key)
+            self._evict()
+
+    def get(self, user_id: str, session_id: str, stage: str) -> Optional[Dict[str, Any]]:
+        """Return the stored output of `stage` for a session of `user_id`, or None if there is none"""
+        with self._lock:
+            artifacts, spilled = self._load(_session_key(user_id, session_id))
+            artifact = artifacts.get(stage) if artifacts else None
+            if artifact is None:
+                self.misses += 1
+            elif spilled:
+                self.spill_hits += 1
+            else:
+                self.hits += 1
+            return artifact
+
+    def get_all(self, user_id: str, session_id: str) -> Dict[str, Dict[str, Any]]:
+        """Return {stage: output} for every stored stage of a session of `user_id`"""
+        with self._lock:
+            return dict(self._load(_session_key(user_id, session_id))[0] or {})
+
+    def _load(self, key: str) -> Tuple[Optional[Dict[str, Dict[str, Any]]], bool]:
+        """Return (the session's artifacts or None, whether they came back from the spill); caller holds the lock"""
+        entry = self._sessions.get(key)
+        if entry is not None:
+            artifacts, written_at = entry
+            if time.time() - written_at <= self.ttl:
+                self._sessions.move_to_end(key)
+                return artifacts, False
+            del self._sessions[key]
+        if self.spill is None:
+            return None, False
+        # The spill keeps its own TTL, counted from when the session was spilled
+        artifacts = self.spill.get(key)
+        if artifacts is None:
+            return None, False
+        self.spill.delete(key)
+        self._sessions[key] = (artifacts, time.time())
+        self._evict()
+        return artifacts, True
+
+    def _evict(self):
+        """Spill or drop the least recently used sessions beyond `max_sessions`; caller holds the lock"""
+        while len(self._sessions) > self.max_sessions:
+            evicted_id, (evicted, written_at) = self._sessions.popitem(last=False)
+            if self.spill is not None and time.time() - written_at <= self.ttl:
+                self.spill.set(evicted_id, evicted)
+                self.spilled += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return sessions in memory, lookup counters and spill statistics"""
+        with self._lock:
+            lookups = self.hits + self.spill_hits + self.misses
+            return {
+                'sessions_in_memory': len(self._sessions),
+                'max_sessions': self.max_sessions,
+                'hits': self.hits,
+                'spill_hits': self.spill_hits,
+                'misses': self.misses,
+                'hit_ratio': (self.hits + self.spill_hits) / lookups if lookups else 0.0,
+                'spilled': self.spilled,
+                'spill': self.spill.stats() if self.spill is not None else None
+            }
+
+
+def create_artifact_store() -> Optional[SessionArtifactStore]:
+    """
+    Build the artifact store from the ARTIFACT_* settings.
+
+    Returns:
+        SessionArtifactStore: The configured store, or None if ARTIFACT_STORE_ENABLED is off
+    """
+    if not ARTIFACT_STORE_ENABLED:
+        return None
+    spill = SQLiteCache(ARTIFACT_SPILL_PATH, "session_artifacts", ARTIFACT_STORE_TTL,
+                        ARTIFACT_SPILL_MAX_ENTRIES) if ARTIFACT_SPILL_ENABLED else None
+    return SessionArtifactStore(ARTIFACT_STORE_MAX_SESSIONS, ARTIFACT_STORE_TTL, spill)
+
+
+# Shared by every request in the process
+artifact_store = create_artifact_store()
@@ -0,0 +1,320 @@
+"""
+Run the full agent pipeline (market analysis -> product roadmap -> technical blueprint) over a
+file of startup ideas.
+
+Ideas are read from JSONL (one object per line with a `startup_idea` or `idea` field and an
+optional `id`) or CSV (a header row with the same column names). Each completed idea is appended
+to a JSONL file as it finishes; ideas that fail are reported but not written. Every completed stage
+is checkpointed in SQLite, so rerunning the same command after a crash or Ctrl-C skips finished
+ideas and resumes the others at the stage where they stopped; ideas that failed are retried. Each
+idea appears in the output once, however often the command is rerun.
+
+Usage:
+    python batch_runner.py ideas.jsonl -o results.jsonl
+    python batch_runner.py ideas.csv -o results.jsonl --parallelism 8
+    python batch_runner.py ideas.jsonl -o results.jsonl --mock    # offline, canned answers
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+BATCH_PARALLELISM = int(os.getenv("BATCH_PARALLELISM", "4"))
+
+# Pipeline stages in order; each one's result is checkpointed under its name
+MARKET_ANALYSIS = "market_analysis"
+PRODUCT_ROADMAP = "product_roadmap"
+TECHNICAL_BLUEPRINT = "technical_blueprint"
+STAGES = (MARKET_ANALYSIS, PRODUCT_ROADMAP, TECHNICAL_BLUEPRINT)
+# Recorded once an idea's result line has been written to the output file
+WRITTEN = "written"
+
+IDEA_FIELDS = ("startup_idea", "idea")
+
+
+def idea_id(startup_idea: str) -> str:
+    """Stable id for an idea without one, so reruns of the same file find its checkpoints"""
+    normalized = " ".join(startup_idea.lower().split())
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()[:16]
+
+
+def _idea_record(row: Dict[str, Any], source: str) -> Dict[str, str]:
+    startup_idea = next((row[field] for field in IDEA_FIELDS if row.get(field)), None)
+    if not startup_idea or not str(startup_idea).strip():
+        raise ValueError(f"{source}: expected a non-empty 'startup_idea' or 'idea' field")
+    startup_idea = str(startup_idea).strip()
+    return {'id': str(row.get('id') or idea_id(startup_idea)), 'startup_idea': startup_idea}
+
+
+def read_ideas(path: str, input_format: Optional[str] = None) -> Iterator[Dict[str, str]]:
+    """
+    Read ideas from a JSONL or CSV file.
+
+    Args:
+        path (str): Input file
+        input_format (str): "jsonl" or "csv"; guessed from the file extension if None
+
+    Returns:
+        Iterator of {'id', 'startup_idea'} dicts in file order
+    """
+    input_format = input_format or ("csv" if path.lower().endswith(".csv") else "jsonl")
+    with open(path, newline='', encoding='utf-8') as f:
+        if input_format == "csv":
+            for line_number, row in enumerate(csv.DictReader(f), start=2):
+                yield _idea_record(row, f"{path}:{line_number}")
+        elif input_format == "jsonl":
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                # A line may also be a bare JSON string
+                yield _idea_record(row if isinstance(row, dict) else {'startup_idea': row}, f"{path}:{line_number}")
+        else:
+            raise ValueError(f"Unknown input format '{input_format}', expected 'jsonl' or 'csv'")
+
+
+class CheckpointStore:
+    """Per-idea, per-stage results in SQLite, shared by the worker threads."""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoints ("
+            "idea_id TEXT NOT NULL, stage TEXT NOT NULL, data TEXT NOT NULL, updated_at TEXT NOT NULL, "
+            "PRIMARY KEY (idea_id, stage))"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def load(self, idea_id: str) -> Dict[str, Any]:
+        """Return {stage: result} for the stages of an idea that already finished"""
+        with self._lock:
+            rows = self._conn.execute("SELECT stage, data FROM checkpoints WHERE idea_id = ?", (idea_id,)).fetchall()
+        return {stage: json.loads(data) for stage, data in rows}
+
+    def save(self, idea_id: str, stage: str, data: Any):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (idea_id, stage, data, updated_at) VALUES (?, ?, ?, ?)",
+                (idea_id, stage, json.dumps(data, default=str), datetime.now().isoformat())
+            )
+            self._conn.commit()
+
+    def written_ids(self) -> set:
+        """Ids of ideas whose result is already in the output file"""
+        with self._lock:
+            rows = self._conn.execute("SELECT idea_id FROM checkpoints WHERE stage = ?", (WRITTEN,)).fetchall()
+        return {row[0] for row in rows}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def process_idea(item: Dict[str, str], checkpoints: CheckpointStore) -> Dict[str, Any]:
+    """
+    Run the pipeline stages an idea has not finished yet, checkpointing each one.
+
+    Agents run with BATCH priority, so in a process that also serves interactive requests
+    their OpenAI calls queue behind the interactive ones.
+
+    Args:
+        item (dict): {'id', 'startup_idea'} as produced by `read_ideas`
+        checkpoints (CheckpointStore): Where finished stages are loaded from and saved to
+
+    Returns:
+        dict: The output line: id, startup_idea, status, error, the three stage results,
+              resumed_stages and elapsed_seconds
+    """
+    # Imported here so --mock can redirect the caches before the agent modules read their settings
+    from llm_scheduler import BATCH
+    from market_agent import EnhancedMarketAnalysisReport, EnhancedMarketResearchAgent
+    from product_manager import run_product_planning, ProductRoadmap
+    from tech_architect_updated import TechnicalArchitectAgent
+
+    start = time.perf_counter()
+    results = checkpoints.load(item['id'])
+    resumed_stages = [stage for stage in STAGES if stage in results]
+    error = None
+    try:
+        if MARKET_ANALYSIS not in results:
+            # A placeholder report built from the raw search data would be checkpointed as if it were
+            # the analysis, so a failed AI analysis fails the idea instead
+            report = EnhancedMarketResearchAgent(priority=BATCH).run_enhanced_market_analysis(
+                item['startup_idea'], allow_fallback=False)
+            results[MARKET_ANALYSIS] = report.model_dump()
+            checkpoints.save(item['id'], MARKET_ANALYSIS, results[MARKET_ANALYSIS])
+
+        if PRODUCT_ROADMAP not in results:
+            market_report = EnhancedMarketAnalysisReport(**results[MARKET_ANALYSIS])
+            roadmap = run_product_planning(market_report, priority=BATCH)
+            if not roadmap:
+                raise RuntimeError("Failed to generate product roadmap")
+            results[PRODUCT_ROADMAP] = roadmap.model_dump()
+            checkpoints.save(item['id'], PRODUCT_ROADMAP, results[PRODUCT_ROADMAP])
+
+        if TECHNICAL_BLUEPRINT not in results:
+            product_roadmap = ProductRoadmap(**results[PRODUCT_ROADMAP])
+            blueprint = TechnicalArchitectAgent(priority=BATCH).generate_technical_blueprint(product_roadmap)
+            results[TECHNICAL_BLUEPRINT] = blueprint.model_dump()
+            checkpoints.save(item['id'], TECHNICAL_BLUEPRINT, results[TECHNICAL_BLUEPRINT])
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+
+    return {
+        'id': item['id'],
+        'startup_idea': item['startup_idea'],
+        'status': "failed" if error else "completed",
+        'error': error,
+        **{stage: results.get(stage) for stage in STAGES},
+        'resumed_stages': resumed_stages,
+        'elapsed_seconds': round(time.perf_counter() - start, 3)
+    }
+
+
+def _written_output_ids(output_path: str) -> set:
+    """
+    Ids of the ideas already in the output file.
+
+    Covers a crash between writing a line and checkpointing it. A last line cut off by the crash
+    is removed, so the next line starts on a line of its own.
+    """
+    if not os.path.exists(output_path):
+        return set()
+    ids = set()
+    with open(output_path, "rb+") as output:
+        end = 0
+        for line in output:
+            if not line.endswith(b"\n"):
+                output.truncate(end)
+                break
+            end += len(line)
+            try:
+                ids.add(json.loads(line)['id'])
+            except (ValueError, KeyError, TypeError):
+                continue
+    return ids
+
+
+def run_batch(input_path: str, output_path: str, checkpoint_path: Optional[str] = None,
+              parallelism: int = BATCH_PARALLELISM, input_format: Optional[str] = None) -> Dict[str, int]:
+    """
+    Process every idea in `input_path` and append one JSON line per completed idea to `output_path`.
+
+    At most `parallelism` ideas run at once, and ideas are read from the input only as workers
+    free up, so arbitrarily large files stream through. Lines are written (and flushed) in
+    completion order; an idea is marked as written only after its line is on disk. Failed ideas
+    are not written, so the next run retries them without leaving a line behind.
+
+    Args:
+        input_path (str): JSONL or CSV file of ideas
+        output_path (str): JSONL results file, appended to
+        checkpoint_path (str): SQLite checkpoint file (defaults to `<output_path>.checkpoints.sqlite3`)
+        parallelism (int): Ideas processed concurrently
+        input_format (str): "jsonl" or "csv"; guessed from the extension if None
+
+    Returns:
+        dict: Counts of completed, failed and skipped (already written or duplicate) ideas
+    """
+    checkpoints = CheckpointStore(checkpoint_path or f"{output_path}.checkpoints.sqlite3")
+    seen = checkpoints.written_ids() | _written_output_ids(output_path)
+    summary = {'completed': 0, 'failed': 0, 'skipped': 0}
+    ideas = read_ideas(input_path, input_format)
+    start = time.perf_counter()
+
+    executor = ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix="batch")
+    pending = {}
+
+    def submit_next() -> bool:
+        for item in ideas:
+            if item['id'] in seen:
+                summary['skipped'] += 1
+                continue
+            seen.add(item['id'])
+            pending[executor.submit(process_idea, item, checkpoints)] = item
+            return True
+        return False
+
+    try:
+        with open(output_path, "a", encoding="utf-8") as output:
+            while len(pending) < parallelism and submit_next():
+                pass
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item = pending.pop(future)
+                    result = future.result()
+                    summary[result['status']] += 1
+                    if result['status'] == "completed":
+                        output.write(json.dumps(result, default=str) + "\n")
+                        output.flush()
+                        os.fsync(output.fileno())
+                        checkpoints.save(item['id'], WRITTEN, True)
+                        print(f"✅ [{item['id']}] {item['startup_idea'][:60]} ({result['elapsed_seconds']:.1f}s)", flush=True)
+                    else:
+                        print(f"❌ [{item['id']}] {item['startup_idea'][:60]}: {result['error']}", flush=True)
+                    submit_next()
+    except KeyboardInterrupt:
+        for future in pending:
+            future.cancel()
+        print("Interrupted; run the same command again to resume", flush=True)
+        raise
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        checkpoints.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"Batch finished in {elapsed:.1f}s: {summary['completed']} completed, "
+          f"{summary['failed']} failed, {summary['skipped']} skipped", flush=True)
+    return summary
+
+
+def _use_offline_services():
+    """Swap in the offline stubs and keep their canned answers out of the persistent caches"""
+    for setting in ("SEARCH_CACHE_ENABLED", "PAGE_CACHE_ENABLED", "IDEA_INDEX_ENABLED", "LLM_CACHE_ENABLED"):
+        os.environ[setting] = "false"
+    # The stubs have no search quota or OpenAI rate limits to respect
+    os.environ.setdefault("GOOGLE_SEARCH_QUERIES_PER_MINUTE", "60000")
+    os.environ.setdefault("GOOGLE_SEARCH_BURST", "1000")
+    os.environ.setdefault("LLM_REQUESTS_PER_MINUTE", "1000000")
+    os.environ.setdefault("LLM_TOKENS_PER_MINUTE", "1000000000")
+    from mock_services import install_mock_services
+    install_mock_services(float(os.getenv("MOCK_LATENCY", "0")))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run the agent pipeline over a JSONL or CSV file of startup ideas")
+    parser.add_argument("input", help="JSONL or CSV file with a startup_idea (or idea) field and an optional id")
+    parser.add_argument("-o", "--output", required=True, help="JSONL file results are appended to")
+    parser.add_argument("--checkpoints", help="SQLite checkpoint file (default: <output>.checkpoints.sqlite3)")
+    parser.add_argument("--parallelism", type=int, default=BATCH_PARALLELISM, help="Ideas processed at once")
+    parser.add_argument("--format", choices=("jsonl", "csv"), help="Input format (default: from the file extension)")
+    parser.add_argument("--mock", action="store_true",
+                        help="Answer searches, page fetches and OpenAI calls with offline stubs (see mock_services.py)")
+    args = parser.parse_args(argv)
+
+    if args.mock:
+        _use_offline_services()
+    summary = run_batch(args.input, args.output, args.checkpoints, args.parallelism, args.format)
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,362 @@
+"""
+Micro-benchmarks for the backend's hot paths.
+
+Usage:
+    python benchmarks.py                # run every benchmark
+    python benchmarks.py html_extraction
+"""
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+# The agents build OpenAI clients at construction time; benchmarks never call the API
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+
+def _measure(function, *args, repeat: int = 3):
+    """Return (best wall time in seconds, peak traced memory in bytes, result) for function(*args)"""
+    best_time = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        elapsed = time.perf_counter() - start
+        best_time = elapsed if best_time is None else min(best_time, elapsed)
+    tracemalloc.start()
+    function(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best_time, peak, result
+
+
+def _report(label: str, seconds: float, peak_bytes: int = None):
+    line = f"  {label:<28} {seconds * 1000:9.1f} ms"
+    if peak_bytes is not None:
+        line += f"   peak {peak_bytes / (1024 * 1024):8.1f} MiB"
+    print(line, flush=True)
+
+
+def _synthetic_competitor_page(sections: int) -> str:
+    """A large marketing page with navigation, pricing tables, feature lists and inline scripts"""
+    parts = [
+        "<!DOCTYPE html><html><head><title>Acme Fitness - AI Coaching</title>",
+        '<meta name="description" content="Personal AI fitness coaching for everyone">',
+        "<style>body { font-family: sans-serif; }</style></head><body>",
+        '<nav class="main-nav"><a href="/about">About</a><a href="https://twitter.com/acme">Twitter</a></nav>',
+    ]
+    for i in range(sections):
+        parts.append(f"""
+        <section class="hero section-{i}">
+          <h2>Features that help you train smarter #{i}</h2>
+          <p>Workouts adapt to your progress, schedule and equipment every single day.</p>
+          <ul class="feature-list">
+            <li>Adaptive training plans built by our coaching engine</li>
+            <li>Real-time form feedback using your phone camera</li>
+            <li>Nutrition tracking with <b>automatic</b> macro suggestions</li>
+          </ul>
+          <div class="pricing-card plan-{i}"><h3>Pro</h3><span>$19.99/month</span> billed yearly, free trial included</div>
+          <div class="about-company"><p>Founded in 2016, our team of coaches and engineers is on a mission.</p></div>
+          <a href="https://www.linkedin.com/company/acme-{i}">LinkedIn</a>
+          <script>window.dataLayer = window.dataLayer || []; dataLayer.push({{"section": {i}}});</script>
+          <!-- tracking pixel {i} -->
+        </section>""")
+    parts.append('<footer class="site-footer"><a href="https://facebook.com/acme">Facebook</a></footer></body></html>')
+    return "".join(parts)
+
+
+def benchmark_html_extraction():
+    """Compare the BeautifulSoup tree extractors with the single-pass streaming extractor"""
+    from market_agent import EnhancedMarketResearchAgent
+
+    agent = EnhancedMarketResearchAgent()
+    print("HTML extraction (BeautifulSoup tree vs single-pass extractor)", flush=True)
+    for sections in (50, 500, 3000):
+        html = _synthetic_competitor_page(sections)
+        print(f" page size {len(html) / 1024:,.0f} KiB", flush=True)
+        soup_time, soup_peak, soup_result = _measure(agent._parse_page_with_soup, html, "https://acme.example")
+        stream_time, stream_peak, stream_result = _measure(agent._parse_page, html, "https://acme.example")
+        assert soup_result == stream_result, "extractors disagree"
+        _report("BeautifulSoup + find_all", soup_time, soup_peak)
+        _report("single-pass extractor", stream_time, stream_peak)
+        print(f"  speedup {soup_time / stream_time:.1f}x, memory {soup_peak / stream_peak:.1f}x lower", flush=True)
+
+
+def _sample_market_report(startup_idea: str = "AI-powered fitness app that creates personalized workout plans"):
+    """A realistic EnhancedMarketAnalysisReport, shaped like the fallback report the agent builds"""
+    from market_agent import (EnhancedMarketAnalysisReport, CompetitorInfo, MarketSizing, MarketTrends,
+                              OpportunityAnalysis, RiskAnalysis)
+
+    sentence = "Consumers increasingly expect personalised, data-driven coaching that adapts to their goals."
+    return EnhancedMarketAnalysisReport(
+        startup_idea=startup_idea,
+        analysis_date="2025-06-10 12:34:56",
+        executive_summary=" ".join([sentence] * 8),
+        market_sizing=MarketSizing(
+            total_addressable_market="$96.7B global fitness app market by 2030",
+            serviceable_addressable_market="$12.4B AI-assisted training segment",
+            serviceable_obtainable_market="$310M within five years",
+            market_growth_rate="17.6% CAGR",
+            geographic_distribution={"North America": "38%", "Europe": "27%", "Asia Pacific": "24%", "Rest of World": "11%"}
+        ),
+        market_trends=MarketTrends(
+            emerging_trends=[sentence] * 6,
+            technology_trends=[sentence] * 6,
+            consumer_behavior=[sentence] * 6,
+            regulatory_factors=[sentence] * 4
+        ),
+        competitors=[CompetitorInfo(
+            name=f"Competitor {i}",
+            website=f"https://competitor{i}.example.com",
+            description=" ".join([sentence] * 3),
+            features=[f"Feature {j}: {sentence}" for j in range(8)],
+            pricing_model="Freemium with subscription",
+            pricing_details="$9.99/month or $79.99/year",
+            target_audience="Fitness beginners and busy professionals",
+            strengths=[sentence] * 4,
+            weaknesses=[sentence] * 4,
+            competitive_score=7.5 - i * 0.5,
+            market_share="12%",
+            funding_info="Series B, $45M",
+            founded_year="2016",
+            team_size="120-200",
+            social_presence={"twitter": "120k followers", "instagram": "450k followers"},
+            user_reviews={"score": 4.6, "sentiment": "Positive overall, complaints about pricing"}
+        ) for i in range(5)],
+        competitive_landscape_summary=" ".join([sentence] * 5),
+        market_leaders=["Competitor 0", "Competitor 1", "Competitor 2"],
+        opportunity_analysis=OpportunityAnalysis(
+            market_gaps=[sentence] * 5,
+            underserved_segments=[sentence] * 4,
+            differentiation_opportunities=[sentence] * 5,
+            barrier_to_entry={"technology": sentence, "market": sentence, "capital": sentence},
+            success_factors=[sentence] * 5
+        ),
+        opportunity_score=7.8,
+        risk_analysis=RiskAnalysis(
+            market_risks=[sentence] * 4,
+            competitive_risks=[sentence] * 4,
+            technology_risks=[sentence] * 4,
+            regulatory_risks=[sentence] * 3,
+            mitigation_strategies=[sentence] * 5
+        ),
+        target_audience_segments=[{"name": f"Segment {i}", "description": sentence, "size": "4.2M"} for i in range(4)],
+        go_to_market_insights=[sentence] * 5,
+        strategic_recommendations=[sentence] * 6,
+        next_steps=[sentence] * 5
+    )
+
+
+def _sample_technical_blueprint(startup_idea: str = "AI-powered fitness app that creates personalized workout plans"):
+    """A realistic TechnicalBlueprint with the section sizes the architect typically produces"""
+    from tech_architect_updated import (TechnicalBlueprint, TechStackComponent, DatabaseSchema, APIEndpoint,
+                                        DeploymentStrategy, SecurityConsiderations)
+
+    sentence = "Chosen for its mature ecosystem, strong typing support and predictable operational costs."
+    component = lambda name: TechStackComponent(
+        name=name, version="1.x", justification=" ".join([sentence] * 2), alternatives_considered=["Option A", "Option B"],
+        learning_curve="Medium", community_support="Large and active community", documentation_quality="Excellent"
+    )
+    tables = [f"table_{i}" for i in range(12)]
+    return TechnicalBlueprint(
+        startup_idea=startup_idea,
+        tech_stack={category: [component(f"{category} tool {i}") for i in range(3)]
+                    for category in ("Frontend", "Backend", "Database", "DevOps", "Testing")},
+        database_schema=[DatabaseSchema(
+            name=table, type="table",
+            fields=[{"name": f"field_{j}", "type": "text", "nullable": j % 2 == 0, "description": sentence} for j in range(8)],
+            relationships=[{"table": tables[i - 1], "type": "many-to-one"}] if i else [],
+            indexes=["created_at", "user_id"], constraints=["primary key (id)"], description=sentence
+        ) for i, table in enumerate(tables)],
+        api_endpoints=[APIEndpoint(
+            path=f"/api/{tables[i % 12]}/{{id}}", method=("GET", "POST", "PUT", "DELETE")[i % 4], description=sentence,
+            request_body={"name": "string", "settings": {"goal": "string", "days": "integer"}} if i % 4 else None,
+            response_structure={"id": "uuid", "name": "string", "created_at": "timestamp"},
+            auth_required=True, related_features=["Personalised Plans", "Progress Tracking"]
+        ) for i in range(30)],
+        deployment_strategy=DeploymentStrategy(
+            recommended_approach=sentence, infrastructure=sentence,
+            ci_cd_pipeline={"build": sentence, "test": sentence, "deploy": sentence},
+            scaling_strategy=sentence, estimated_costs="$300-$900/month", monitoring_tools=["Datadog", "Sentry"],
+            backup_strategy=sentence
+        ),
+        security_considerations=SecurityConsiderations(
+            authentication_method="JWT with refresh tokens", authorization_approach="Role-based access control",
+            data_encryption={"at_rest": "AES-256", "in_transit": "TLS 1.3"},
+            security_best_practices=[sentence] * 6, compliance_considerations=["GDPR", "CCPA"],
+            security_testing=[sentence] * 4
+        ),
+        third_party_services={category: [{"name": f"{category} service {i}", "description": sentence,
+                                          "pricing_tier": "Freemium", "integration_complexity": "Low"} for i in range(3)]
+                              for category in ("Authentication", "Payment", "Analytics", "Email")},
+        development_tools=[{"name": f"Tool {i}", "category": "Productivity", "description": sentence, "pricing": "Free"}
+                           for i in range(8)],
+        implementation_roadmap=[{"name": f"Phase {i}", "description": sentence, "duration": 2 + i,
+                                 "features": ["Personalised Plans"], "technical_deliverables": [sentence] * 3}
+                                for i in range(5)],
+        architecture_diagram="flowchart TB\n" + "\n".join(f"    UI --> S{i}[Service {i}] --> DB" for i in range(12))
+    )
+
+
+def benchmark_output_encoding():
+    """Compare stored size and encode/decode time of the agent output encodings (see output_codec)"""
+    import output_codec
+    from output_codec import canonical_json, decode_output, encode_output
+
+    samples = {
+        "market report": _sample_market_report().model_dump(),
+        "technical blueprint": _sample_technical_blueprint().model_dump()
+    }
+    encodings = ["json", "gzip"] + (["zstd"] if output_codec.zstandard is not None else [])
+    print("Agent output storage encodings", flush=True)
+    for label, document in samples.items():
+        plain_size = len(canonical_json(document))
+        print(f" {label}: {plain_size / 1024:,.1f} KiB as JSON", flush=True)
+        for encoding in encodings:
+            encode_time, _, encoded = _measure(encode_output, document, encoding, repeat=20)
+            decode_time, _, decoded = _measure(decode_output, encoded, repeat=20)
+            assert decoded == document, f"{encoding} round trip changed the document"
+            size = len(canonical_json(encoded))
+            print(f"  {encoding:<5} {size / 1024:8.1f} KiB ({size / plain_size:4.0%})"
+                  f"   encode {encode_time * 1000:6.2f} ms   decode {decode_time * 1000:6.2f} ms", flush=True)
+
+
+def benchmark_json_responses():
+    """Compare FastAPI's default response encoding with model_dump_json and the FastJSONResponse path"""
+    from fastapi.encoders import jsonable_encoder
+    from starlette.responses import JSONResponse
+
+    import json_response
+    from json_response import FastJSONResponse
+
+    ids = {"user_id": "user_123", "session_id": "session_456"}
+    samples = {
+        "market report": _sample_market_report(),
+        "technical blueprint": _sample_technical_blueprint()
+    }
+    fast_label = "FastJSONResponse (orjson)" if json_response.orjson is not None else "FastJSONResponse (json)"
+    print("Agent response serialization", flush=True)
+    for label, model in samples.items():
+        # What the endpoints used to do: dump, spread, jsonable_encoder, stdlib json
+        default_time, default_peak, default_body = _measure(
+            lambda: JSONResponse(jsonable_encoder({**model.dict(), **ids})).body, repeat=20)
+        dump_json_time, dump_json_peak, _ = _measure(lambda: model.model_dump_json().encode("utf-8"), repeat=20)
+        fast_time, fast_peak, fast_body = _measure(
+            lambda: FastJSONResponse({**model.dict(), **ids}).body, repeat=20)
+        assert json.loads(fast_body) == json.loads(default_body), "serializers disagree"
+        print(f" {label}: {len(default_body) / 1024:,.1f} KiB", flush=True)
+        _report("jsonable_encoder + json", default_time, default_peak)
+        _report("model_dump_json (no ids)", dump_json_time, dump_json_peak)
+        _report(fast_label, fast_time, fast_peak)
+        print(f"  speedup {default_time / fast_time:.1f}x", flush=True)
+
+
+def _offline_database():
+    """Keep benchmark runs out of the real Supabase project"""
+    from mock_services import MockSupabaseClient
+    from supabase_client import set_supabase_client
+
+    set_supabase_client(MockSupabaseClient())
+
+
+def benchmark_request_coalescing(requests_in_flight: int = 8, agent_seconds: float = 1.0):
+    """Fire identical concurrent /market-analyst requests (a double click, client retries) and count agent runs"""
+    import asyncio
+    import httpx
+    import main
+
+    report = _sample_market_report()
+    _offline_database()
+    runs = []
+
+    def slow_analysis(idea, progress_callback=None, stream_callback=None):
+        runs.append(idea)
+        time.sleep(agent_seconds)  # stands in for searches, scraping and the OpenAI call
+        return report
+
+    original = main.analyze_startup_market
+    main.analyze_startup_market = slow_analysis
+
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+            # The same idea with different spacing and case, each request in its own session
+            bodies = [{"startup_idea": report.startup_idea.upper() if i % 2 else f"  {report.startup_idea} ",
+                       "user_id": "bench", "session_id": f"coalesce-{i}"} for i in range(requests_in_flight)]
+            start = time.perf_counter()
+            responses = await asyncio.gather(*(client.post("/market-analyst", json=body) for body in bodies))
+            assert all(response.status_code == 200 for response in responses)
+            assert len({response.json()["session_id"] for response in responses}) == requests_in_flight
+            return time.perf_counter() - start
+
+    try:
+        total_time = asyncio.run(run())
+    finally:
+        main.analyze_startup_market = original
+
+    print(f"Request coalescing ({requests_in_flight} identical /market-analyst requests, "
+          f"{agent_seconds:.1f}s stub agent)", flush=True)
+    _report("all requests completed", total_time)
+    print(f"  agent runs: {len(runs)} of {requests_in_flight} requests", flush=True)
+
+
+def benchmark_endpoint_concurrency(requests_in_flight: int = 8, agent_seconds: float = 1.0):
+    """Fire concurrent /market-analyst requests at the app with a slow stub agent and time /ping meanwhile"""
+    import asyncio
+    import httpx
+    import main
+
+    report = _sample_market_report()
+    _offline_database()
+
+    def slow_analysis(idea, progress_callback=None, stream_callback=None):
+        time.sleep(agent_seconds)  # stands in for searches, scraping and the OpenAI call
+        return report
+
+    original = main.analyze_startup_market
+    main.analyze_startup_market = slow_analysis
+
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+            # Distinct ideas, since identical requests in flight together are coalesced
+            bodies = [{"startup_idea": f"{report.startup_idea} #{i}", "user_id": "bench", "session_id": f"bench-{i}"}
+                      for i in range(requests_in_flight)]
+            start = time.perf_counter()
+            analyses = [asyncio.create_task(client.post("/market-analyst", json=body)) for body in bodies]
+            await asyncio.sleep(agent_seconds / 4)
+            ping_start = time.perf_counter()
+            await client.get("/ping")
+            ping_time = time.perf_counter() - ping_start
+            responses = await asyncio.gather(*analyses)
+            total_time = time.perf_counter() - start
+            assert all(response.status_code == 200 for response in responses)
+            return total_time, ping_time
+
+    try:
+        total_time, ping_time = asyncio.run(run())
+    finally:
+        main.analyze_startup_market = original
+
+    print(f"Endpoint concurrency ({requests_in_flight} x /market-analyst, {agent_seconds:.1f}s stub agent each)", flush=True)
+    _report("all requests completed", total_time)
+    _report("fully serial would take", requests_in_flight * agent_seconds)
+    _report("/ping while busy", ping_time)
+
+
+BENCHMARKS = {
+    "html_extraction": benchmark_html_extraction,
+    "endpoint_concurrency": benchmark_endpoint_concurrency,
+    "output_encoding": benchmark_output_encoding,
+    "json_responses": benchmark_json_responses,
+    "request_coalescing": benchmark_request_coalescing,
+}
+
+
+if __name__ == "__main__":
+    selected = sys.argv[1:] or list(BENCHMARKS)
+    for name in selected:
+        if name not in BENCHMARKS:
+            print(f"Unknown benchmark '{name}'. Available: {', '.join(BENCHMARKS)}")
+            sys.exit(1)
+        BENCHMARKS[name]()
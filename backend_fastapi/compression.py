@@ -0,0 +1,155 @@
+"""Response compression: brotli when the client accepts it and `brotli` is installed, gzip otherwise."""
+import os
+import zlib
+
+import anyio
+from dotenv import load_dotenv
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Load environment variables
+load_dotenv()
+
+RESPONSE_COMPRESSION_ENABLED = os.getenv("RESPONSE_COMPRESSION_ENABLED", "true").lower() in ("1", "true", "yes")
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
+RESPONSE_GZIP_LEVEL = int(os.getenv("RESPONSE_GZIP_LEVEL", "6"))
+RESPONSE_BROTLI_QUALITY = int(os.getenv("RESPONSE_BROTLI_QUALITY", "5"))
+
+# Bodies at least this large are compressed in a worker thread, off the event loop
+RESPONSE_COMPRESSION_THREAD_MIN_BYTES = 128 * 1024
+# Already compressed or streamed media is passed through
+EXCLUDED_CONTENT_TYPES = ("text/event-stream", "application/gzip", "application/zip", "image/", "audio/", "video/",
+                          "font/woff")
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def _accepts(accept_encoding: str, coding: str) -> bool:
+    """
+    Return True if an Accept-Encoding header allows `coding` (present with a q-value above 0).
+
+    A malformed q-value (e.g. `gzip;q=high`) counts as not accepted rather than failing the request.
+    """
+    for part in accept_encoding.split(","):
+        name, *params = part.split(";")
+        if name.strip().lower() != coding:
+            continue
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() != "q":
+                continue
+            try:
+                quality = float(value.strip())
+            except ValueError:
+                return False
+            return 0 < quality <= 1
+        return True
+    return False
+
+
+class _GzipCompressor:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, body: bytes, more_body: bool) -> bytes:
+        # Streamed chunks are flushed so the client can decode them as they arrive
+        return self._compressor.compress(body) + self._compressor.flush(zlib.Z_SYNC_FLUSH if more_body else zlib.Z_FINISH)
+
+
+class _BrotliCompressor:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, body: bytes, more_body: bool) -> bytes:
+        compressed = self._compressor.process(body)
+        return compressed + (self._compressor.flush() if more_body else self._compressor.finish())
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses of at least `minimum_size` bytes.
+
+    Clients that accept `br` get brotli if the `brotli` package is installed; other clients that
+    accept `gzip` get gzip. Server-sent event streams, media and already encoded responses are
+    passed through unchanged, and `Vary: Accept-Encoding` is added to compressed responses.
+
+    A plain ASGI middleware that only wraps `send`, so it relies on no Starlette internals.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = RESPONSE_COMPRESSION_MIN_BYTES,
+                 gzip_level: int = RESPONSE_GZIP_LEVEL, brotli_quality: int = RESPONSE_BROTLI_QUALITY):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = Headers(scope=scope).get("Accept-Encoding", "")
+        if brotli is not None and _accepts(accept_encoding, "br"):
+            coding, make_compressor = "br", lambda: _BrotliCompressor(self.brotli_quality)
+        elif _accepts(accept_encoding, "gzip"):
+            coding, make_compressor = "gzip", lambda: _GzipCompressor(self.gzip_level)
+        else:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Message = {}
+        passthrough = False
+        compressor = None
+
+        async def compress(body: bytes, more_body: bool) -> bytes:
+            if len(body) >= RESPONSE_COMPRESSION_THREAD_MIN_BYTES:
+                return await anyio.to_thread.run_sync(compressor.compress, body, more_body)
+            return compressor.compress(body, more_body)
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, passthrough, compressor
+            if message["type"] == "http.response.start":
+                # Held back until the first body chunk shows whether to compress
+                start_message = message
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "").partition(";")[0].strip().lower()
+                passthrough = ("content-encoding" in headers or message["status"] in (204, 206, 304)
+                               or content_type.startswith(EXCLUDED_CONTENT_TYPES))
+                if passthrough:
+                    await send(message)
+                return
+            if passthrough or message["type"] != "http.response.body":
+                if start_message and not passthrough:
+                    # e.g. http.response.pathsend: sent as is
+                    await send(start_message)
+                    start_message = {}
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+                compressor = make_compressor()
+                headers = MutableHeaders(raw=start_message["headers"])
+                headers["Content-Encoding"] = coding
+                headers.add_vary_header("Accept-Encoding")
+                body = await compress(body, more_body)
+                if more_body:
+                    del headers["Content-Length"]
+                else:
+                    headers["Content-Length"] = str(len(body))
+                await send(start_message)
+                start_message = {}
+            else:
+                body = await compress(body, more_body)
+            await send({**message, "body": body})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,262 @@
+"""Small key/value caches (SQLite-backed or in-memory) with TTL expiry and LRU size eviction."""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+
+class SQLiteCache:
+    """
+    Persistent JSON value cache stored in a single SQLite table.
+    
+    Entries expire `ttl` seconds after they are written and the least recently used entries are
+    evicted once the table holds more than `max_entries` rows. Hit and miss counters are kept in
+    memory for the lifetime of the process.
+    """
+    
+    def __init__(self, path: str, table: str, ttl: float, max_entries: int):
+        if not table.isidentifier():
+            raise ValueError(f"Invalid cache table name: {table}")
+        self.path = path
+        self.table = table
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self._lock = threading.Lock()
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_accessed_at ON {table} (accessed_at)")
+        self._conn.commit()
+    
+    def get_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up `key` without applying the TTL or touching the counters.
+        
+        Returns:
+            dict: {'value': ..., 'created_at': ..., 'expired': bool}, or None if absent
+        """
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, created_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        return {
+            'value': json.loads(row[0]),
+            'created_at': row[1],
+            'expired': time.time() - row[1] > self.ttl
+        }
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for `key`, or None if it is missing or expired"""
+        entry = self.get_entry(key)
+        if entry is None or entry['expired']:
+            self.record_miss()
+            return None
+        self.record_hit()
+        return entry['value']
+    
+    def record_hit(self):
+        """Count a lookup answered from the cache (for callers that use `get_entry` directly)"""
+        with self._lock:
+            self.hits += 1
+    
+    def record_miss(self):
+        """Count a lookup that had to go to the origin"""
+        with self._lock:
+            self.misses += 1
+    
+    def record_revalidation(self):
+        """Count a stale entry confirmed unchanged by the origin (e.g. an HTTP 304)"""
+        with self._lock:
+            self.revalidations += 1
+    
+    def set(self, key: str, value: Any):
+        """Store `value` (must be JSON serialisable) under `key` and evict old entries if needed"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now)
+            )
+            count = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    f"DELETE FROM {self.table} WHERE key IN "
+                    f"(SELECT key FROM {self.table} ORDER BY accessed_at ASC LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+            self._conn.commit()
+    
+    def touch(self, key: str):
+        """Reset the TTL of `key` as if it had just been written"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE {self.table} SET created_at = ?, accessed_at = ? WHERE key = ?", (now, now, key)
+            )
+            self._conn.commit()
+    
+    def keys(self) -> List[str]:
+        """Return the keys of all entries that have not expired"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT key FROM {self.table} WHERE created_at >= ?", (time.time() - self.ttl,)
+            ).fetchall()
+        return [row[0] for row in rows]
+    
+    def delete(self, key: str):
+        """Remove `key` from the cache"""
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            self._conn.commit()
+    
+    def clear(self):
+        """Remove every entry and reset the counters"""
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss/revalidation counters and the current number of entries"""
+        with self._lock:
+            size = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'revalidations': self.revalidations,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+            'size': size,
+            'max_entries': self.max_entries
+        }
+
+
+class MemoryCache:
+    """
+    In-process counterpart of `SQLiteCache` with the same interface.
+    
+    Values are stored as JSON text, so callers get a fresh copy on every lookup just as they do
+    from SQLite. Entries are lost when the process exits.
+    """
+    
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up `key` without applying the TTL or touching the counters.
+        
+        Returns:
+            dict: {'value': ..., 'created_at': ..., 'expired': bool}, or None if absent
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+        value, created_at = entry
+        return {
+            'value': json.loads(value),
+            'created_at': created_at,
+            'expired': time.time() - created_at > self.ttl
+        }
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for `key`, or None if it is missing or expired"""
+        entry = self.get_entry(key)
+        if entry is None or entry['expired']:
+            self.record_miss()
+            return None
+        self.record_hit()
+        return entry['value']
+    
+    def record_hit(self):
+        """Count a lookup answered from the cache (for callers that use `get_entry` directly)"""
+        with self._lock:
+            self.hits += 1
+    
+    def record_miss(self):
+        """Count a lookup that had to go to the origin"""
+        with self._lock:
+            self.misses += 1
+    
+    def record_revalidation(self):
+        """Count a stale entry confirmed unchanged by the origin (e.g. an HTTP 304)"""
+        with self._lock:
+            self.revalidations += 1
+    
+    def set(self, key: str, value: Any):
+        """Store `value` (must be JSON serialisable) under `key` and evict old entries if needed"""
+        encoded = json.dumps(value)
+        with self._lock:
+            self._entries[key] = (encoded, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def touch(self, key: str):
+        """Reset the TTL of `key` as if it had just been written"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries[key] = (entry[0], time.time())
+                self._entries.move_to_end(key)
+    
+    def keys(self) -> List[str]:
+        """Return the keys of all entries that have not expired"""
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            return [key for key, (_, created_at) in self._entries.items() if created_at >= cutoff]
+    
+    def delete(self, key: str):
+        """Remove `key` from the cache"""
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def clear(self):
+        """Remove every entry and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss/revalidation counters and the current number of entries"""
+        with self._lock:
+            size = len(self._entries)
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'revalidations': self.revalidations,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+            'size': size,
+            'max_entries': self.max_entries
+        }
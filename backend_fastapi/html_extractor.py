@@ -0,0 +1,303 @@
+"""Single-pass extraction of competitor page data from HTML."""
+import re
+from typing import Any, Dict, List, Optional
+
+from bs4 import BeautifulSoup
+from bs4.builder import HTMLParserTreeBuilder
+# Private module, so beautifulsoup4 has an upper bound in requirements.txt; check that the
+# extractor still matches BeautifulSoup(html, 'html.parser') before raising it
+from bs4.builder._htmlparser import BeautifulSoupHTMLParser
+from bs4.element import CData
+
+# Keyword lists shared with the BeautifulSoup-based extractors in market_agent
+PRICING_KEYWORDS = ['pricing', 'price', 'subscription', 'plan', 'cost', 'free', 'trial', 'premium', 'basic', 'pro', 'enterprise']
+FEATURE_LIST_KEYWORDS = ['feature', 'benefit', 'capability', 'service']
+FEATURE_HEADING_KEYWORDS = ['feature', 'benefit', 'capability', 'service', 'solution']
+ABOUT_KEYWORDS = ['about', 'company', 'founded', 'team', 'mission', 'vision']
+SOCIAL_PLATFORMS = ['twitter', 'facebook', 'linkedin', 'instagram', 'youtube']
+
+# Elements whose whole subtree is dropped before extraction
+REMOVED_TAGS = {'script', 'style', 'nav', 'footer'}
+HEADING_TAGS = {'h1', 'h2', 'h3', 'h4'}
+NEXT_CONTENT_TAGS = {'p', 'div', 'ul'}
+
+# Tree-building rules of Beautiful Soup's html.parser builder, so the extractor sees the
+# same element nesting and text nodes as BeautifulSoup(html, 'html.parser') would
+_BUILDER = HTMLParserTreeBuilder()
+_ASCII_SPACES = BeautifulSoup.ASCII_SPACES
+
+
+def _class_matches(element_class: Optional[str], keywords: List[str]) -> bool:
+    return bool(element_class) and any(keyword in element_class.lower() for keyword in keywords)
+
+
+class _Element:
+    """An open element on the extractor's stack, with the slice of document strings it spans."""
+    __slots__ = ('name', 'attrs', 'removed', 'start', 'end', 'lis', 'children', 'is_empty_element')
+
+    def __init__(self, name: str, attrs: Dict[str, str], removed: bool, start: int):
+        self.name = name
+        self.attrs = attrs
+        self.removed = removed
+        self.start = start
+        self.end = None
+        self.lis = None
+        self.children = None
+        self.is_empty_element = name in _BUILDER.empty_element_tags
+
+
+class PageExtractor:
+    """
+    Streaming extractor for the data `EnhancedMarketResearchAgent` pulls out of competitor pages.
+
+    HTML is fed in chunks through Beautiful Soup's own html.parser tokenizer, but instead of
+    building a tree the extractor tracks only the open-element stack and a flat list of stripped
+    text nodes. Title, meta description, pricing sections, feature lists, feature headings, about
+    text and social links are all collected during that one pass, and the result is identical to
+    running the BeautifulSoup-based `_extract_*` helpers on `BeautifulSoup(html, 'html.parser')`.
+
+    Usage:
+        extractor = PageExtractor()
+        extractor.feed(chunk)      # any number of times
+        data = extractor.close()
+    """
+
+    def __init__(self):
+        self.builder = _BUILDER
+        self.contains_replacement_characters = False
+
+        try:
+            self._parser = BeautifulSoupHTMLParser(self, convert_charrefs=False)
+        except TypeError:
+            # Beautiful Soup < 4.13 attaches the tree builder after construction
+            self._parser = BeautifulSoupHTMLParser(convert_charrefs=False)
+            self._parser.soup = self
+
+        self._stack: List[_Element] = []
+        self._open_counts: Dict[str, int] = {}
+        self._removed_depth = 0
+        self._container_stack: List[str] = []
+        self._preserve_whitespace_depth = 0
+        self._current_data: List[str] = []
+
+        # Every interesting text node in document order; an element's get_text(strip=True)
+        # is the concatenation of strings[element.start:element.end]
+        self.strings: List[str] = []
+        self.text_length = 0
+
+        self._title: Optional[_Element] = None
+        self._meta_description: Optional[str] = None
+        self._pricing_sections: List[_Element] = []
+        self._about_section: Optional[_Element] = None
+        self._feature_lists: List[_Element] = []
+        self._open_feature_lists: List[_Element] = []
+        self._headings: List[_Element] = []
+        self._awaiting_next_content: List[_Element] = []
+        self._next_content: Dict[int, _Element] = {}
+        self._social_links: Dict[str, str] = {}
+        self._closed = False
+
+    def feed(self, html: str):
+        """Feed the next chunk of the document"""
+        self._parser.feed(html)
+
+    def close(self) -> Dict[str, Any]:
+        """Finish parsing and return the extracted data"""
+        if not self._closed:
+            self._parser.close()
+            self.endData()
+            while self._stack:
+                self._pop()
+            self._closed = True
+        return self._result()
+
+    # Tree-builder interface used by BeautifulSoupHTMLParser
+
+    def handle_starttag(self, name, namespace, nsprefix, attrs, sourceline=None, sourcepos=None, namespaces=None):
+        self.endData()
+        removed = self._removed_depth > 0 or name in REMOVED_TAGS
+        element = _Element(name, attrs, removed, len(self.strings))
+
+        if self._title is not None and self._title.end is None and not removed:
+            self._title_node().children.append(element)
+            element.children = []
+
+        if not removed:
+            self._inspect(element)
+
+        self._stack.append(element)
+        self._open_counts[name] = self._open_counts.get(name, 0) + 1
+        if removed:
+            self._removed_depth += 1
+        if name in _BUILDER.preserve_whitespace_tags:
+            self._preserve_whitespace_depth += 1
+        if name in _BUILDER.string_containers:
+            self._container_stack.append(name)
+        return element
+
+    def handle_endtag(self, name, nsprefix=None):
+        self.endData()
+        if not self._open_counts.get(name):
+            return
+        while self._stack:
+            if self._pop().name == name:
+                break
+
+    def handle_data(self, data):
+        self._current_data.append(data)
+
+    def endData(self, containerClass=None):
+        if not self._current_data:
+            return
+        data = "".join(self._current_data)
+        self._current_data = []
+
+        if not self._preserve_whitespace_depth and all(char in _ASCII_SPACES for char in data):
+            data = "\n" if "\n" in data else " "
+
+        if self._removed_depth:
+            return
+        if self._title is not None and self._title.end is None:
+            self._title_node().children.append(data)
+
+        # get_text() only returns plain strings and CDATA: comments, doctypes, processing
+        # instructions and text inside <template>, <rt> and <rp> are skipped
+        if containerClass is None:
+            interesting = not self._container_stack
+        else:
+            interesting = containerClass is CData
+        if interesting:
+            stripped = data.strip()
+            if stripped:
+                self.strings.append(stripped)
+                self.text_length += len(stripped) + 1
+
+    # Extraction
+
+    def _inspect(self, element: _Element):
+        """Record an element that one of the extractors is interested in"""
+        name = element.name
+        attrs = element.attrs
+
+        if name == 'title' and self._title is None:
+            self._title = element
+            element.children = []
+        elif name == 'meta' and self._meta_description is None and attrs.get('name') == 'description':
+            self._meta_description = attrs.get('content', '')
+        elif name == 'a':
+            href = attrs.get('href')
+            if href:
+                for platform in SOCIAL_PLATFORMS:
+                    if platform not in self._social_links and platform in href.lower():
+                        self._social_links[platform] = href
+
+        if name in ('div', 'section'):
+            element_class = attrs.get('class')
+            if len(self._pricing_sections) < 3 and _class_matches(element_class, PRICING_KEYWORDS):
+                self._pricing_sections.append(element)
+            if self._about_section is None and _class_matches(element_class, ABOUT_KEYWORDS):
+                self._about_section = element
+        elif name in ('ul', 'ol') and _class_matches(attrs.get('class'), FEATURE_LIST_KEYWORDS):
+            element.lis = []
+            self._feature_lists.append(element)
+            self._open_feature_lists.append(element)
+        elif name == 'li':
+            for feature_list in self._open_feature_lists:
+                feature_list.lis.append(element)
+
+        # heading.find_next(['p', 'div', 'ul']) is the first such element that starts after the
+        # heading does, which may be one of the heading's own descendants
+        if name in NEXT_CONTENT_TAGS and self._awaiting_next_content:
+            for heading in self._awaiting_next_content:
+                self._next_content[id(heading)] = element
+            self._awaiting_next_content = []
+        if name in HEADING_TAGS:
+            self._headings.append(element)
+            self._awaiting_next_content.append(element)
+
+    def _pop(self) -> _Element:
+        element = self._stack.pop()
+        element.end = len(self.strings)
+        self._open_counts[element.name] -= 1
+        if element.removed:
+            self._removed_depth -= 1
+        if element.name in _BUILDER.preserve_whitespace_tags:
+            self._preserve_whitespace_depth -= 1
+        if element.name in _BUILDER.string_containers:
+            self._container_stack.pop()
+        if element.lis is not None and not element.removed:
+            self._open_feature_lists.remove(element)
+        return element
+
+    def _title_node(self) -> _Element:
+        """The innermost open element inside the title, whose children are being recorded"""
+        for element in reversed(self._stack):
+            if element.children is not None:
+                return element
+        return self._title
+
+    def _text(self, element: _Element) -> str:
+        return "".join(self.strings[element.start:element.end])
+
+    def _title_string(self) -> Optional[str]:
+        """Equivalent of soup.title.string: the only child string, looking through single-child tags"""
+        node = self._title
+        while True:
+            if len(node.children) != 1:
+                return None
+            child = node.children[0]
+            if isinstance(child, str):
+                return child
+            node = child
+
+    def _result(self) -> Dict[str, Any]:
+        text = re.sub(r'\s+', ' ', " ".join(self.strings))
+
+        features = []
+        for feature_list in self._feature_lists:
+            for item in feature_list.lis:
+                feature_text = self._text(item)
+                if 10 < len(feature_text) < 150:  # Filter reasonable length features
+                    features.append(feature_text)
+        for heading in self._headings:
+            heading_text = self._text(heading)
+            if any(keyword in heading_text.lower() for keyword in FEATURE_HEADING_KEYWORDS):
+                next_content = self._next_content.get(id(heading))
+                if next_content is not None:
+                    features.append(f"{heading_text}: {self._text(next_content)[:100]}")
+
+        about_info = {}
+        if self._about_section is not None:
+            about_info['about_text'] = self._text(self._about_section)[:300]
+        year_match = re.search(r'founded.*?(\d{4})|since.*?(\d{4})|established.*?(\d{4})', text.lower())
+        if year_match:
+            about_info['founded_year'] = year_match.group(1) or year_match.group(2) or year_match.group(3)
+
+        return {
+            'title': self._title_string() if self._title is not None else "No title found",
+            'meta_description': self._meta_description if self._meta_description is not None else "",
+            'text': text,
+            'features': features[:15],
+            'pricing_info': {
+                'price_mentions': re.findall(r'\$\d+(?:\.\d{2})?(?:/month|/year|/mo|/yr)?', text)[:10],
+                'pricing_sections': [self._text(section)[:200] for section in self._pricing_sections]
+            },
+            'about_info': about_info,
+            'social_links': {platform: self._social_links[platform] for platform in SOCIAL_PLATFORMS if platform in self._social_links}
+        }
+
+
+def extract_page_data(html: str) -> Dict[str, Any]:
+    """
+    Extract competitor page data from a complete HTML document in a single pass.
+
+    Args:
+        html (str): The page markup
+
+    Returns:
+        dict: title, meta_description, text (normalised page text), features, pricing_info,
+              about_info and social_links
+    """
+    extractor = PageExtractor()
+    extractor.feed(html)
+    return extractor.close()
@@ -0,0 +1,189 @@
+"""Shared, pooled HTTP client used by the market research agent for searches and scraping."""
+import os
+import random
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "15"))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+HTTP_BACKOFF_FACTOR = float(os.getenv("HTTP_BACKOFF_FACTOR", "0.5"))
+# Longest Retry-After honoured; a server asking for more would hold the calling thread that long
+HTTP_MAX_RETRY_AFTER = float(os.getenv("HTTP_MAX_RETRY_AFTER", "30"))
+HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "20"))
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "20"))
+HTTP_ENABLE_HTTP2 = os.getenv("HTTP_ENABLE_HTTP2", "false").lower() in ("1", "true", "yes")
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class HTTPClient:
+    """
+    Keep-alive HTTP client with per-host connection pooling, timeouts and retries.
+    
+    Connections are reused across calls (and threads), so repeated requests to the same host skip
+    DNS, TCP and TLS setup. Requests answered with 429 or 5xx, and requests that fail to connect,
+    are retried with exponential backoff and jitter, honouring Retry-After when the server sends it
+    (up to `max_retry_after` seconds).
+    
+    When `http2` is enabled and `httpx` (with the `h2` extra) is installed, requests go through an
+    HTTP/2 capable httpx client instead of requests; otherwise the requests backend is used.
+    """
+    
+    def __init__(self,
+                 connect_timeout: float = HTTP_CONNECT_TIMEOUT,
+                 read_timeout: float = HTTP_READ_TIMEOUT,
+                 max_retries: int = HTTP_MAX_RETRIES,
+                 backoff_factor: float = HTTP_BACKOFF_FACTOR,
+                 max_retry_after: float = HTTP_MAX_RETRY_AFTER,
+                 pool_connections: int = HTTP_POOL_CONNECTIONS,
+                 pool_maxsize: int = HTTP_POOL_MAXSIZE,
+                 http2: bool = HTTP_ENABLE_HTTP2,
+                 default_headers: Optional[Dict[str, str]] = None):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_retry_after = max_retry_after
+        self.http2 = False
+        self._httpx_client = None
+        
+        if http2:
+            try:
+                import httpx
+                self._httpx_client = httpx.Client(
+                    http2=True,
+                    headers=default_headers,
+                    limits=httpx.Limits(max_connections=pool_connections * pool_maxsize,
+                                        max_keepalive_connections=pool_maxsize),
+                    follow_redirects=True
+                )
+                self.http2 = True
+            except ImportError:
+                print("HTTP/2 requested but httpx[http2] is not installed; using HTTP/1.1", flush=True)
+        
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if default_headers:
+            self.session.headers.update(default_headers)
+    
+    def _backoff_delay(self, attempt: int, response=None) -> float:
+        """Seconds to wait before retry number `attempt` (0-based)"""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                return min(float(retry_after), self.max_retry_after)
+        delay = self.backoff_factor * (2 ** attempt)
+        return delay + random.uniform(0, delay)
+    
+    def _send(self, method: str, url: str, timeout: Tuple[float, float], stream: bool, **kwargs):
+        if self._httpx_client is not None:
+            import httpx
+            request = self._httpx_client.build_request(
+                method, url, timeout=httpx.Timeout(timeout[1], connect=timeout[0]), **kwargs
+            )
+            return self._httpx_client.send(request, stream=stream)
+        return self.session.request(method, url, timeout=timeout, stream=stream, **kwargs)
+    
+    def request(self, method: str, url: str, timeout: Optional[Tuple[float, float]] = None, stream: bool = False, **kwargs):
+        """
+        Send a request, retrying on connection errors and retryable status codes.
+        
+        Args:
+            method (str): HTTP method
+            url (str): The URL to request
+            timeout (tuple): Optional (connect, read) timeout overriding the client default
+            stream (bool): Return as soon as the headers arrive and leave the body unread; read it
+                with `iter_bytes` and close the response when done
+            **kwargs: Passed through to the backend (params, headers, ...)
+            
+        Returns:
+            The backend response object (exposes status_code, headers, text, content and json())
+        """
+        timeout = timeout or self.timeout
+        attempt = 0
+        while True:
+            try:
+                response = self._send(method, url, timeout, stream, **kwargs)
+            except Exception as e:
+                if attempt >= self.max_retries or not _is_connection_error(e):
+                    raise
+                time.sleep(self._backoff_delay(attempt))
+                attempt += 1
+                continue
+            
+            if response.status_code in RETRY_STATUS_CODES and attempt < self.max_retries:
+                delay = self._backoff_delay(attempt, response)
+                response.close()
+                time.sleep(delay)
+                attempt += 1
+                continue
+            return response
+    
+    def get(self, url: str, **kwargs):
+        """Send a GET request. See `request` for arguments."""
+        return self.request("GET", url, **kwargs)
+    
+    def close(self):
+        """Close all pooled connections."""
+        self.session.close()
+        if self._httpx_client is not None:
+            self._httpx_client.close()
+
+
+def iter_bytes(response, chunk_size: int = 16384):
+    """Iterate over the (decompressed) body of a streamed response from either backend"""
+    if hasattr(response, "iter_content"):
+        return response.iter_content(chunk_size=chunk_size)
+    return response.iter_bytes(chunk_size=chunk_size)
+
+
+def _is_connection_error(error: Exception) -> bool:
+    """Whether `error` is a transient connection or timeout failure worth retrying"""
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True
+    try:
+        import httpx
+        return isinstance(error, httpx.TransportError)
+    except ImportError:
+        return False
+
+
+_http_client = None
+_http_client_lock = threading.Lock()
+
+def get_http_client() -> HTTPClient:
+    """
+    Return the process-wide HTTP client, creating it on first use.
+    
+    Returns:
+        HTTPClient: The shared HTTP client instance
+    """
+    global _http_client
+    if _http_client is None:
+        with _http_client_lock:
+            if _http_client is None:
+                _http_client = HTTPClient()
+    return _http_client
+
+def set_http_client(client: Optional[HTTPClient]):
+    """
+    Replace the process-wide HTTP client, e.g. with one pointed at a local stub server.
+    
+    Args:
+        client (HTTPClient): The client to use, or None to recreate the default on next use
+    """
+    global _http_client
+    with _http_client_lock:
+        if _http_client is not None and _http_client is not client:
+            _http_client.close()
+        _http_client = client
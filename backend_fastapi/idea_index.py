@@ -0,0 +1,143 @@
+"""Local similarity index of past startup ideas and the market research gathered for them."""
+import math
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+# Words that describe how a product is delivered rather than what it is about
+STOPWORDS = {
+    'a', 'an', 'the', 'and', 'or', 'for', 'of', 'to', 'in', 'on', 'at', 'by', 'with', 'from', 'that',
+    'which', 'who', 'your', 'their', 'our', 'my', 'is', 'are', 'be', 'can', 'helps', 'help', 'lets',
+    'app', 'apps', 'application', 'platform', 'tool', 'tools', 'service', 'services', 'solution',
+    'startup', 'based', 'powered', 'driven', 'using', 'new', 'online', 'mobile', 'web'
+}
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def normalize_idea(startup_idea: str) -> str:
+    """Lower-case and collapse whitespace so trivially different submissions share a key"""
+    return " ".join(startup_idea.lower().split())
+
+
+def _stem(word: str) -> str:
+    """Strip common English suffixes so 'coaching', 'coaches' and 'coach' match"""
+    for suffix in ('ing', 'ers', 'er', 'ed', 'es', 's'):
+        if len(word) > len(suffix) + 3 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    return word
+
+
+def idea_terms(startup_idea: str) -> Tuple[Counter, Counter]:
+    """
+    Split an idea into the features compared by `IdeaIndex`.
+
+    Returns:
+        tuple: (stemmed content words, character trigrams of those words), each as counts
+    """
+    words = [_stem(word) for word in _WORD_PATTERN.findall(startup_idea.lower()) if word not in STOPWORDS]
+    trigrams = Counter()
+    for word in words:
+        padded = f"#{word}#"
+        trigrams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return Counter(words), trigrams
+
+
+def _tfidf(terms: Counter, document_frequency: Counter, documents: int) -> Dict[str, float]:
+    vector = {}
+    for term, count in terms.items():
+        idf = math.log((1 + documents) / (1 + document_frequency[term])) + 1
+        vector[term] = (1 + math.log(count)) * idf
+    norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+    return {term: weight / norm for term, weight in vector.items()} if norm else {}
+
+
+def _cosine(left: Dict[str, float], right: Dict[str, float]) -> float:
+    if len(left) > len(right):
+        left, right = right, left
+    return sum(weight * right.get(term, 0.0) for term, weight in left.items())
+
+
+class IdeaIndex:
+    """
+    TF-IDF similarity search over previously analyzed startup ideas.
+
+    Each idea's search results and competitor analyses are stored in a `SQLiteCache` or
+    `MemoryCache` keyed on the normalized idea; the term vectors used for matching are kept
+    in memory and rebuilt from the cache keys at start-up.
+    Similarity is the mean cosine of word and character-trigram TF-IDF vectors, so rewordings
+    like "AI fitness coach app" and "AI-powered fitness coaching app" score close to 1.0.
+    Everything runs locally; no embedding service is called.
+    """
+
+    def __init__(self, cache, reuse_threshold: float, warm_start_threshold: float):
+        self.cache = cache
+        self.reuse_threshold = reuse_threshold
+        self.warm_start_threshold = warm_start_threshold
+        self._terms: Dict[str, Tuple[Counter, Counter]] = {key: idea_terms(key) for key in cache.keys()}
+        self._lock = threading.Lock()
+
+    def find_similar(self, startup_idea: str) -> Optional[Dict[str, Any]]:
+        """
+        Find the most similar past idea scoring at least `warm_start_threshold`.
+
+        Args:
+            startup_idea (str): The idea about to be analyzed
+
+        Returns:
+            dict: startup_idea, similarity, reusable (similarity >= reuse_threshold),
+                  search_results and competitor_data of the match; None if nothing is close enough
+        """
+        words, trigrams = idea_terms(startup_idea)
+        if not words:
+            return None
+        with self._lock:
+            indexed = list(self._terms.items())
+
+        # Document frequencies over the indexed ideas plus the query itself
+        word_frequency, trigram_frequency = Counter(words.keys()), Counter(trigrams.keys())
+        for _, (indexed_words, indexed_trigrams) in indexed:
+            word_frequency.update(indexed_words.keys())
+            trigram_frequency.update(indexed_trigrams.keys())
+        documents = len(indexed) + 1
+        query_words = _tfidf(words, word_frequency, documents)
+        query_trigrams = _tfidf(trigrams, trigram_frequency, documents)
+
+        scored = []
+        for key, (indexed_words, indexed_trigrams) in indexed:
+            similarity = (_cosine(query_words, _tfidf(indexed_words, word_frequency, documents)) +
+                          _cosine(query_trigrams, _tfidf(indexed_trigrams, trigram_frequency, documents))) / 2
+            if similarity >= self.warm_start_threshold:
+                scored.append((similarity, key))
+
+        for similarity, key in sorted(scored, reverse=True):
+            entry = self.cache.get(key)
+            if entry is None:
+                # Expired or evicted from the cache since the index was built
+                with self._lock:
+                    self._terms.pop(key, None)
+                continue
+            return {
+                **entry,
+                'similarity': round(similarity, 4),
+                'reusable': similarity >= self.reuse_threshold
+            }
+        return None
+
+    def add(self, startup_idea: str, search_results: Dict[str, List[Dict]], competitor_data: List[Dict]):
+        """
+        Store the research gathered for an idea, replacing any earlier entry for the same idea.
+
+        Args:
+            startup_idea (str): The analyzed idea
+            search_results (dict): Output of `conduct_comprehensive_search`
+            competitor_data (list): Output of `deep_competitor_analysis`
+        """
+        key = normalize_idea(startup_idea)
+        self.cache.set(key, {
+            'startup_idea': startup_idea,
+            'search_results': search_results,
+            'competitor_data': competitor_data
+        })
+        with self._lock:
+            self._terms[key] = idea_terms(key)
@@ -0,0 +1,210 @@
+"""Background job queue for long-running agent runs."""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+JOB_BACKEND = os.getenv("JOB_BACKEND", "memory")
+JOB_DB_PATH = os.getenv("JOB_DB_PATH", os.path.join("cache", "jobs.sqlite3"))
+JOB_MAX_WORKERS = int(os.getenv("JOB_MAX_WORKERS", "4"))
+JOB_RETENTION_SECONDS = float(os.getenv("JOB_RETENTION_SECONDS", str(24 * 3600)))
+
+# Job statuses
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+FINISHED_STATUSES = (COMPLETED, FAILED)
+
+
+class JobRecord(BaseModel):
+    job_id: str = Field(description="Unique job identifier")
+    kind: str = Field(description="Which agent the job runs (market-analyst, product-manager, ...)")
+    status: str = Field(default=QUEUED, description="queued, running, completed or failed")
+    user_id: Optional[str] = Field(default=None, description="User that submitted the job")
+    session_id: Optional[str] = Field(default=None, description="Session the job belongs to")
+    created_at: str = Field(description="When the job was submitted")
+    updated_at: str = Field(description="When the job last changed")
+    progress: List[Dict[str, Any]] = Field(default=[], description="Progress events, oldest first")
+    result: Optional[Dict[str, Any]] = Field(default=None, description="The agent response once completed")
+    error: Optional[str] = Field(default=None, description="Error message if the job failed")
+
+
+class InMemoryJobBackend:
+    """Keeps jobs in a dict; jobs are lost when the process restarts."""
+
+    def __init__(self):
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def save(self, job: JobRecord):
+        with self._lock:
+            self._jobs[job.job_id] = job.model_dump()
+
+    def get(self, job_id: str) -> Optional[JobRecord]:
+        with self._lock:
+            data = self._jobs.get(job_id)
+        return JobRecord(**data) if data else None
+
+    def delete_finished_before(self, cutoff: str):
+        with self._lock:
+            for job_id in [job_id for job_id, data in self._jobs.items()
+                           if data['status'] in FINISHED_STATUSES and data['updated_at'] < cutoff]:
+                del self._jobs[job_id]
+
+
+class SQLiteJobBackend:
+    """Persists jobs as JSON rows in SQLite so results survive restarts and can be shared by workers."""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "job_id TEXT PRIMARY KEY, status TEXT NOT NULL, data TEXT NOT NULL, updated_at TEXT NOT NULL)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def save(self, job: JobRecord):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs (job_id, status, data, updated_at) VALUES (?, ?, ?, ?)",
+                (job.job_id, job.status, job.model_dump_json(), job.updated_at)
+            )
+            self._conn.commit()
+
+    def get(self, job_id: str) -> Optional[JobRecord]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return JobRecord(**json.loads(row[0])) if row else None
+
+    def delete_finished_before(self, cutoff: str):
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?", (*FINISHED_STATUSES, cutoff)
+            )
+            self._conn.commit()
+
+    def fail_unfinished(self, error: str):
+        """Mark jobs left queued or running by a previous process as failed"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)
+            ).fetchall()
+        for (data,) in rows:
+            job = JobRecord(**json.loads(data))
+            job.status = FAILED
+            job.error = error
+            job.updated_at = _now()
+            self.save(job)
+
+
+def _now() -> str:
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+class JobManager:
+    """
+    Runs agent jobs on a bounded worker pool and records their progress in a backend.
+
+    Job functions receive a `progress(step, message)` callback as their last argument and return
+    the response dict that becomes the job result. Any exception marks the job as failed.
+    """
+
+    def __init__(self, backend, max_workers: int = JOB_MAX_WORKERS, retention_seconds: float = JOB_RETENTION_SECONDS):
+        self.backend = backend
+        self.retention_seconds = retention_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, func: Callable[..., Dict[str, Any]], *args,
+               user_id: Optional[str] = None, session_id: Optional[str] = None) -> JobRecord:
+        """
+        Queue a job and return its record immediately.
+
+        Args:
+            kind (str): Label for the job type
+            func (callable): Called as func(*args, progress) on a worker thread
+            user_id (str): The ID of the user, stored with the job
+            session_id (str): The ID of the session, stored with the job
+
+        Returns:
+            JobRecord: The queued job
+        """
+        self._delete_expired()
+        now = _now()
+        job = JobRecord(job_id=str(uuid.uuid4()), kind=kind, user_id=user_id, session_id=session_id,
+                        created_at=now, updated_at=now)
+        self.backend.save(job)
+        self._executor.submit(self._run, job.job_id, func, args)
+        return job
+
+    def get(self, job_id: str) -> Optional[JobRecord]:
+        """Return the current record of a job, or None if it is unknown or expired"""
+        return self.backend.get(job_id)
+
+    def _update(self, job_id: str, **changes):
+        # Progress can be reported from several threads at once (e.g. blueprint sections)
+        with self._lock:
+            job = self.backend.get(job_id)
+            progress_event = changes.pop('progress_event', None)
+            for field, value in changes.items():
+                setattr(job, field, value)
+            if progress_event is not None:
+                job.progress.append(progress_event)
+            job.updated_at = _now()
+            self.backend.save(job)
+
+    def _run(self, job_id: str, func: Callable[..., Dict[str, Any]], args: tuple):
+        start_time = time.perf_counter()
+
+        def progress(step: str, message: str = ""):
+            self._update(job_id, progress_event={
+                'step': step,
+                'message': message,
+                'elapsed_seconds': round(time.perf_counter() - start_time, 2)
+            })
+
+        self._update(job_id, status=RUNNING)
+        try:
+            result = func(*args, progress)
+            self._update(job_id, status=COMPLETED, result=result)
+        except Exception as e:
+            print(f"Job {job_id} failed: {str(e)}", flush=True)
+            self._update(job_id, status=FAILED, error=str(e))
+
+    def _delete_expired(self):
+        cutoff = datetime.fromtimestamp(time.time() - self.retention_seconds).strftime("%Y-%m-%d %H:%M:%S.%f")
+        self.backend.delete_finished_before(cutoff)
+
+
+def create_job_manager() -> JobManager:
+    """
+    Build the job manager selected by JOB_BACKEND ("memory" or "sqlite").
+
+    Returns:
+        JobManager: The configured job manager
+    """
+    if JOB_BACKEND == "sqlite":
+        backend = SQLiteJobBackend(JOB_DB_PATH)
+        backend.fail_unfinished("Interrupted by a server restart")
+    elif JOB_BACKEND == "memory":
+        backend = InMemoryJobBackend()
+    else:
+        raise ValueError(f"Unknown JOB_BACKEND '{JOB_BACKEND}', expected 'memory' or 'sqlite'")
+    return JobManager(backend)
@@ -0,0 +1,46 @@
+"""JSON responses that skip FastAPI's jsonable_encoder pass and use orjson when it is installed."""
+import json
+from typing import Any
+
+from pydantic import BaseModel
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    """Serialize the few non-JSON types responses can contain (models, datetimes, sets)"""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def dumps(value: Any) -> bytes:
+    """
+    Serialize `value` to compact UTF-8 JSON in one pass.
+
+    Uses orjson if available and the standard library otherwise; both give the same output for
+    the plain dicts the endpoints return.
+    """
+    if orjson is not None:
+        return orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    A JSONResponse rendered with `dumps`.
+
+    Endpoints return it directly, so FastAPI does not first copy the body through
+    `jsonable_encoder`; the body must already be plain data (dicts from `.dict()`, Supabase rows).
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
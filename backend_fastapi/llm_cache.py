@@ -0,0 +1,114 @@
+"""Content-addressed cache of chat completions shared by all agents."""
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, Optional
+
+from dotenv import load_dotenv
+
+from disk_cache import SQLiteCache, MemoryCache
+
+# Load environment variables
+load_dotenv()
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+LLM_CACHE_BACKEND = os.getenv("LLM_CACHE_BACKEND", "disk")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join("cache", "llm_cache.sqlite3"))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+# Completions sampled above this temperature are meant to vary between runs, so they are only
+# cached when it is raised explicitly (e.g. to 0.7 to include the technical architect's calls)
+LLM_CACHE_MAX_TEMPERATURE = float(os.getenv("LLM_CACHE_MAX_TEMPERATURE", "0.5"))
+
+# Request arguments that determine the completion; anything else (timeouts, stream) does not
+KEY_FIELDS = ('model', 'messages', 'temperature', 'response_format', 'max_tokens')
+
+
+def completion_cache_key(request: Dict[str, Any]) -> str:
+    """
+    Hash the arguments of a chat completion request that determine its output.
+
+    Args:
+        request (dict): Keyword arguments for `chat.completions.create`
+
+    Returns:
+        str: Hex SHA-256 digest of the canonical JSON of model, messages, temperature,
+             response_format and max_tokens
+    """
+    payload = json.dumps({field: request.get(field) for field in KEY_FIELDS}, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class CompletionCache:
+    """
+    Caches completion text by request hash in a `SQLiteCache` or `MemoryCache` backend.
+
+    Only completions that finished normally are stored, so truncated output is retried next
+    time. Lookups are counted per agent; requests above `max_temperature` are not looked up
+    or stored and are counted as skipped.
+    """
+
+    def __init__(self, backend, max_temperature: float = LLM_CACHE_MAX_TEMPERATURE):
+        self.backend = backend
+        self.max_temperature = max_temperature
+        self._agent_stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def cacheable(self, request: Dict[str, Any]) -> bool:
+        """Whether a request is deterministic enough to be served from the cache"""
+        return request.get('temperature', 1.0) <= self.max_temperature
+
+    def get(self, agent: str, request: Dict[str, Any]) -> Optional[str]:
+        """Return the cached completion text for `request`, or None on a miss or skip"""
+        if not self.cacheable(request):
+            self._count(agent, 'skipped')
+            return None
+        content = self.backend.get(completion_cache_key(request))
+        self._count(agent, 'hits' if content is not None else 'misses')
+        return content
+
+    def set(self, request: Dict[str, Any], content: str):
+        """Store the completion text for `request` if it is cacheable"""
+        if self.cacheable(request) and content:
+            self.backend.set(completion_cache_key(request), content)
+
+    def _count(self, agent: str, outcome: str):
+        with self._lock:
+            counters = self._agent_stats.setdefault(agent or "unknown", {'hits': 0, 'misses': 0, 'skipped': 0})
+            counters[outcome] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return backend statistics plus hit/miss/skip counts and hit ratio per agent"""
+        with self._lock:
+            agents = {agent: dict(counters) for agent, counters in self._agent_stats.items()}
+        for counters in agents.values():
+            lookups = counters['hits'] + counters['misses']
+            counters['hit_ratio'] = counters['hits'] / lookups if lookups else 0.0
+        return {
+            **self.backend.stats(),
+            'max_temperature': self.max_temperature,
+            'agents': agents
+        }
+
+
+def create_completion_cache() -> Optional[CompletionCache]:
+    """
+    Build the completion cache selected by LLM_CACHE_BACKEND ("disk" or "memory").
+
+    Returns:
+        CompletionCache: The configured cache, or None if LLM_CACHE_ENABLED is off
+    """
+    if not LLM_CACHE_ENABLED:
+        return None
+    if LLM_CACHE_BACKEND == "disk":
+        backend = SQLiteCache(LLM_CACHE_PATH, "completions", LLM_CACHE_TTL, LLM_CACHE_MAX_ENTRIES)
+    elif LLM_CACHE_BACKEND == "memory":
+        backend = MemoryCache(LLM_CACHE_TTL, LLM_CACHE_MAX_ENTRIES)
+    else:
+        raise ValueError(f"Unknown LLM_CACHE_BACKEND '{LLM_CACHE_BACKEND}', expected 'disk' or 'memory'")
+    return CompletionCache(backend)
+
+
+# Shared by every agent in the process
+completion_cache = create_completion_cache()
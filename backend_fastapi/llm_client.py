@@ -0,0 +1,104 @@
+"""Process-wide OpenAI client with a shared connection pool."""
+import os
+import threading
+from typing import Any, Dict, Optional
+
+import httpx
+from openai import OpenAI
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "20"))
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "20"))
+OPENAI_KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "60"))
+
+
+class LLMClientManager:
+    """
+    Owns the single HTTP connection pool every agent's OpenAI client uses.
+
+    Agents ask for a client with `client()`; clients that need a different timeout are derived
+    with `with_options`, so they still share the pool and its keep-alive connections. The
+    clients never retry on their own: retries go back through the scheduler (see llm_scheduler)
+    so they respect the shared rate budgets.
+    """
+
+    def __init__(self, max_connections: int = OPENAI_MAX_CONNECTIONS,
+                 max_keepalive_connections: int = OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+                 keepalive_expiry: float = OPENAI_KEEPALIVE_EXPIRY):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self._clients: Dict[Optional[float], OpenAI] = {}
+        self._http_client: Optional[httpx.Client] = None
+        self._override = None
+        self._lock = threading.Lock()
+
+    def client(self, timeout: Optional[float] = None) -> OpenAI:
+        """
+        Return the shared OpenAI client, or a variant of it with a different timeout.
+
+        Args:
+            timeout (float): Request timeout in seconds (OpenAI's default if None)
+
+        Returns:
+            OpenAI: A client backed by the shared connection pool
+        """
+        with self._lock:
+            if self._override is not None:
+                return self._override
+            client = self._clients.get(timeout)
+            if client is None:
+                base = self._clients.get(None)
+                if base is None:
+                    # Created on first use so importing the agents does not require an API key
+                    self._http_client = httpx.Client(limits=self.limits)
+                    base = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=self._http_client, max_retries=0)
+                    self._clients[None] = base
+                client = base.with_options(timeout=timeout) if timeout is not None else base
+                self._clients[timeout] = client
+        return client
+
+    def set_client(self, client):
+        """
+        Hand `client` to every agent instead of the pooled OpenAI client, e.g. an offline stub.
+
+        Args:
+            client: Any object exposing `chat.completions.create`, or None to restore the OpenAI client
+        """
+        with self._lock:
+            self._override = client
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the connection pool limits"""
+        return {
+            'max_connections': self.limits.max_connections,
+            'max_keepalive_connections': self.limits.max_keepalive_connections,
+            'keepalive_expiry': self.limits.keepalive_expiry
+        }
+
+    def close(self):
+        """Close the shared connection pool; the next `client()` call opens a new one"""
+        with self._lock:
+            if self._http_client is not None:
+                self._http_client.close()
+            self._http_client = None
+            self._clients.clear()
+
+
+# Shared by every agent in the process
+llm_client_manager = LLMClientManager()
+
+
+def get_llm_client(timeout: Optional[float] = None) -> OpenAI:
+    """Return an OpenAI client backed by the process-wide connection pool"""
+    return llm_client_manager.client(timeout)
+
+
+def set_llm_client(client):
+    """Replace the client agents created from now on use (None restores the OpenAI client)"""
+    llm_client_manager.set_client(client)
@@ -0,0 +1,202 @@
+"""Admission control for OpenAI calls: concurrency, request and token budgets, priorities and retries."""
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+import openai
+from dotenv import load_dotenv
+
+from rate_limiter import TokenBucket
+
+# Load environment variables
+load_dotenv()
+
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "16"))
+# Budgets of the OpenAI organisation; set them a little below the account's actual limits
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "500"))
+LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "200000"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1.0"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "30"))
+
+# Priorities: lower values are admitted first
+INTERACTIVE = 0
+BATCH = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BATCH: "batch"}
+
+# Rate limits, dropped connections, timeouts and 5xx responses are worth another attempt
+RETRYABLE_ERRORS = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+
+# Completion size assumed when a request does not set max_tokens
+DEFAULT_COMPLETION_TOKENS = 1000
+
+
+def estimate_tokens(request: Dict[str, Any]) -> int:
+    """
+    Estimate the tokens a chat completion request counts against the tokens-per-minute budget.
+
+    OpenAI reserves prompt tokens plus max_tokens when the request is accepted, so the estimate
+    is roughly four characters per prompt token, a few tokens of overhead per message, plus max_tokens.
+    """
+    messages = request.get('messages') or []
+    prompt_chars = sum(len(message.get('content') or '') for message in messages)
+    return prompt_chars // 4 + 4 * len(messages) + (request.get('max_tokens') or DEFAULT_COMPLETION_TOKENS)
+
+
+class LLMScheduler:
+    """
+    Sits in front of every OpenAI completion call made by the agents.
+
+    A call is admitted when a concurrency slot is free and the requests-per-minute and
+    tokens-per-minute buckets hold enough budget; waiting calls are admitted strictly by
+    priority (interactive before batch) and then in arrival order. Retryable errors are retried
+    with full-jitter exponential backoff, and a 429 pauses all admissions for the backoff so
+    concurrent calls do not pile onto an exhausted quota.
+    """
+
+    def __init__(self, max_concurrency: int = OPENAI_MAX_CONCURRENCY,
+                 requests_per_minute: float = LLM_REQUESTS_PER_MINUTE,
+                 tokens_per_minute: float = LLM_TOKENS_PER_MINUTE,
+                 max_retries: int = LLM_MAX_RETRIES,
+                 backoff_base: float = LLM_BACKOFF_BASE,
+                 backoff_max: float = LLM_BACKOFF_MAX):
+        self.max_concurrency = max_concurrency
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        # Buckets hold ten seconds of budget so a burst cannot spend the whole minute at once
+        self._requests = TokenBucket(rate=requests_per_minute / 60.0, capacity=max(1.0, requests_per_minute / 6.0))
+        self._tokens = TokenBucket(rate=tokens_per_minute / 60.0, capacity=max(1.0, tokens_per_minute / 6.0))
+        self._condition = threading.Condition()
+        self._waiting = []
+        self._sequence = itertools.count()
+        self._paused_until = 0.0
+        self.in_flight = 0
+        self.queued = {name: 0 for name in PRIORITY_NAMES.values()}
+        self.completed = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    @contextmanager
+    def admit(self, priority: int = INTERACTIVE, estimated_tokens: int = DEFAULT_COMPLETION_TOKENS):
+        """
+        Block until the call may start and hold its concurrency slot until the block exits.
+
+        Args:
+            priority (int): INTERACTIVE or BATCH
+            estimated_tokens (int): Tokens to take from the tokens-per-minute budget
+        """
+        tokens = min(estimated_tokens, self._tokens.capacity)
+        priority_name = PRIORITY_NAMES.get(priority, str(priority))
+        entry = (priority, next(self._sequence))
+        start = time.perf_counter()
+        with self._condition:
+            heapq.heappush(self._waiting, entry)
+            self.queued[priority_name] = self.queued.get(priority_name, 0) + 1
+            while True:
+                if self._waiting[0] == entry and self.in_flight < self.max_concurrency:
+                    delay = max(self._paused_until - time.monotonic(),
+                                self._requests.wait_time(1),
+                                self._tokens.wait_time(tokens))
+                    if delay <= 0:
+                        break
+                    self._condition.wait(delay)
+                else:
+                    self._condition.wait()
+            # Only admissions (under this lock) take from the buckets, so both checks still hold
+            self._requests.try_acquire(1)
+            self._tokens.try_acquire(tokens)
+            heapq.heappop(self._waiting)
+            waited = time.perf_counter() - start
+            self.queued[priority_name] -= 1
+            self.in_flight += 1
+            self.total_wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+            # The next caller in line may be admissible as well
+            self._condition.notify_all()
+        try:
+            yield
+        finally:
+            with self._condition:
+                self.in_flight -= 1
+                self.completed += 1
+                self._condition.notify_all()
+
+    def run(self, func: Callable[[], Any], priority: int = INTERACTIVE,
+            estimated_tokens: int = DEFAULT_COMPLETION_TOKENS, max_retries: Optional[int] = None,
+            can_retry: Optional[Callable[[], bool]] = None) -> Any:
+        """
+        Run `func` inside an admission, retrying retryable OpenAI errors with jittered backoff.
+
+        Args:
+            func (callable): Makes the OpenAI call and returns its result
+            priority (int): INTERACTIVE or BATCH
+            estimated_tokens (int): Tokens the call counts against the budget (see estimate_tokens)
+            max_retries (int): Retries after the first attempt (the scheduler default if None)
+            can_retry (callable): Returns False when a failed attempt must not be repeated,
+                                  e.g. because part of a streamed answer was already delivered
+
+        Returns:
+            Whatever `func` returns
+        """
+        max_retries = self.max_retries if max_retries is None else max_retries
+        attempt = 0
+        while True:
+            try:
+                with self.admit(priority, estimated_tokens):
+                    return func()
+            except RETRYABLE_ERRORS as e:
+                if attempt >= max_retries or (can_retry is not None and not can_retry()):
+                    raise
+                delay = self._backoff(attempt, e)
+                print(f"OpenAI call failed ({type(e).__name__}), retrying in {delay:.1f}s", flush=True)
+                with self._condition:
+                    self.retries += 1
+                    if isinstance(e, openai.RateLimitError):
+                        self.rate_limited += 1
+                        self._paused_until = max(self._paused_until, time.monotonic() + delay)
+                time.sleep(delay)
+                attempt += 1
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        response = getattr(error, 'response', None)
+        retry_after = response.headers.get('retry-after') if response is not None else None
+        if retry_after:
+            try:
+                delay = max(delay, min(float(retry_after), self.backoff_max))
+            except ValueError:
+                pass
+        return delay
+
+    def stats(self) -> Dict[str, Any]:
+        """Return in-flight and queued calls, retries, admission wait times and the configured budgets"""
+        with self._condition:
+            admitted = self.completed + self.in_flight
+            return {
+                'in_flight': self.in_flight,
+                'queued': sum(self.queued.values()),
+                'queued_by_priority': dict(self.queued),
+                'completed': self.completed,
+                'retries': self.retries,
+                'rate_limited': self.rate_limited,
+                'paused_seconds': max(0.0, self._paused_until - time.monotonic()),
+                'average_wait_seconds': self.total_wait_seconds / admitted if admitted else 0.0,
+                'max_wait_seconds': self.max_wait_seconds,
+                'max_concurrency': self.max_concurrency,
+                'requests_per_minute': self.requests_per_minute,
+                'tokens_per_minute': self.tokens_per_minute
+            }
+
+
+# Shared by every agent in the process
+llm_scheduler = LLMScheduler()
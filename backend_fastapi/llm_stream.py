@@ -0,0 +1,223 @@
+"""Streaming chat completions and incremental parsing of the JSON the agents ask for."""
+import json
+from typing import Any, Callable, Dict, List, Optional
+
+import llm_cache
+import llm_scheduler
+from llm_scheduler import estimate_tokens
+
+# stream_callback(event, data) receives "token", "section" and "item" events
+StreamCallback = Callable[[str, Dict[str, Any]], None]
+
+
+class _Frame:
+    """An open JSON object or array and the element currently being read inside it."""
+    __slots__ = ('kind', 'expect', 'key', 'key_start', 'value_start', 'index')
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.expect = 'key' if kind == '{' else 'value'
+        self.key = None
+        self.key_start = None
+        self.value_start = None
+        self.index = 0
+
+
+class IncrementalJSONParser:
+    """
+    Parses a JSON document as it is generated and reports parts of it as soon as they close.
+
+    For a top-level object, on_section(key, value) is called as each member is complete and
+    on_item(key, index, item) as each element of an array-valued member is complete, so a
+    consumer sees `executive_summary` or each competitor well before the whole document ends.
+    For a top-level array, on_item(None, index, item) is called for each element.
+
+    Text before the first '{' or '[' (for example a ```json fence) and after the document
+    closes is ignored. Parts that are not valid JSON are skipped; the caller still parses the
+    complete text afterwards and handles errors as before.
+
+    Usage:
+        parser = IncrementalJSONParser(on_section=..., on_item=...)
+        parser.feed(delta)  # any number of times
+    """
+
+    def __init__(self, on_section: Optional[Callable[[str, Any], None]] = None,
+                 on_item: Optional[Callable[[Optional[str], int, Any], None]] = None):
+        self.on_section = on_section
+        self.on_item = on_item
+        self._text = ""
+        self._pos = 0
+        self._stack: List[_Frame] = []
+        self._in_string = False
+        self._escape = False
+        self.done = False
+
+    def feed(self, text: str):
+        """Feed the next piece of generated text"""
+        if self.done:
+            return
+        self._text += text
+        stack = self._stack
+        data = self._text
+
+        for i in range(self._pos, len(data)):
+            char = data[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    frame = stack[-1]
+                    if frame.key_start is not None:
+                        frame.key = self._loads(data[frame.key_start:i + 1])
+                        frame.key_start = None
+                continue
+
+            if not stack:
+                if char == '{' or char == '[':
+                    stack.append(_Frame(char))
+                continue
+
+            if char in ' \t\r\n':
+                continue
+            frame = stack[-1]
+
+            if char == ',' or char == '}' or char == ']':
+                if frame.value_start is not None:
+                    self._emit(data[frame.value_start:i].strip(), frame)
+                    frame.value_start = None
+                if char == ',':
+                    frame.index += 1
+                    frame.expect = 'key' if frame.kind == '{' else 'value'
+                    continue
+                stack.pop()
+                if not stack:
+                    self.done = True
+                    self._pos = i + 1
+                    return
+                continue
+
+            if frame.expect == 'key':
+                if char == '"':
+                    self._in_string = True
+                    frame.key_start = i
+                    frame.expect = 'colon'
+                continue
+            if frame.expect == 'colon':
+                if char == ':':
+                    frame.expect = 'value'
+                continue
+
+            if frame.expect == 'value':
+                frame.value_start = i
+                frame.expect = 'comma'
+            if char == '"':
+                self._in_string = True
+            elif char == '{' or char == '[':
+                stack.append(_Frame(char))
+
+        self._pos = len(data)
+
+    def _emit(self, value_text: str, frame: _Frame):
+        depth = len(self._stack)
+        root = self._stack[0]
+        if depth == 1:
+            if frame.kind == '{':
+                if self.on_section is not None:
+                    self._call(self.on_section, value_text, frame.key)
+            elif self.on_item is not None:
+                self._call(self.on_item, value_text, None, frame.index)
+        elif depth == 2 and frame.kind == '[' and root.kind == '{' and self.on_item is not None:
+            self._call(self.on_item, value_text, root.key, frame.index)
+
+    def _call(self, callback: Callable, value_text: str, *args):
+        try:
+            value = json.loads(value_text)
+        except ValueError:
+            return
+        callback(*args, value)
+
+    @staticmethod
+    def _loads(text: str) -> Optional[str]:
+        try:
+            return json.loads(text)
+        except ValueError:
+            return None
+
+
+def _section_parser(stream_callback: StreamCallback, step: str) -> IncrementalJSONParser:
+    return IncrementalJSONParser(
+        on_section=lambda key, value: stream_callback("section", {"step": step, "key": key, "value": value}),
+        on_item=lambda key, index, item: stream_callback("item", {"step": step, "key": key, "index": index, "item": item})
+    )
+
+
+def complete_chat(agent, step: str, **kwargs) -> str:
+    """
+    Run a chat completion for an agent and return the message content.
+
+    Identical requests are answered from the shared completion cache (see llm_cache); other
+    calls go through the shared scheduler (see llm_scheduler), which applies the concurrency,
+    request and token budgets, the agent's priority and retries. If the agent has a
+    stream_callback the completion is streamed: every delta is reported as a "token" event and
+    the JSON being generated is parsed incrementally, reporting "section" and "item" events as
+    parts close. A cached completion is replayed as a single token event.
+
+    Args:
+        agent: The calling agent; uses its client, stream_callback, agent_name (for cache
+               statistics), priority and, if set, llm_retries
+        step (str): Label added to every event so consumers know which call it belongs to
+        **kwargs: Arguments for `chat.completions.create`
+
+    Returns:
+        str: The complete message content
+    """
+    client = agent.client
+    stream_callback = agent.stream_callback
+    cache = llm_cache.completion_cache
+    content = cache.get(agent.agent_name, kwargs) if cache is not None else None
+    if content is not None:
+        if stream_callback is not None:
+            stream_callback("token", {"step": step, "text": content})
+            _section_parser(stream_callback, step).feed(content)
+        return content
+
+    delivered = False
+
+    def attempt():
+        nonlocal delivered
+        if stream_callback is None:
+            choice = client.chat.completions.create(**kwargs).choices[0]
+            return choice.message.content, choice.finish_reason
+        # A streamed call keeps its admission until the last chunk has been read
+        parser = _section_parser(stream_callback, step)
+        parts = []
+        finish_reason = None
+        for chunk in client.chat.completions.create(stream=True, **kwargs):
+            if not chunk.choices:
+                continue
+            choice = chunk.choices[0]
+            if choice.delta.content:
+                parts.append(choice.delta.content)
+                delivered = True
+                stream_callback("token", {"step": step, "text": choice.delta.content})
+                parser.feed(choice.delta.content)
+            finish_reason = choice.finish_reason or finish_reason
+        return "".join(parts), finish_reason
+
+    content, finish_reason = llm_scheduler.llm_scheduler.run(
+        attempt,
+        priority=agent.priority,
+        estimated_tokens=estimate_tokens(kwargs),
+        max_retries=getattr(agent, 'llm_retries', None),
+        # Retrying after tokens were streamed would send the client duplicate output
+        can_retry=lambda: not delivered
+    )
+
+    # Truncated (finish_reason "length") or filtered completions are not worth replaying
+    if cache is not None and finish_reason == "stop":
+        cache.set(kwargs, content)
+    return content
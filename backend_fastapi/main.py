@@ -1,12 +1,17 @@
-from fastapi import FastAPI, Body, HTTPException
+from fastapi import FastAPI, Body, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, Dict, Any, List
-import json
+from typing import Optional, Dict, Any, List, Callable
+import hashlib
+import os
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # Import the market agent functionality
-from market_agent import analyze_startup_market, EnhancedMarketAnalysisReport
+from market_agent import analyze_startup_market, EnhancedMarketAnalysisReport, search_cache, page_cache
 
 # Import JSON helper functions
 from json_helper_updated import extract_json_from_response, normalize_tech_stack_json, normalize_api_endpoints
@@ -17,14 +22,53 @@ from product_manager import run_product_planning, ProductRoadmap
 # Import the technical architect functionality
 from tech_architect_updated import TechnicalBlueprint, TechnicalArchitectAgent
 
+# Import the streaming callback type and scheduling priorities shared by the agents
+from llm_stream import StreamCallback
+from llm_scheduler import INTERACTIVE, llm_scheduler
+
+# Import the completion cache and OpenAI client manager shared by the agents
+import llm_cache
+from llm_client import llm_client_manager
+
 # Define a function to run the technical architecture analysis
-def run_technical_architecture(product_roadmap: ProductRoadmap) -> TechnicalBlueprint:
+def run_technical_architecture(product_roadmap: ProductRoadmap, progress_callback: Optional[Callable[[str, str], None]] = None,
+                               stream_callback: Optional[StreamCallback] = None, priority: int = INTERACTIVE) -> TechnicalBlueprint:
     """Run the technical architect agent to generate a technical blueprint."""
-    tech_architect = TechnicalArchitectAgent()
-    return tech_architect.generate_technical_blueprint(product_roadmap)
+    tech_architect = TechnicalArchitectAgent(stream_callback, priority)
+    return tech_architect.generate_technical_blueprint(product_roadmap, progress_callback)
 
 # Import Supabase client
-from supabase_client import store_agent_outputs, get_agent_outputs_by_user, get_agent_output_by_session
+from supabase_client import (store_agent_output_stage, get_agent_outputs_by_user, get_agent_output_by_session,
+                             agent_output_writer, history_cache, HISTORY_PAGE_SIZE, MARKET_ANALYST_COLUMN, PRODUCT_MANAGER_COLUMN, TECH_ARCHITECT_COLUMN)
+
+# Outputs are written behind the response; history reads wait this long for queued writes to land
+OUTPUT_READ_FLUSH_TIMEOUT = float(os.getenv("OUTPUT_READ_FLUSH_TIMEOUT", "2"))
+
+# Each session's stage outputs, so later stages can be run by session id alone
+from artifact_store import artifact_store, MARKET_ANALYSIS, PRODUCT_ROADMAP, TECHNICAL_BLUEPRINT
+
+# Identical runs in flight at the same time (double clicks, client retries) share one computation
+from single_flight import coalesce, normalize_idea, fingerprint, single_flight
+
+# Background jobs for clients that would rather poll or subscribe than hold a request open
+from jobs import create_job_manager, FINISHED_STATUSES, COMPLETED
+
+JOB_EVENTS_POLL_INTERVAL = float(os.getenv("JOB_EVENTS_POLL_INTERVAL", "0.5"))
+job_manager = create_job_manager()
+
+# The agents and the Supabase client are synchronous, so handlers hand them to dedicated thread
+# pools instead of running them on the event loop. Agent runs take minutes; database calls are
+# kept on their own pool so history reads never queue behind a long analysis.
+AGENT_MAX_WORKERS = int(os.getenv("AGENT_MAX_WORKERS", "8"))
+DB_MAX_WORKERS = int(os.getenv("DB_MAX_WORKERS", "8"))
+
+agent_executor = ThreadPoolExecutor(max_workers=AGENT_MAX_WORKERS, thread_name_prefix="agent")
+db_executor = ThreadPoolExecutor(max_workers=DB_MAX_WORKERS, thread_name_prefix="db")
+
+async def run_in_executor(executor: ThreadPoolExecutor, func: Callable, *args, **kwargs):
+    """Run a blocking function on `executor` without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
 
 app = FastAPI(title="Startup MVP Builder API", 
               description="API for analyzing startup ideas using AI agents", 
@@ -37,26 +81,317 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+# Agent and history responses are serialized in one pass, without jsonable_encoder
+from json_response import FastJSONResponse, dumps as json_dumps
+
+# Compress large JSON responses (gzip, or brotli when installed and accepted)
+from compression import CompressionMiddleware, RESPONSE_COMPRESSION_ENABLED
+
+if RESPONSE_COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
 class StartupIdeaRequest(BaseModel):
     startup_idea: str
     user_id: str
     session_id: str
 
+# market_report and product_roadmap may be omitted to use the output stored for the session
 class MarketReportRequest(BaseModel):
-    market_report: Dict[str, Any]
+    market_report: Optional[Dict[str, Any]] = None
     user_id: str
     session_id: str
     
 class ProductRoadmapRequest(BaseModel):
-    product_roadmap: Dict[str, Any]
+    product_roadmap: Optional[Dict[str, Any]] = None
     user_id: str
     session_id: str
 
 class SessionIdRequest(BaseModel):
     session_id: str
 
+def _stored_artifact(user_id: str, session_id: str, stage: str) -> Optional[Dict[str, Any]]:
+    return artifact_store.get(user_id, session_id, stage) if artifact_store is not None else None
+
+# agent_outputs column each stage is persisted to
+STAGE_COLUMNS = {
+    MARKET_ANALYSIS: MARKET_ANALYST_COLUMN,
+    PRODUCT_ROADMAP: PRODUCT_MANAGER_COLUMN,
+    TECHNICAL_BLUEPRINT: TECH_ARCHITECT_COLUMN
+}
+
+def record_outputs(request: BaseModel, outputs: Dict[str, Dict[str, Any]]):
+    """
+    Keep stage outputs in the artifact store and queue them for Supabase as soon as they exist.
+    
+    Args:
+        request (BaseModel): The endpoint's request body (for user_id and session_id)
+        outputs (dict): {stage: output}; ids and chaining fields are stripped before storing
+    """
+    columns = {}
+    for stage, output in outputs.items():
+        output = {k: v for k, v in output.items() if k not in ['user_id', 'session_id', '_market_analyst_data']}
+        if artifact_store is not None:
+            artifact_store.put(request.user_id, request.session_id, stage, output)
+        columns[STAGE_COLUMNS[stage]] = output
+    # Queued, not written: the database never holds up a response
+    store_agent_output_stage(request.user_id, request.session_id, **columns)
+
+def _unrecorded(request: BaseModel, outputs: Dict[str, Optional[Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """Earlier stage outputs a client sent in the request body that this server has not recorded yet"""
+    return {stage: output for stage, output in outputs.items()
+            if output and _stored_artifact(request.user_id, request.session_id, stage) is None}
+
+async def with_stored_artifact(request: BaseModel, field: str, stage: str, label: str) -> BaseModel:
+    """
+    Fill in an omitted request field from the artifact store.
+    
+    Only outputs the request's own user stored for the session are found.
+    
+    Args:
+        request (BaseModel): A MarketReportRequest or ProductRoadmapRequest
+        field (str): market_report or product_roadmap
+        stage (str): The artifact store stage holding that output
+        label (str): Human-readable name of the output for the error message
+        
+    Returns:
+        BaseModel: The request, with the field filled in if it was omitted
+        
+    Raises:
+        HTTPException: 404 if the field was omitted and nothing is stored for the session
+    """
+    if getattr(request, field) is not None:
+        return request
+    artifact = await run_in_executor(db_executor, _stored_artifact, request.user_id, request.session_id, stage)
+    if artifact is None:
+        raise HTTPException(status_code=404,
+                            detail=f"No {label} stored for session {request.session_id}; include {field} in the request")
+    return request.model_copy(update={field: artifact})
+
+# Agent runs shared by the request/response endpoints and the background jobs. They are blocking
+# and raise on failure; callers decide how to surface the error. Agent calls are coalesced by
+# their input, while outputs are still recorded under each request's own session.
+
+def _market_analysis(startup_idea: str, progress_callback: Optional[Callable[[str, str], None]],
+                     stream_callback: Optional[StreamCallback]) -> EnhancedMarketAnalysisReport:
+    return coalesce(
+        ("market", normalize_idea(startup_idea)),
+        lambda progress_callback, stream_callback: analyze_startup_market(startup_idea, progress_callback, stream_callback),
+        progress_callback=progress_callback, stream_callback=stream_callback
+    )
+
+def build_market_analysis(request: StartupIdeaRequest, progress_callback: Optional[Callable[[str, str], None]] = None,
+                          stream_callback: Optional[StreamCallback] = None) -> Dict[str, Any]:
+    """Run the market analyst agent and return the /market-analyst response"""
+    report = _market_analysis(request.startup_idea, progress_callback, stream_callback)
+    
+    if not report:
+        raise RuntimeError("Failed to generate market analysis report")
+    
+    # Include user_id and session_id in the response for chaining
+    response = {
+        **report.dict(),
+        "user_id": request.user_id,
+        "session_id": request.session_id
+    }
+    record_outputs(request, {MARKET_ANALYSIS: response})
+    return response
+
+def build_product_roadmap(request: MarketReportRequest, progress_callback: Optional[Callable[[str, str], None]] = None,
+                          stream_callback: Optional[StreamCallback] = None) -> Dict[str, Any]:
+    """Run the product manager agent and return the /product-manager response"""
+    # Remove user_id and session_id from market_report before conversion
+    market_data = {k: v for k, v in request.market_report.items() 
+                 if k not in ['user_id', 'session_id']}
+    
+    # Convert the input JSON to an EnhancedMarketAnalysisReport
+    market_report = EnhancedMarketAnalysisReport(**market_data)
+    
+    product_roadmap = coalesce(
+        ("product", fingerprint(market_data)),
+        lambda progress_callback, stream_callback: run_product_planning(market_report, progress_callback, stream_callback),
+        progress_callback=progress_callback, stream_callback=stream_callback
+    )
+    
+    if not product_roadmap:
+        raise RuntimeError("Failed to generate product roadmap")
+    
+    # Include user_id and session_id in the response for chaining
+    response = {
+        **product_roadmap.dict(),
+        "user_id": request.user_id,
+        "session_id": request.session_id
+    }
+    record_outputs(request, {**_unrecorded(request, {MARKET_ANALYSIS: market_data}), PRODUCT_ROADMAP: response})
+    # The artifact store is per process, so clients still carry the market report to the next stage
+    response["_market_analyst_data"] = market_data
+    return response
+
+def _roadmap_data(request: ProductRoadmapRequest) -> Dict[str, Any]:
+    # Remove user_id, session_id and the chained market data from product_roadmap before conversion
+    return {k: v for k, v in request.product_roadmap.items() 
+            if k not in ['user_id', 'session_id', '_market_analyst_data']}
+
+def build_technical_blueprint(request: ProductRoadmapRequest, progress_callback: Optional[Callable[[str, str], None]] = None,
+                              stream_callback: Optional[StreamCallback] = None) -> Dict[str, Any]:
+    """Run the technical architect agent and return the /technical-architect response"""
+    # Convert the input JSON to a ProductRoadmap object
+    roadmap_data = _roadmap_data(request)
+    product_roadmap = ProductRoadmap(**roadmap_data)
+    
+    tech_blueprint = coalesce(
+        ("architect", fingerprint(roadmap_data)),
+        lambda progress_callback, stream_callback: run_technical_architecture(product_roadmap, progress_callback,
+                                                                              stream_callback),
+        progress_callback=progress_callback, stream_callback=stream_callback
+    )
+    
+    if not tech_blueprint:
+        raise RuntimeError("Failed to generate technical blueprint")
+    
+    # Include user_id and session_id in the response
+    response = {
+        **tech_blueprint.dict(),
+        "user_id": request.user_id,
+        "session_id": request.session_id
+    }
+    record_outputs(request, {
+        **_unrecorded(request, {
+            MARKET_ANALYSIS: request.product_roadmap.get("_market_analyst_data"),
+            PRODUCT_ROADMAP: request.product_roadmap
+        }),
+        TECHNICAL_BLUEPRINT: response
+    })
+    return response
+
+def build_pipeline(request: StartupIdeaRequest, progress_callback: Optional[Callable[[str, str], None]] = None,
+                   stream_callback: Optional[StreamCallback] = None) -> Dict[str, Any]:
+    """
+    Run the market analyst, product manager and technical architect in one go and return the
+    three responses together, without round-tripping the intermediate reports through a client.
+    
+    The blueprint sections only need the startup idea and the prioritized feature lists, so they
+    are started from a partial roadmap as soon as the product manager has prioritized features,
+    overlapping the rest of product planning.
+    """
+    report = _market_analysis(request.startup_idea, progress_callback, stream_callback)
+    if not report:
+        raise RuntimeError("Failed to generate market analysis report")
+    # Each model is dumped once; the stores and the response share the dict
+    market_analysis = report.dict()
+    record_outputs(request, {MARKET_ANALYSIS: market_analysis})
+    
+    def plan(progress_callback, stream_callback, roadmap_callback):
+        tech_architect = TechnicalArchitectAgent(stream_callback)
+        sections = {}
+        
+        def start_blueprint(prioritization: Dict[str, Any]):
+            # Sections read only these fields, so an unvalidated partial roadmap is enough
+            partial_roadmap = ProductRoadmap.model_construct(
+                startup_idea=report.startup_idea,
+                mvp_features=prioritization["mvp_features"],
+                milestone_1_features=prioritization["milestone_1_features"],
+                milestone_2_features=prioritization["milestone_2_features"]
+            )
+            sections.update(tech_architect.start_sections(partial_roadmap))
+        
+        product_roadmap = run_product_planning(report, progress_callback, stream_callback,
+                                               prioritization_callback=start_blueprint)
+        if not product_roadmap:
+            for future in sections.values():
+                future.cancel()
+            raise RuntimeError("Failed to generate product roadmap")
+        roadmap_callback(product_roadmap)
+        
+        tech_blueprint = tech_architect.finish_blueprint(
+            product_roadmap.startup_idea,
+            sections or tech_architect.start_sections(product_roadmap),
+            progress_callback
+        )
+        return product_roadmap, tech_blueprint
+    
+    roadmap = {}
+    
+    def record_roadmap(product_roadmap: ProductRoadmap):
+        # Persists the roadmap before the blueprint is done, for the callers attached by then
+        if not roadmap:
+            roadmap.update(product_roadmap.dict())
+            record_outputs(request, {PRODUCT_ROADMAP: roadmap})
+    
+    # Requests for the same idea that are in flight together share planning and the blueprint too
+    product_roadmap, tech_blueprint = coalesce(("pipeline", fingerprint(market_analysis)), plan,
+                                               progress_callback=progress_callback, stream_callback=stream_callback,
+                                               roadmap_callback=record_roadmap)
+    # No-op once the roadmap callback has recorded it; covers a callback that failed
+    record_roadmap(product_roadmap)
+    
+    blueprint = tech_blueprint.dict()
+    record_outputs(request, {TECHNICAL_BLUEPRINT: blueprint})
+    
+    ids = {"user_id": request.user_id, "session_id": request.session_id}
+    return {
+        "market_analysis": {**market_analysis, **ids},
+        "product_roadmap": {**roadmap, **ids},
+        "technical_blueprint": {**blueprint, **ids},
+        **ids
+    }
+
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json_dumps(data).decode('utf-8')}\n\n"
+
+# Tasks driving streamed responses; held here so they finish even if the client disconnects
+_stream_tasks = set()
+
+def stream_agent_response(build: Callable[..., Dict[str, Any]], request: BaseModel, error_prefix: str) -> StreamingResponse:
+    """
+    Run an agent and stream its output as server-sent events.
+    
+    Events are `progress` (a finished step), `token` (generated text), `section` (a completed
+    top-level part of the JSON being generated), `item` (a completed element of a list section),
+    then `result` with the same body the non-streaming endpoint returns, or `error`.
+    
+    Args:
+        build (callable): One of the build_* helpers
+        request (BaseModel): The endpoint's request body
+        error_prefix (str): Prefix of the error detail, matching the non-streaming endpoint
+        
+    Returns:
+        StreamingResponse: The event stream
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    
+    def publish(event: str, data: Dict[str, Any]):
+        # Called from agent worker threads
+        loop.call_soon_threadsafe(queue.put_nowait, (event, data))
+    
+    def progress(step: str, message: str = ""):
+        publish("progress", {"step": step, "message": message})
+    
+    async def run():
+        try:
+            response = await run_in_executor(agent_executor, build, request, progress, publish)
+            queue.put_nowait(("result", response))
+        except Exception as e:
+            queue.put_nowait(("error", {"detail": f"{error_prefix}: {str(e)}"}))
+        queue.put_nowait((None, None))
+    
+    task = asyncio.create_task(run())
+    _stream_tasks.add(task)
+    task.add_done_callback(_stream_tasks.discard)
+    
+    async def events():
+        while True:
+            event, data = await queue.get()
+            if event is None:
+                return
+            yield _sse_event(event, data)
+    
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 @app.get("/")
 async def root():
     return {
@@ -77,21 +412,76 @@ async def root():
                 "method": "POST",
                 "description": "Run technical architect agent using product manager results"
             },
+            {
+                "path": "/pipeline",
+                "method": "POST",
+                "description": "Run all three agents for a startup idea in one request"
+            },
+            {
+                "path": "/jobs/market-analyst",
+                "method": "POST",
+                "description": "Queue a market analysis job and return its job_id"
+            },
+            {
+                "path": "/jobs/product-manager",
+                "method": "POST",
+                "description": "Queue a product manager job and return its job_id"
+            },
+            {
+                "path": "/jobs/technical-architect",
+                "method": "POST",
+                "description": "Queue a technical architect job and return its job_id"
+            },
+            {
+                "path": "/jobs/pipeline",
+                "method": "POST",
+                "description": "Queue a full pipeline run and return its job_id"
+            },
+            {
+                "path": "/jobs/{job_id}",
+                "method": "GET",
+                "description": "Get the status, progress and result of a job"
+            },
+            {
+                "path": "/jobs/{job_id}/events",
+                "method": "GET",
+                "description": "Stream job progress as server-sent events"
+            },
+            {
+                "path": "/cache/stats",
+                "method": "GET",
+                "description": "Hit ratios of the search, page, LLM completion and history caches"
+            },
+            {
+                "path": "/llm/stats",
+                "method": "GET",
+                "description": "In-flight and queued OpenAI calls and connection pool settings"
+            },
+            {
+                "path": "/outputs/stats",
+                "method": "GET",
+                "description": "Pending, written and failed Supabase writes of agent outputs"
+            },
             {
                 "path": "/outputs/user/{user_id}",
                 "method": "GET",
-                "description": "Get all agent outputs for a user"
+                "description": "Get a page of a user's history (summary columns, keyset-paginated)"
             },
             {
                 "path": "/outputs/session",
                 "method": "POST", 
                 "description": "Get agent outputs for a specific session"
+            },
+            {
+                "path": "/outputs/session/{session_id}",
+                "method": "GET",
+                "description": "Get agent outputs for a specific session (ETag / 304 support)"
             }
         ]
     }
 
 @app.post("/market-analyst")
-async def market_analyst(request: StartupIdeaRequest):
+async def market_analyst(request: StartupIdeaRequest, stream: bool = False):
     """
     Analyze market opportunities for a startup idea.
     
@@ -100,34 +490,23 @@ async def market_analyst(request: StartupIdeaRequest):
     opportunities, and strategic recommendations.
     
     The user_id and session_id are used to track the request through the agent chain.
+    With `?stream=true` the output is streamed as server-sent events while it is generated.
     """
     if not request.startup_idea or len(request.startup_idea.strip()) < 5:
         raise HTTPException(status_code=400, detail="Please provide a valid startup idea with at least 5 characters")
     
+    if stream:
+        return stream_agent_response(build_market_analysis, request, "Error analyzing market")
+    
     try:
         # Run the market analysis
-        report = analyze_startup_market(request.startup_idea)
-        
-        if not report:
-            raise HTTPException(status_code=500, detail="Failed to generate market analysis report")
-        
-        # Convert the Pydantic model to a dictionary
-        report_dict = report.dict()
-        
-        # Include user_id and session_id in the response for chaining
-        response = {
-            **report_dict,
-            "user_id": request.user_id,
-            "session_id": request.session_id
-        }
-        
-        return response
+        return FastJSONResponse(await run_in_executor(agent_executor, build_market_analysis, request))
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error analyzing market: {str(e)}")
 
 @app.post("/product-manager")
-async def product_manager(request: MarketReportRequest):
+async def product_manager(request: MarketReportRequest, stream: bool = False):
     """
     Generate product roadmap based on market analysis report.
     
@@ -135,41 +514,24 @@ async def product_manager(request: MarketReportRequest):
     and create a comprehensive product roadmap with user personas, features, 
     and prioritization.
     
-    The input should be the JSON output from the market-analyst endpoint.
+    The input should be the JSON output from the market-analyst endpoint, or just the
+    user_id and session_id to use the market report stored for that session.
     The user_id and session_id are used to track the request through the agent chain.
+    With `?stream=true` the output is streamed as server-sent events while it is generated.
     """
+    request = await with_stored_artifact(request, "market_report", MARKET_ANALYSIS, "market report")
+    if stream:
+        return stream_agent_response(build_product_roadmap, request, "Error generating product roadmap")
+    
     try:
-        # Remove user_id and session_id from market_report before conversion
-        market_data = {k: v for k, v in request.market_report.items() 
-                     if k not in ['user_id', 'session_id']}
-        
-        # Convert the input JSON to an EnhancedMarketAnalysisReport
-        market_report = EnhancedMarketAnalysisReport(**market_data)
-        
         # Run the product manager agent
-        product_roadmap = run_product_planning(market_report)
-        
-        if not product_roadmap:
-            raise HTTPException(status_code=500, detail="Failed to generate product roadmap")
-        
-        # Convert the Pydantic model to a dictionary
-        roadmap_dict = product_roadmap.dict()
-        
-        # Include user_id and session_id in the response for chaining
-        response = {
-            **roadmap_dict,
-            "user_id": request.user_id,
-            "session_id": request.session_id,
-            "_market_analyst_data": market_data  # Include market analyst data for storage
-        }
-        
-        return response
+        return FastJSONResponse(await run_in_executor(agent_executor, build_product_roadmap, request))
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating product roadmap: {str(e)}")
 
 @app.post("/technical-architect")
-async def technical_architect(request: ProductRoadmapRequest):
+async def technical_architect(request: ProductRoadmapRequest, stream: bool = False):
     """
     Generate technical blueprint based on product roadmap.
     
@@ -177,80 +539,246 @@ async def technical_architect(request: ProductRoadmapRequest):
     and create a comprehensive technical blueprint with technology stack recommendations,
     database schema design, API endpoints, deployment strategy, and more.
     
-    The input should be the JSON output from the product-manager endpoint.
+    The input should be the JSON output from the product-manager endpoint, or just the
+    user_id and session_id to use the roadmap stored for that session.
     The user_id and session_id are used to track the request through the agent chain.
-    After generating the blueprint, all agent outputs are stored in Supabase.
+    Every agent's output is queued for Supabase as soon as its stage completes.
     
     This endpoint uses an enhanced implementation that ensures all JSON responses
     are properly normalized before being parsed into Pydantic models, which prevents
     validation errors that might occur with inconsistent AI model responses.
+    
+    With `?stream=true` the output is streamed as server-sent events while it is generated;
+    the nine blueprint sections are generated concurrently, so their events interleave.
     """
+    request = await with_stored_artifact(request, "product_roadmap", PRODUCT_ROADMAP, "product roadmap")
+    if stream:
+        return stream_agent_response(build_technical_blueprint, request, "Error generating technical blueprint")
+    
     try:
-        user_id = request.user_id
-        session_id = request.session_id
-        
-        # Remove user_id and session_id from product_roadmap before conversion
-        roadmap_data = {k: v for k, v in request.product_roadmap.items() 
-                      if k not in ['user_id', 'session_id', '_market_analyst_data']}
-        
-        # Extract market analyst data
-        market_analyst_data = request.product_roadmap.get("_market_analyst_data", {})
-        
-        # Convert the input JSON to a ProductRoadmap object
-        product_roadmap = ProductRoadmap(**roadmap_data)
-        
         # Run the technical architect agent
-        tech_blueprint = run_technical_architecture(product_roadmap)
-        
-        if not tech_blueprint:
-            raise HTTPException(status_code=500, detail="Failed to generate technical blueprint")
-        
-        # Convert the Pydantic model to a dictionary
-        blueprint_dict = tech_blueprint.dict()
-        
-        # Include user_id and session_id in the response
-        response = {
-            **blueprint_dict,
-            "user_id": user_id,
-            "session_id": session_id
-        }
-        
-        # Store all agent outputs in Supabase
-        try:
-            # Store all outputs in Supabase
-            store_agent_outputs(
-                user_id=user_id,
-                session_id=session_id,
-                market_analyst_response=market_analyst_data,
-                product_manager_response=roadmap_data,
-                tech_architect_response=blueprint_dict
-            )
-        except Exception as db_error:
-            # Log the error but don't fail the request
-            print(f"Error storing agent outputs in database: {str(db_error)}")
-        
-        return response
+        return FastJSONResponse(await run_in_executor(agent_executor, build_technical_blueprint, request))
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating technical blueprint: {str(e)}")
 
+@app.post("/pipeline")
+async def pipeline(request: StartupIdeaRequest, stream: bool = False):
+    """
+    Run the market analyst, product manager and technical architect for a startup idea.
+    
+    Equivalent to calling /market-analyst, /product-manager and /technical-architect in turn,
+    but the intermediate reports stay on the server instead of being posted back by the client,
+    and the blueprint sections start as soon as features are prioritized. The response holds
+    the three endpoints' responses under `market_analysis`, `product_roadmap` and
+    `technical_blueprint`; each output is queued for Supabase as soon as its stage completes.
+    
+    With `?stream=true` progress and generated output of every stage are streamed as
+    server-sent events, ending with a `result` event holding the same body.
+    """
+    if stream:
+        return stream_agent_response(build_pipeline, request, "Error running agent pipeline")
+    
+    try:
+        return FastJSONResponse(await run_in_executor(agent_executor, build_pipeline, request))
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error running agent pipeline: {str(e)}")
+
+def _job_accepted(job) -> Dict[str, Any]:
+    return {
+        "job_id": job.job_id,
+        "status": job.status,
+        "status_url": f"/jobs/{job.job_id}",
+        "events_url": f"/jobs/{job.job_id}/events"
+    }
+
+@app.post("/jobs/market-analyst", status_code=202)
+async def submit_market_analyst_job(request: StartupIdeaRequest):
+    """
+    Queue a market analysis and return immediately.
+    
+    The job runs the same agent as /market-analyst; its result is that endpoint's response.
+    Poll /jobs/{job_id} or subscribe to /jobs/{job_id}/events to follow it.
+    """
+    if not request.startup_idea or len(request.startup_idea.strip()) < 5:
+        raise HTTPException(status_code=400, detail="Please provide a valid startup idea with at least 5 characters")
+    job = job_manager.submit("market-analyst", build_market_analysis, request,
+                             user_id=request.user_id, session_id=request.session_id)
+    return _job_accepted(job)
+
+@app.post("/jobs/product-manager", status_code=202)
+async def submit_product_manager_job(request: MarketReportRequest):
+    """
+    Queue a product roadmap run and return immediately.
+    
+    The job runs the same agent as /product-manager; its result is that endpoint's response.
+    """
+    request = await with_stored_artifact(request, "market_report", MARKET_ANALYSIS, "market report")
+    job = job_manager.submit("product-manager", build_product_roadmap, request,
+                             user_id=request.user_id, session_id=request.session_id)
+    return _job_accepted(job)
+
+@app.post("/jobs/technical-architect", status_code=202)
+async def submit_technical_architect_job(request: ProductRoadmapRequest):
+    """
+    Queue a technical blueprint run and return immediately.
+    
+    The job runs the same agent as /technical-architect; its result is that endpoint's response.
+    """
+    request = await with_stored_artifact(request, "product_roadmap", PRODUCT_ROADMAP, "product roadmap")
+    job = job_manager.submit("technical-architect", build_technical_blueprint, request,
+                             user_id=request.user_id, session_id=request.session_id)
+    return _job_accepted(job)
+
+@app.post("/jobs/pipeline", status_code=202)
+async def submit_pipeline_job(request: StartupIdeaRequest):
+    """
+    Queue a full pipeline run and return immediately.
+    
+    The job runs the same stages as /pipeline; its result is that endpoint's response.
+    """
+    job = job_manager.submit("pipeline", build_pipeline, request,
+                             user_id=request.user_id, session_id=request.session_id)
+    return _job_accepted(job)
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Get the status, progress events and, once finished, the result or error of a job.
+    
+    Args:
+        job_id (str): The ID returned when the job was submitted
+        
+    Returns:
+        dict: The job record
+    """
+    job = await run_in_executor(db_executor, job_manager.get, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"No job found with id {job_id}")
+    return FastJSONResponse(job.dict())
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """
+    Stream a job's progress as server-sent events.
+    
+    Each progress step is sent as a `progress` event. The stream ends with a `completed` event
+    carrying the result or a `failed` event carrying the error.
+    """
+    job = await run_in_executor(db_executor, job_manager.get, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"No job found with id {job_id}")
+
+    async def events():
+        sent = 0
+        current = job
+        last_status = None
+        while True:
+            if current is None:
+                yield _sse_event("failed", {"job_id": job_id, "error": "Job expired"})
+                return
+            for progress_event in current.progress[sent:]:
+                yield _sse_event("progress", {"job_id": job_id, **progress_event})
+            sent = len(current.progress)
+            if current.status in FINISHED_STATUSES:
+                if current.status == COMPLETED:
+                    yield _sse_event("completed", {"job_id": job_id, "result": current.result})
+                else:
+                    yield _sse_event("failed", {"job_id": job_id, "error": current.error})
+                return
+            if current.status != last_status:
+                yield _sse_event("status", {"job_id": job_id, "status": current.status})
+                last_status = current.status
+            await asyncio.sleep(JOB_EVENTS_POLL_INTERVAL)
+            current = await run_in_executor(db_executor, job_manager.get, job_id)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison, so a W/ prefix is ignored
+    etag = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+def etag_response(request: Request, content: Any) -> Response:
+    """
+    Return `content` as JSON with a weak ETag computed from the body.
+    
+    The ETag is weak because the compression middleware may send the body gzip- or
+    brotli-encoded; those bytes differ from the identity body while the content is the same.
+    
+    If the request's If-None-Match already names that ETag an empty 304 is returned instead,
+    so a client revalidating an unchanged history page or session downloads nothing.
+    
+    Args:
+        request (Request): The incoming request
+        content: The JSON-serialisable response body
+        
+    Returns:
+        Response: A 200 JSON response or a 304
+    """
+    response = FastJSONResponse(content)
+    headers = {
+        "ETag": f'W/"{hashlib.sha256(response.body).hexdigest()[:32]}"',
+        # Clients may keep the body but must revalidate before reusing it
+        "Cache-Control": "private, no-cache"
+    }
+    if _etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return response
+
 @app.get("/outputs/user/{user_id}")
-async def get_user_outputs(user_id: str):
+async def get_user_outputs(http_request: Request, user_id: str, limit: int = HISTORY_PAGE_SIZE,
+                           cursor: Optional[str] = None):
     """
-    Get all agent outputs for a specific user.
+    Get one page of a user's history, newest first.
+    
+    Each entry holds only session_id, created_at, startup_idea and opportunity_score; load a
+    session's full outputs from /outputs/session. Pass `next_cursor` back as `cursor` to get the
+    next page; it is null on the last page. The page carries an ETag, and a request whose
+    If-None-Match matches it gets a 304.
     
     Args:
         user_id (str): The ID of the user
+        limit (int): Entries per page
+        cursor (str): `next_cursor` of the previous page
         
     Returns:
-        list: A list of agent outputs
+        dict: {"outputs": [...], "next_cursor": ...}
     """
     try:
-        outputs = get_agent_outputs_by_user(user_id)
-        return {"outputs": outputs}
+        await flush_pending_outputs(user_id=user_id)
+        outputs, next_cursor = await run_in_executor(db_executor, get_agent_outputs_by_user, user_id, limit, cursor)
+        return etag_response(http_request, {"outputs": outputs, "next_cursor": next_cursor})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving agent outputs: {str(e)}")
 
+async def flush_pending_outputs(user_id: Optional[str] = None, session_id: Optional[str] = None):
+    """Let queued writes of the user or session land before a read, so it sees them; others are not waited for"""
+    if agent_output_writer.has_pending(user_id=user_id, session_id=session_id):
+        await run_in_executor(db_executor, agent_output_writer.flush, OUTPUT_READ_FLUSH_TIMEOUT,
+                              user_id=user_id, session_id=session_id)
+
+async def load_session_output(session_id: str) -> Dict[str, Any]:
+    try:
+        await flush_pending_outputs(session_id=session_id)
+        output = await run_in_executor(db_executor, get_agent_output_by_session, session_id)
+        if not output:
+            raise HTTPException(status_code=404, detail=f"No output found for session {session_id}")
+        return output
+    except Exception as e:
+        if isinstance(e, HTTPException):
+            raise e
+        raise HTTPException(status_code=500, detail=f"Error retrieving agent outputs: {str(e)}")
+
 @app.post("/outputs/session")
 async def get_session_output(request: SessionIdRequest):
     """
@@ -262,15 +790,65 @@ async def get_session_output(request: SessionIdRequest):
     Returns:
         dict: The agent outputs for the session
     """
-    try:
-        output = get_agent_output_by_session(request.session_id)
-        if not output:
-            raise HTTPException(status_code=404, detail=f"No output found for session {request.session_id}")
-        return output
-    except Exception as e:
-        if isinstance(e, HTTPException):
-            raise e
-        raise HTTPException(status_code=500, detail=f"Error retrieving agent outputs: {str(e)}")
+    return await load_session_output(request.session_id)
+
+@app.get("/outputs/session/{session_id}")
+async def get_session_output_by_id(http_request: Request, session_id: str):
+    """
+    Get agent outputs for a specific session, with an ETag.
+    
+    Same body as POST /outputs/session; a request whose If-None-Match matches the ETag gets a 304,
+    so browsers revalidating a session they already loaded download nothing.
+    
+    Args:
+        session_id (str): The ID of the session
+        
+    Returns:
+        dict: The agent outputs for the session
+    """
+    return etag_response(http_request, await load_session_output(session_id))
+
+@app.get("/outputs/stats")
+async def output_write_stats():
+    """
+    Get the Supabase write-behind queue's counters: rows pending, rows written, upsert requests,
+    retries and rows dropped after the last retry failed.
+    """
+    return agent_output_writer.stats()
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """
+    Get hit/miss counters and sizes of the caches, with LLM completion hits broken down per agent,
+    the session artifact store's memory and spill usage, and the history cache's invalidations.
+    
+    Returns:
+        dict: Statistics per cache; a disabled cache is reported as null
+    """
+    caches = {
+        "search": search_cache,
+        "pages": page_cache,
+        "completions": llm_cache.completion_cache,
+        "artifacts": artifact_store,
+        "history": history_cache
+    }
+    return await run_in_executor(
+        db_executor,
+        lambda: {name: cache.stats() if cache is not None else None for name, cache in caches.items()}
+    )
+
+@app.get("/llm/stats")
+async def llm_stats():
+    """
+    Get the OpenAI scheduler's counters: calls in flight, calls queued (per priority), completed
+    calls, retries, 429s, admission wait times, the configured budgets and the connection pool limits,
+    plus how many agent runs were shared by identical requests in flight together.
+    """
+    return {
+        **llm_scheduler.stats(),
+        **llm_client_manager.stats(),
+        "single_flight": single_flight.stats() if single_flight is not None else None
+    }
 
 @app.get("/ping")
 async def ping():
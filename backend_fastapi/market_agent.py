@@ -1,19 +1,110 @@
-from openai import OpenAI
 import os
-import requests
 import json
 import re
 from bs4 import BeautifulSoup
-import time
 from pydantic import BaseModel, Field
-from typing import List, Dict, Optional, Union, Any, Tuple
+from typing import List, Dict, Optional, Union, Any, Tuple, Callable
 from dotenv import load_dotenv
 from datetime import datetime
 import urllib.parse
+import codecs
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from rate_limiter import TokenBucket
+from http_client import get_http_client, iter_bytes
+from disk_cache import SQLiteCache
+from idea_index import IdeaIndex
+from html_extractor import PageExtractor, extract_page_data
+from llm_stream import complete_chat, StreamCallback
+from llm_client import get_llm_client
+from llm_scheduler import INTERACTIVE
 
 # Load environment variables
 load_dotenv()
 
+# Google Custom Search endpoint; override GOOGLE_SEARCH_ENDPOINT to point at a local stub server
+GOOGLE_SEARCH_ENDPOINT = os.getenv("GOOGLE_SEARCH_ENDPOINT", "https://www.googleapis.com/customsearch/v1")
+GOOGLE_SEARCH_CX = os.getenv("GOOGLE_SEARCH_CX", "067d494017eff402d")
+SCRAPER_HTML_PARSER = os.getenv("SCRAPER_HTML_PARSER", "stream")
+SCRAPER_MAX_BYTES = int(os.getenv("SCRAPER_MAX_BYTES", str(2 * 1024 * 1024)))
+SCRAPER_MAX_TEXT_CHARS = int(os.getenv("SCRAPER_MAX_TEXT_CHARS", "50000"))
+SCRAPER_CHUNK_SIZE = 16384
+SCRAPER_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# Google Custom Search quota. The JSON API allows 100 queries per minute per project by default;
+# the bucket lets a request burst its searches and then throttles to the sustained rate.
+GOOGLE_SEARCH_QUERIES_PER_MINUTE = float(os.getenv("GOOGLE_SEARCH_QUERIES_PER_MINUTE", "100"))
+GOOGLE_SEARCH_BURST = float(os.getenv("GOOGLE_SEARCH_BURST", "10"))
+SEARCH_MAX_WORKERS = int(os.getenv("SEARCH_MAX_WORKERS", "9"))
+
+# Shared across all agents in the process so concurrent requests draw from the same quota
+search_rate_limiter = TokenBucket(rate=GOOGLE_SEARCH_QUERIES_PER_MINUTE / 60.0, capacity=GOOGLE_SEARCH_BURST)
+_search_executor = ThreadPoolExecutor(max_workers=SEARCH_MAX_WORKERS, thread_name_prefix="search")
+
+# Persistent cache of Google Custom Search results, keyed on the normalized query and result count
+SEARCH_CACHE_ENABLED = os.getenv("SEARCH_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+SEARCH_CACHE_PATH = os.getenv("SEARCH_CACHE_PATH", os.path.join("cache", "market_cache.sqlite3"))
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", str(7 * 24 * 3600)))
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "20000"))
+
+search_cache = SQLiteCache(SEARCH_CACHE_PATH, "search_results", SEARCH_CACHE_TTL, SEARCH_CACHE_MAX_ENTRIES) if SEARCH_CACHE_ENABLED else None
+
+# Scraped competitor pages: the extracted result plus the validators needed to revalidate it
+PAGE_CACHE_ENABLED = os.getenv("PAGE_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+PAGE_CACHE_TTL = float(os.getenv("PAGE_CACHE_TTL", str(24 * 3600)))
+PAGE_CACHE_MAX_ENTRIES = int(os.getenv("PAGE_CACHE_MAX_ENTRIES", "5000"))
+
+page_cache = SQLiteCache(SEARCH_CACHE_PATH, "scraped_pages", PAGE_CACHE_TTL, PAGE_CACHE_MAX_ENTRIES) if PAGE_CACHE_ENABLED else None
+
+# Past ideas and their research. A near-duplicate idea reuses the searches and competitor analyses
+# outright; a merely similar one runs fresh searches but skips re-scraping competitors it shares
+IDEA_INDEX_ENABLED = os.getenv("IDEA_INDEX_ENABLED", "true").lower() in ("1", "true", "yes")
+IDEA_INDEX_TTL = float(os.getenv("IDEA_INDEX_TTL", str(7 * 24 * 3600)))
+IDEA_INDEX_MAX_ENTRIES = int(os.getenv("IDEA_INDEX_MAX_ENTRIES", "2000"))
+IDEA_REUSE_THRESHOLD = float(os.getenv("IDEA_REUSE_THRESHOLD", "0.85"))
+IDEA_WARM_START_THRESHOLD = float(os.getenv("IDEA_WARM_START_THRESHOLD", "0.5"))
+
+idea_index = IdeaIndex(
+    SQLiteCache(SEARCH_CACHE_PATH, "idea_index", IDEA_INDEX_TTL, IDEA_INDEX_MAX_ENTRIES),
+    reuse_threshold=IDEA_REUSE_THRESHOLD,
+    warm_start_threshold=IDEA_WARM_START_THRESHOLD
+) if IDEA_INDEX_ENABLED else None
+
+def _is_html_content_type(content_type: str) -> bool:
+    """Whether a Content-Type header describes an HTML page worth scraping"""
+    media_type = content_type.split(';', 1)[0].strip().lower()
+    return media_type in ('text/html', 'application/xhtml+xml')
+
+def _charset_from_content_type(content_type: str) -> Optional[str]:
+    """The charset parameter of a Content-Type header, if any"""
+    match = re.search(r'charset\s*=\s*["\']?([\w.:-]+)', content_type, re.IGNORECASE)
+    return match.group(1) if match else None
+
+def search_cache_key(query: str, num_results: int) -> str:
+    """Cache key for a search: case and whitespace differences in the query map to the same entry"""
+    normalized_query = re.sub(r'\s+', ' ', query).strip().lower()
+    return f"{num_results}:{normalized_query}"
+
+# Competitor deep-dive pipeline: how many competitors we want, how many candidates may be
+# analyzed at once, and how many simultaneous scrapes a single host may receive.
+COMPETITORS_NEEDED = 3
+MAX_COMPETITOR_CANDIDATES = 10
+COMPETITOR_MAX_IN_FLIGHT = int(os.getenv("COMPETITOR_MAX_IN_FLIGHT", "5"))
+SCRAPE_PER_HOST_LIMIT = int(os.getenv("SCRAPE_PER_HOST_LIMIT", "1"))
+
+_competitor_executor = ThreadPoolExecutor(max_workers=COMPETITOR_MAX_IN_FLIGHT, thread_name_prefix="competitor")
+_host_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+_host_semaphores_lock = threading.Lock()
+
+def _host_semaphore(url: str) -> threading.BoundedSemaphore:
+    """Return the semaphore that limits concurrent scrapes of the host serving `url`"""
+    host = urllib.parse.urlparse(url).netloc.lower()
+    with _host_semaphores_lock:
+        if host not in _host_semaphores:
+            _host_semaphores[host] = threading.BoundedSemaphore(SCRAPE_PER_HOST_LIMIT)
+        return _host_semaphores[host]
+
 class CompetitorInfo(BaseModel):
     name: str = Field(description="Name of the competitor company")
     website: Optional[str] = Field(default=None, description="URL of the competitor's website")
@@ -87,19 +178,37 @@ class EnhancedMarketAnalysisReport(BaseModel):
     next_steps: List[str] = Field(description="Recommended next steps for validation")
 
 class EnhancedMarketResearchAgent:
-    def __init__(self):
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    agent_name = "market_analyst"  # label for shared completion cache statistics
+    
+    def __init__(self, stream_callback: Optional[StreamCallback] = None, priority: int = INTERACTIVE):
+        self.client = get_llm_client()
         self.model = "gpt-4o-mini"
+        self.stream_callback = stream_callback  # set to stream the analysis as it is generated
+        self.priority = priority  # scheduling priority of this agent's OpenAI calls
+        self.competitor_pipeline_stats = {}
         
-    def google_search(self, query: str, num_results: int = 10) -> List[Dict]:
-        """Enhanced Google search with better error handling"""
-        api_key = os.getenv("GOOGLE_SEARCH_API_KEY")
-        cx = "067d494017eff402d"
+    def google_search(self, query: str, num_results: int = 10, use_cache: bool = True) -> List[Dict]:
+        """Enhanced Google search with better error handling
+
+        Results are served from the persistent search cache when available. Pass
+        use_cache=False to bypass the cache lookup and always hit the API.
+        """
+        cache_key = search_cache_key(query, num_results)
+        if search_cache is not None and use_cache:
+            cached_results = search_cache.get(cache_key)
+            if cached_results is not None:
+                return cached_results
         
-        url = f"https://www.googleapis.com/customsearch/v1?key={api_key}&cx={cx}&q={query}&num={num_results}"
+        params = {
+            'key': os.getenv("GOOGLE_SEARCH_API_KEY"),
+            'cx': GOOGLE_SEARCH_CX,
+            'q': query,
+            'num': num_results
+        }
         
         try:
-            response = requests.get(url)
+            search_rate_limiter.acquire()
+            response = get_http_client().get(GOOGLE_SEARCH_ENDPOINT, params=params)
             data = response.json()
             
             if 'items' not in data:
@@ -114,63 +223,178 @@ class EnhancedMarketResearchAgent:
                     'snippet': item.get('snippet', ''),
                     'displayLink': item.get('displayLink', '')
                 })
+            
+            # Only real results are cached so quota errors and empty pages are retried next time
+            if search_cache is not None:
+                search_cache.set(cache_key, results)
             return results
         except Exception as e:
-            print(f"Search error for '{query}': {str(e, flush=True)}", flush=True)
+            print(f"Search error for '{query}': {str(e)}", flush=True)
             return []
 
-    def enhanced_scrape_website(self, url: str) -> Dict:
-        """Enhanced web scraping with more data extraction"""
+    def enhanced_scrape_website(self, url: str, use_cache: bool = True) -> Dict:
+        """Enhanced web scraping with more data extraction
+
+        Extracted results are kept in the page cache. A fresh entry is returned without any
+        network traffic; a stale one is revalidated with If-None-Match / If-Modified-Since so
+        an unchanged page costs a 304 instead of a download and parse. Pass use_cache=False
+        to always fetch and parse the page.
+        """
+        cached_entry = page_cache.get_entry(url) if page_cache is not None and use_cache else None
+        if cached_entry is not None and not cached_entry['expired']:
+            page_cache.record_hit()
+            return cached_entry['value']['result']
+        
         try:
             headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+                'User-Agent': SCRAPER_USER_AGENT
             }
-            response = requests.get(url, headers=headers, timeout=15)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Remove script and style elements
-            for script in soup(['script', 'style', 'nav', 'footer']):
-                script.extract()
-            
-            # Extract title and description
-            title = soup.title.string if soup.title else "No title found"
-            meta_desc = ""
-            meta_tag = soup.find('meta', attrs={'name': 'description'})
-            if meta_tag:
-                meta_desc = meta_tag.get('content', '')
+            if cached_entry is not None:
+                if cached_entry['value'].get('etag'):
+                    headers['If-None-Match'] = cached_entry['value']['etag']
+                if cached_entry['value'].get('last_modified'):
+                    headers['If-Modified-Since'] = cached_entry['value']['last_modified']
             
-            # Extract main content
-            text = soup.get_text(separator=' ', strip=True)
-            text = re.sub(r'\s+', ' ', text)
-            
-            # Extract pricing information (enhanced)
-            pricing_info = self._extract_pricing_info(soup, text)
-            
-            # Extract features (enhanced)
-            features = self._extract_features(soup, text)
-            
-            # Extract contact/about information
-            about_info = self._extract_about_info(soup, text)
+            response = get_http_client().get(url, headers=headers, stream=True)
+            try:
+                if response.status_code == 304 and cached_entry is not None:
+                    page_cache.touch(url)
+                    page_cache.record_revalidation()
+                    return cached_entry['value']['result']
+                
+                content_type = response.headers.get('Content-Type', '')
+                if content_type and not _is_html_content_type(content_type):
+                    return {'url': url, 'error': f"Skipped non-HTML content: {content_type}"}
+                
+                result, truncated = self._read_page(response, url, _charset_from_content_type(content_type))
+            finally:
+                response.close()
             
-            # Try to find social media links
-            social_links = self._extract_social_links(soup)
-            
-            return {
-                'title': title,
-                'url': url,
-                'meta_description': meta_desc,
-                'text_sample': text[:1000],
-                'features': features,
-                'pricing_info': pricing_info,
-                'about_info': about_info,
-                'social_links': social_links,
-                'content_length': len(text)
-            }
+            if page_cache is not None:
+                page_cache.record_miss()
+                if response.status_code == 200:
+                    # The validators describe the whole page; a 304 must not keep a cut-off copy alive
+                    page_cache.set(url, {
+                        'result': result,
+                        'etag': None if truncated else response.headers.get('ETag'),
+                        'last_modified': None if truncated else response.headers.get('Last-Modified')
+                    })
+            return result
             
         except Exception as e:
-            print(f"Scraping error for {url}: {str(e, flush=True)}", flush=True)
+            print(f"Scraping error for {url}: {str(e)}", flush=True)
             return {'url': url, 'error': str(e)}
 
+    def _read_page(self, response, url: str, encoding: Optional[str]) -> Tuple[Dict, bool]:
+        """Stream a page body into the extractor, decoding as it arrives.
+
+        Reading stops once SCRAPER_MAX_BYTES have been received or the extracted text reaches
+        SCRAPER_MAX_TEXT_CHARS, which is far more than the prompt ever uses.
+
+        Returns:
+            tuple: (the page result, whether the byte budget cut the body short)
+        """
+        try:
+            decoder = codecs.getincrementaldecoder(encoding or 'utf-8')(errors='replace')
+        except LookupError:
+            decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        
+        extractor = PageExtractor() if SCRAPER_HTML_PARSER != "soup" else None
+        html_parts = []
+        received = 0
+        truncated = False
+        
+        for chunk in iter_bytes(response, SCRAPER_CHUNK_SIZE):
+            if received + len(chunk) > SCRAPER_MAX_BYTES:
+                chunk = chunk[:SCRAPER_MAX_BYTES - received]
+            received += len(chunk)
+            
+            html = decoder.decode(chunk)
+            if extractor is not None:
+                extractor.feed(html)
+            else:
+                html_parts.append(html)
+            
+            if received >= SCRAPER_MAX_BYTES or (extractor is not None and extractor.text_length >= SCRAPER_MAX_TEXT_CHARS):
+                truncated = received >= SCRAPER_MAX_BYTES
+                print(f"  Stopped reading {url} after {received} bytes", flush=True)
+                break
+        
+        html = decoder.decode(b'', final=True)
+        if extractor is None:
+            return self._parse_page_with_soup("".join(html_parts) + html, url), truncated
+        extractor.feed(html)
+        return self._build_page_result(extractor.close(), url), truncated
+
+    def _parse_page(self, html: str, url: str) -> Dict:
+        """Extract title, description, features, pricing, about and social data from a page
+
+        Uses the single-pass streaming extractor unless SCRAPER_HTML_PARSER=soup selects the
+        BeautifulSoup tree implementation; both return identical results.
+        """
+        if SCRAPER_HTML_PARSER == "soup":
+            return self._parse_page_with_soup(html, url)
+        
+        return self._build_page_result(extract_page_data(html), url)
+
+    def _build_page_result(self, page_data: Dict, url: str) -> Dict:
+        """Shape the extractor output like the scraped_data dicts used throughout the agent"""
+        text = page_data['text']
+        return {
+            'title': page_data['title'],
+            'url': url,
+            'meta_description': page_data['meta_description'],
+            'text_sample': text[:1000],
+            'features': page_data['features'],
+            'pricing_info': page_data['pricing_info'],
+            'about_info': page_data['about_info'],
+            'social_links': page_data['social_links'],
+            'content_length': len(text)
+        }
+
+    def _parse_page_with_soup(self, html: str, url: str) -> Dict:
+        """Build a BeautifulSoup tree and run each _extract_* helper over it (reference implementation)"""
+        soup = BeautifulSoup(html, 'html.parser')
+        
+        # Remove script and style elements
+        for script in soup(['script', 'style', 'nav', 'footer']):
+            script.extract()
+        
+        # Extract title and description
+        title = soup.title.string if soup.title else "No title found"
+        meta_desc = ""
+        meta_tag = soup.find('meta', attrs={'name': 'description'})
+        if meta_tag:
+            meta_desc = meta_tag.get('content', '')
+        
+        # Extract main content
+        text = soup.get_text(separator=' ', strip=True)
+        text = re.sub(r'\s+', ' ', text)
+        
+        # Extract pricing information (enhanced)
+        pricing_info = self._extract_pricing_info(soup, text)
+        
+        # Extract features (enhanced)
+        features = self._extract_features(soup, text)
+        
+        # Extract contact/about information
+        about_info = self._extract_about_info(soup, text)
+        
+        # Try to find social media links
+        social_links = self._extract_social_links(soup)
+        
+        return {
+            'title': title,
+            'url': url,
+            'meta_description': meta_desc,
+            'text_sample': text[:1000],
+            'features': features,
+            'pricing_info': pricing_info,
+            'about_info': about_info,
+            'social_links': social_links,
+            'content_length': len(text)
+        }
+
     def _extract_pricing_info(self, soup, text):
         """Extract detailed pricing information"""
         pricing_keywords = ['pricing', 'price', 'subscription', 'plan', 'cost', 'free', 'trial', 'premium', 'basic', 'pro', 'enterprise']
@@ -261,12 +485,14 @@ class EnhancedMarketResearchAgent:
             'technology': f'{startup_idea} technology stack solutions'
         }
     
-        search_results = {}
+        # Dispatch all queries at once; the shared token bucket in google_search keeps us within quota
+        futures = {}
         for category, query in search_queries.items():
             print(f"  Searching: {category}", flush=True)
-            results = self.google_search(query, num_results=8)
-            search_results[category] = results
-            time.sleep(1)  # Rate limiting
+            futures[category] = _search_executor.submit(self.google_search, query, 8)
+        
+        # Gather in the original category order so the prompt builder sees the same dict shape
+        search_results = {category: future.result() for category, future in futures.items()}
     
         # Combine competitor results for better coverage
         if 'more_competitors' in search_results:
@@ -274,49 +500,109 @@ class EnhancedMarketResearchAgent:
     
         return search_results
 
-    def deep_competitor_analysis(self, competitor_results: List[Dict]) -> List[Dict]:
-        """Perform deeper competitor analysis"""
-        print("🏢 Conducting deep competitor analysis...", flush=True)
-    
-        analyzed_competitors = []
-        max_competitors = min(10, len(competitor_results))  # Try more competitors
-    
-        for i, result in enumerate(competitor_results[:max_competitors]):
-            print(f"  Analyzing: {result['title']} ({i+1}/{max_competitors}, flush=True)", flush=True)
+    def _analyze_competitor(self, result: Dict, cancelled: threading.Event) -> Optional[Dict]:
+        """Scrape one competitor while its funding and review searches run alongside.
+
+        Returns None if the pipeline was cancelled before the work finished.
+        """
+        if cancelled.is_set():
+            return None
         
-            try:
+        company_name = result['displayLink'].replace('www.', '').replace('.com', '')
+        
+        # Additional searches for each competitor run on the search pool while we scrape
+        funding_future = _search_executor.submit(self.google_search, f"{company_name} funding investment series", 3)
+        review_future = _search_executor.submit(self.google_search, f"{company_name} reviews ratings", 3)
+        
+        try:
+            # Be respectful to servers: only a limited number of scrapes per host at a time
+            with _host_semaphore(result['link']):
+                if cancelled.is_set():
+                    return None
                 scraped_data = self.enhanced_scrape_website(result['link'])
             
-                # Additional searches for each competitor
-                company_name = result['displayLink'].replace('www.', '').replace('.com', '')
-            
-                # Search for funding information
-                funding_results = self.google_search(f"{company_name} funding investment series", num_results=3)
-            
-                # Search for user reviews
-                review_results = self.google_search(f"{company_name} reviews ratings", num_results=3)
-            
-                analyzed_competitors.append({
-                    'search_result': result,
-                    'scraped_data': scraped_data,
-                    'funding_info': funding_results,
-                    'reviews': review_results
-                })
-            
-                # Stop when we have at least 3 successful competitors
-                if len(analyzed_competitors) >= 3:
-                    break
+            return {
+                'search_result': result,
+                'scraped_data': scraped_data,
+                'funding_info': funding_future.result(),
+                'reviews': review_future.result()
+            }
+        finally:
+            funding_future.cancel()
+            review_future.cancel()
+
+    def deep_competitor_analysis(self, competitor_results: List[Dict], known_competitors: Optional[Dict[str, Dict]] = None) -> List[Dict]:
+        """Perform deeper competitor analysis.
+
+        Candidates are analyzed concurrently, a few at a time in search-rank order. As soon as
+        enough competitors succeed, queued candidates are cancelled and in-flight ones are
+        abandoned. Successful competitors are returned in their original search-rank order.
+        Candidates whose link is in known_competitors (earlier analyses keyed by link) are
+        reused as they are instead of being scraped again.
+        """
+        print("🏢 Conducting deep competitor analysis...", flush=True)
+    
+        candidates = competitor_results[:min(MAX_COMPETITOR_CANDIDATES, len(competitor_results))]
+        known_competitors = known_competitors or {}
+        cancelled = threading.Event()
+        pending = {}
+        successes = {}
+        attempted = 0
+        reused = 0
+    
+        def submit_next():
+            nonlocal attempted, reused
+            index = attempted
+            result = candidates[index]
+            attempted += 1
+            if result['link'] in known_competitors:
+                print(f"  Reusing: {result['title']} ({index + 1}/{len(candidates)})", flush=True)
+                successes[index] = known_competitors[result['link']]
+                reused += 1
+                return
+            print(f"  Analyzing: {result['title']} ({index + 1}/{len(candidates)})", flush=True)
+            pending[_competitor_executor.submit(self._analyze_competitor, result, cancelled)] = index
+    
+        def fill():
+            while (len(successes) < COMPETITORS_NEEDED and attempted < len(candidates)
+                   and len(pending) < COMPETITOR_MAX_IN_FLIGHT):
+                submit_next()
+    
+        fill()
+    
+        while pending and len(successes) < COMPETITORS_NEEDED:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = pending.pop(future)
+                try:
+                    analysis = future.result()
+                    if analysis is not None:
+                        successes[index] = analysis
+                except Exception as e:
+                    # Continue to next competitor instead of failing
+                    print(f"  Error analyzing {candidates[index]['link']}: {str(e)}", flush=True)
                 
-                time.sleep(2)  # Be respectful to servers
-            
-            except Exception as e:
-                print(f"  Error analyzing {result['link']}: {str(e, flush=True)}", flush=True)
-                # Continue to next competitor instead of failing
-                continue
+                fill()
+    
+        # Stop outstanding work once we have enough successful competitors
+        cancelled.set()
+        for future in pending:
+            future.cancel()
+    
+        analyzed_competitors = [successes[index] for index in sorted(successes)][:COMPETITORS_NEEDED]
+        self.competitor_pipeline_stats = {
+            'candidates': len(candidates),
+            'attempted': attempted,
+            'used': len(analyzed_competitors),
+            'reused': reused,
+            'abandoned': len(pending)
+        }
+        print(f"  Used {len(analyzed_competitors)} of {attempted} attempted competitors "
+              f"({len(pending)} abandoned in flight)", flush=True)
     
         # If we still don't have enough, add basic competitor info from search results
-        if len(analyzed_competitors) < 3:
-            remaining_needed = 3 - len(analyzed_competitors)
+        if len(analyzed_competitors) < COMPETITORS_NEEDED:
+            remaining_needed = COMPETITORS_NEEDED - len(analyzed_competitors)
             for result in competitor_results[len(analyzed_competitors):len(analyzed_competitors) + remaining_needed]:
                 analyzed_competitors.append({
                     'search_result': result,
@@ -327,18 +613,45 @@ class EnhancedMarketResearchAgent:
     
         return analyzed_competitors
 
-    def run_enhanced_market_analysis(self, startup_idea: str) -> EnhancedMarketAnalysisReport:
-        """Execute comprehensive market research analysis"""
+    def run_enhanced_market_analysis(self, startup_idea: str, progress_callback: Optional[Callable[[str, str], None]] = None,
+                                     allow_fallback: bool = True) -> EnhancedMarketAnalysisReport:
+        """Execute comprehensive market research analysis
+
+        progress_callback, if given, is called as progress_callback(step, message) when each
+        step finishes. If the AI analysis fails, a placeholder report is built from the search
+        data, unless allow_fallback is False, in which case the error is raised.
+        """
         print(f"🚀 Starting enhanced market analysis for: {startup_idea}", flush=True)
         print("=" * 80, flush=True)
+        progress = progress_callback or (lambda step, message="": None)
         
-        # Step 1: Comprehensive search
-        search_results = self.conduct_comprehensive_search(startup_idea)
-        
-        # Step 2: Deep competitor analysis
-        all_competitor_results = search_results['competitors']
+        similar = idea_index.find_similar(startup_idea) if idea_index is not None else None
+        if similar is not None and similar['reusable']:
+            # Steps 1 and 2 were already done for a near-identical idea
+            print(f"♻️ Reusing research for similar idea '{similar['startup_idea']}' "
+                  f"(similarity {similar['similarity']:.2f})", flush=True)
+            search_results = similar['search_results']
+            competitor_data = similar['competitor_data']
+            progress("search", f"Reused market research searches from similar idea '{similar['startup_idea']}'")
+            progress("competitor_analysis", f"Reused {len(competitor_data)} competitors from similar idea '{similar['startup_idea']}'")
+        else:
+            # Step 1: Comprehensive search
+            search_results = self.conduct_comprehensive_search(startup_idea)
+            progress("search", f"Completed {len(search_results)} market research searches")
+            
+            # Step 2: Deep competitor analysis, warm-started with competitors a similar idea already scraped
+            all_competitor_results = search_results['competitors']
+            known_competitors = {}
+            if similar is not None:
+                known_competitors = {comp['search_result']['link']: comp for comp in similar['competitor_data']
+                                     if 'title' in comp.get('scraped_data', {})}
+
+            competitor_data = self.deep_competitor_analysis(all_competitor_results, known_competitors)
+            progress("competitor_analysis", f"Analyzed {len(competitor_data)} competitors")
 
-        competitor_data = self.deep_competitor_analysis(all_competitor_results)
+            if idea_index is not None:
+                # Stored only for freshly gathered research so borrowed entries still expire
+                idea_index.add(startup_idea, search_results, competitor_data)
         
         # Step 3: Enhanced AI analysis
         print("🧠 Generating comprehensive market analysis...", flush=True)
@@ -426,7 +739,8 @@ class EnhancedMarketResearchAgent:
         """
 
         try:
-            response = self.client.chat.completions.create(
+            content = complete_chat(
+                self, "market_analysis",
                 model=self.model,
                 response_format={"type": "json_object"},
                 messages=[
@@ -438,7 +752,7 @@ class EnhancedMarketResearchAgent:
             )
 
             # Parse and validate the response
-            analysis_result = json.loads(response.choices[0].message.content)
+            analysis_result = json.loads(content)
             
             # Add required metadata
             analysis_result['startup_idea'] = startup_idea
@@ -446,15 +760,20 @@ class EnhancedMarketResearchAgent:
             
             # Validate and create the report
             report = EnhancedMarketAnalysisReport(**analysis_result)
+            progress("ai_analysis", "Generated market analysis report")
             return report
             
         except json.JSONDecodeError as e:
-            print(f"JSON parsing error: {str(e, flush=True)}", flush=True)
-            print(f"Response was: {response.choices[0].message.content}", flush=True)
+            print(f"JSON parsing error: {str(e)}", flush=True)
+            print(f"Response was: {content}", flush=True)
+            if not allow_fallback:
+                raise
             return self._create_fallback_report(startup_idea, search_results, competitor_data)
             
         except Exception as e:
-            print(f"Error in analysis: {str(e, flush=True)}", flush=True)
+            print(f"Error in analysis: {str(e)}", flush=True)
+            if not allow_fallback:
+                raise
             return self._create_fallback_report(startup_idea, search_results, competitor_data)
 
     def _create_fallback_report(self, startup_idea: str, search_results: Dict, competitor_data: List) -> EnhancedMarketAnalysisReport:
@@ -575,14 +894,15 @@ class EnhancedMarketResearchAgent:
             ]
         )
 
-def analyze_startup_market(idea: str) -> EnhancedMarketAnalysisReport:
+def analyze_startup_market(idea: str, progress_callback: Optional[Callable[[str, str], None]] = None,
+                           stream_callback: Optional[StreamCallback] = None, priority: int = INTERACTIVE) -> EnhancedMarketAnalysisReport:
     """Main function to run enhanced market analysis"""
-    agent = EnhancedMarketResearchAgent()
+    agent = EnhancedMarketResearchAgent(stream_callback, priority)
     
     try:
-        report = agent.run_enhanced_market_analysis(idea)
+        report = agent.run_enhanced_market_analysis(idea, progress_callback)
         return report
     
     except Exception as e:
-        print(f"❌ Error during analysis: {str(e, flush=True)}", flush=True)
+        print(f"❌ Error during analysis: {str(e)}", flush=True)
         return None
@@ -0,0 +1,111 @@
+"""
+Re-encode the agent outputs already stored in Supabase, e.g. after switching OUTPUT_ENCODING.
+
+Rows are read in pages ordered by session_id and user_id, decoded and written back in the target
+encoding (see output_codec). Rows that already use it are skipped, so an interrupted run can simply
+be started again. Writes are upserts on (user_id, session_id) and need the unique constraint
+described in the README.
+
+Only the output columns whose encoding changes are written, so the migration can run next to the
+server: a stage the server writes meanwhile into another column (or into a row's empty column) is
+left alone. A column the server rewrites between this script's read and write is still replaced
+with the older value, so sessions being re-run at that moment may lose that write.
+
+Usage:
+    python migrate_outputs.py --encoding gzip             # compress every stored output
+    python migrate_outputs.py --encoding json             # back to plain JSONB
+    python migrate_outputs.py --encoding gzip --dry-run   # only report the sizes
+"""
+import argparse
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Dict, Optional
+
+from output_codec import ENCODINGS, ENCODING_KEY, PLAIN, canonical_json
+import supabase_client
+from supabase_client import OUTPUT_COLUMNS, decode_row, encode_row, upsert_agent_outputs
+
+MIGRATION_PAGE_SIZE = 100
+
+
+def _stored_encoding(value: Any) -> Optional[str]:
+    if not isinstance(value, dict):
+        return None
+    return value.get(ENCODING_KEY, PLAIN)
+
+
+def migrate_outputs(encoding: str, page_size: int = MIGRATION_PAGE_SIZE, dry_run: bool = False) -> Dict[str, Any]:
+    """
+    Rewrite every agent_outputs row with its outputs in `encoding`.
+
+    Args:
+        encoding (str): Target encoding: "json", "gzip" or "zstd"
+        page_size (int): Rows read and written per request
+        dry_run (bool): Only measure, write nothing
+
+    Returns:
+        dict: Rows scanned, migrated and skipped, and the stored output bytes before and after
+    """
+    columns = ','.join(('user_id', 'session_id') + OUTPUT_COLUMNS)
+    summary = {'scanned': 0, 'migrated': 0, 'skipped': 0, 'bytes_before': 0, 'bytes_after': 0}
+    last_key = None
+    start = time.time()
+
+    while True:
+        query = supabase_client.supabase_client.table('agent_outputs').select(columns)
+        if last_key is not None:
+            # Session ids are only unique per user, so pages are keyed on both
+            session_id, user_id = last_key
+            query = query.or_(f'session_id.gt."{session_id}",'
+                              f'and(session_id.eq."{session_id}",user_id.gt."{user_id}")')
+        rows = query.order('session_id').order('user_id').limit(page_size).execute().data
+        if not rows:
+            break
+        last_key = (rows[-1]['session_id'], rows[-1]['user_id'])
+
+        # Upserts write the same columns for every row, so rows are grouped by the columns that change
+        pending = defaultdict(list)
+        for row in rows:
+            summary['scanned'] += 1
+            stored = {column: row.get(column) for column in OUTPUT_COLUMNS}
+            target = encode_row(decode_row(stored), encoding)
+            summary['bytes_before'] += sum(len(canonical_json(value)) for value in stored.values() if value is not None)
+            summary['bytes_after'] += sum(len(canonical_json(value)) for value in target.values() if value is not None)
+            changed = tuple(column for column in OUTPUT_COLUMNS
+                            if _stored_encoding(stored[column]) != _stored_encoding(target[column]))
+            if not changed:
+                summary['skipped'] += 1
+                continue
+            decoded = decode_row({column: stored[column] for column in changed})
+            pending[changed].append({'user_id': row['user_id'], 'session_id': row['session_id'], **decoded})
+            summary['migrated'] += 1
+
+        if not dry_run:
+            for group in pending.values():
+                upsert_agent_outputs(group, encoding)
+        print(f"  {summary['scanned']} rows scanned, {summary['migrated']} "
+              f"{'to migrate' if dry_run else 'migrated'}", flush=True)
+
+    summary['seconds'] = time.time() - start
+    return summary
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Re-encode the agent outputs stored in Supabase")
+    parser.add_argument("--encoding", choices=ENCODINGS, required=True, help="Target storage encoding")
+    parser.add_argument("--page-size", type=int, default=MIGRATION_PAGE_SIZE, help="Rows per request")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing")
+    args = parser.parse_args(argv)
+
+    summary = migrate_outputs(args.encoding, args.page_size, args.dry_run)
+    ratio = summary['bytes_after'] / summary['bytes_before'] if summary['bytes_before'] else 1.0
+    print(f"{summary['scanned']} rows scanned, {summary['migrated']} "
+          f"{'would be migrated' if args.dry_run else 'migrated'}, {summary['skipped']} already {args.encoding}; "
+          f"outputs {summary['bytes_before']:,} -> {summary['bytes_after']:,} bytes ({ratio:.0%}) "
+          f"in {summary['seconds']:.1f}s", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
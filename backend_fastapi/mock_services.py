@@ -0,0 +1,515 @@
+"""Offline stand-ins for Google Custom Search, competitor websites, OpenAI and Supabase.
+
+`install_mock_services()` points the shared HTTP client, every agent's LLM client and the
+Supabase client at the stubs below, so the full market -> product -> architecture pipeline runs
+without network access or API keys. Answers are canned but valid for each agent's parser, which makes the stubs useful
+for batch dry runs, load tests and CI.
+"""
+import hashlib
+import itertools
+import json
+import re
+import threading
+import time
+import types
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from urllib.parse import urlparse
+
+from http_client import set_http_client
+from llm_client import set_llm_client
+from supabase_client import set_supabase_client
+
+_SENTENCE = "Users want a simpler, more personalised experience than current products offer."
+
+MOCK_MARKET_ANALYSIS = {
+    "executive_summary": "The market is growing quickly and is served by a handful of well-funded players. " + _SENTENCE,
+    "market_sizing": {
+        "total_addressable_market": "$12B",
+        "serviceable_addressable_market": "$2.5B",
+        "serviceable_obtainable_market": "$50M",
+        "market_growth_rate": "14% CAGR",
+        "geographic_distribution": {"North America": "40%", "Europe": "30%", "Rest of World": "30%"}
+    },
+    "market_trends": {
+        "emerging_trends": ["AI-driven personalisation", "Subscription bundles"],
+        "technology_trends": ["On-device machine learning", "Open health data APIs"],
+        "consumer_behavior": [_SENTENCE, "Mobile-first usage with short daily sessions"],
+        "regulatory_factors": ["GDPR and CCPA data handling"]
+    },
+    "competitors": [
+        {
+            "name": f"Competitor {letter}",
+            "website": f"https://competitor-{letter.lower()}.example.com",
+            "description": f"Established product number {index + 1} in the category.",
+            "features": ["Onboarding quiz", "Progress dashboard", "Community challenges"],
+            "pricing_model": "Freemium",
+            "pricing_details": "$9.99/month",
+            "target_audience": "Busy professionals",
+            "strengths": ["Brand recognition", "Large content library"],
+            "weaknesses": ["Generic recommendations", "Dated interface"],
+            "competitive_score": 7.5 - index,
+            "market_share": f"{20 - 5 * index}%",
+            "funding_info": "Series B",
+            "founded_year": "2016",
+            "team_size": "50-200",
+            "social_presence": {"twitter": "25k followers"},
+            "user_reviews": {"score": 4.2, "sentiment": "Mostly positive"}
+        }
+        for index, letter in enumerate("ABC")
+    ],
+    "competitive_landscape_summary": "Fragmented market with no clear leader in personalised offerings.",
+    "market_leaders": ["Competitor A", "Competitor B", "Competitor C"],
+    "opportunity_analysis": {
+        "market_gaps": ["Truly personalised plans", "Affordable premium tier"],
+        "underserved_segments": ["Beginners", "Users over 50"],
+        "differentiation_opportunities": ["Adaptive AI coaching", "Integrations with wearables"],
+        "barrier_to_entry": {"technology": "Medium", "capital": "Low", "brand": "High"},
+        "success_factors": ["Retention", "Content quality"]
+    },
+    "opportunity_score": 7.2,
+    "risk_analysis": {
+        "market_risks": ["Crowded category"],
+        "competitive_risks": ["Incumbents copy features"],
+        "technology_risks": ["Recommendation quality"],
+        "regulatory_risks": ["Health data regulation"],
+        "mitigation_strategies": ["Focus on a niche first", "Privacy by design"]
+    },
+    "target_audience_segments": [
+        {"name": "Busy professionals", "description": "Short on time, willing to pay", "size": "Large"},
+        {"name": "Beginners", "description": "Need guidance and motivation", "size": "Medium"}
+    ],
+    "go_to_market_insights": ["Launch on iOS first", "Partner with creators"],
+    "strategic_recommendations": ["Validate willingness to pay", "Build the personalisation engine early"],
+    "next_steps": ["Run landing page test", "Interview 20 target users"]
+}
+
+MOCK_PERSONAS = {
+    "personas": [
+        {
+            "name": name,
+            "description": description,
+            "demographics": {"age": age, "gender": "All", "occupation": occupation},
+            "pain_points": ["Not enough time", "Generic advice"],
+            "goals": ["Make steady progress", "Stay motivated"],
+            "behaviors": ["Uses phone daily", "Compares apps before paying"],
+            "needs": ["Personal guidance", "Quick sessions"],
+            "tech_savviness": savviness
+        }
+        for name, description, age, occupation, savviness in (
+            ("Busy Professional", "Works long hours and wants efficient results", "28-40", "Office worker", "High"),
+            ("Curious Beginner", "New to the category and easily overwhelmed", "20-35", "Student", "Medium")
+        )
+    ]
+}
+
+MOCK_FEATURES = {
+    "features": [
+        {
+            "name": name,
+            "description": f"{name} for every user.",
+            "priority": priority,
+            "effort": effort,
+            "impact": impact,
+            "user_stories": [f"As a user, I want {name.lower()} so that I make progress."],
+            "target_personas": ["Busy Professional", "Curious Beginner"],
+            "technical_complexity": effort,
+            "dependencies": [],
+            "metrics": ["Weekly active users"]
+        }
+        for name, priority, effort, impact in (
+            ("User Accounts", "HIGH", 3, 8),
+            ("Personalised Plans", "HIGH", 6, 9),
+            ("Progress Tracking", "HIGH", 4, 8),
+            ("Reminders", "MEDIUM", 2, 6),
+            ("Social Sharing", "LOW", 3, 4),
+            ("Wearable Sync", "LOW", 7, 5)
+        )
+    ]
+}
+
+_COMPONENT = {"learning_curve": "Medium", "community_support": "Excellent", "documentation_quality": "Excellent"}
+MOCK_TECH_STACK = {
+    "Frontend": [{"name": "React", "version": "18.x", "justification": "Large ecosystem",
+                  "alternatives_considered": ["Vue.js"], **_COMPONENT}],
+    "Backend": [{"name": "FastAPI", "version": "0.110", "justification": "Fast to build typed APIs",
+                 "alternatives_considered": ["Django"], **_COMPONENT}],
+    "Database": [{"name": "PostgreSQL", "version": "15", "justification": "Reliable relational store",
+                  "alternatives_considered": ["MongoDB"], **_COMPONENT}]
+}
+
+MOCK_DATABASE_SCHEMA = [
+    {
+        "name": "users",
+        "type": "table",
+        "fields": [{"name": "id", "type": "uuid"}, {"name": "email", "type": "text"}],
+        "relationships": [],
+        "indexes": ["email"],
+        "constraints": ["email unique"],
+        "description": "Registered users"
+    },
+    {
+        "name": "plans",
+        "type": "table",
+        "fields": [{"name": "id", "type": "uuid"}, {"name": "user_id", "type": "uuid"}],
+        "relationships": [{"table": "users", "type": "many-to-one"}],
+        "indexes": ["user_id"],
+        "constraints": [],
+        "description": "Personalised plans"
+    }
+]
+
+MOCK_API_ENDPOINTS = [
+    {"path": "/api/auth/login", "method": "POST", "description": "Log a user in",
+     "request_body": {"email": "string", "password": "string"}, "response_structure": {"token": "string"},
+     "auth_required": False, "related_features": ["User Accounts"]},
+    {"path": "/api/plans", "method": "GET", "description": "List the user's plans",
+     "request_body": None, "response_structure": {"plans": "array"},
+     "auth_required": True, "related_features": ["Personalised Plans"]}
+]
+
+MOCK_DEPLOYMENT_STRATEGY = {
+    "recommended_approach": "Containers on a managed platform",
+    "infrastructure": "AWS ECS with RDS",
+    "ci_cd_pipeline": {"build": "GitHub Actions", "deploy": "Blue/green"},
+    "scaling_strategy": "Horizontal auto-scaling on CPU",
+    "estimated_costs": "$300/month",
+    "monitoring_tools": ["Datadog", "Sentry"],
+    "backup_strategy": "Daily snapshots with 7-day retention"
+}
+
+MOCK_SECURITY_CONSIDERATIONS = {
+    "authentication_method": "JWT with refresh tokens",
+    "authorization_approach": "Role-based access control",
+    "data_encryption": {"at_rest": "AES-256", "in_transit": "TLS 1.3"},
+    "security_best_practices": ["Input validation", "Least privilege"],
+    "compliance_considerations": ["GDPR"],
+    "security_testing": ["Dependency scanning", "Penetration test before launch"]
+}
+
+MOCK_THIRD_PARTY_SERVICES = {
+    "Authentication": [{"name": "Auth0", "description": "Hosted login", "pricing_tier": "Freemium",
+                        "integration_complexity": "Low"}],
+    "Payment": [{"name": "Stripe", "description": "Subscriptions", "pricing_tier": "Pay as you go",
+                 "integration_complexity": "Medium"}]
+}
+
+MOCK_DEVELOPMENT_TOOLS = [
+    {"name": "GitHub", "category": "Version control", "description": "Code hosting and reviews", "pricing": "Free"},
+    {"name": "Figma", "category": "Design", "description": "UI design", "pricing": "Freemium"}
+]
+
+MOCK_IMPLEMENTATION_ROADMAP = [
+    {"name": "Foundation", "description": "Project setup and authentication", "duration": 2,
+     "features": ["User Accounts"], "technical_deliverables": ["CI/CD", "Auth service"]},
+    {"name": "MVP", "description": "Core features", "duration": 4,
+     "features": ["Personalised Plans", "Progress Tracking"], "technical_deliverables": ["API", "Web app"]}
+]
+
+MOCK_ARCHITECTURE_DIAGRAM = """flowchart TB
+    UI[Web App] --> API[API]
+    API --> DB[(PostgreSQL)]
+    API --> Auth[Auth0]"""
+
+# Canned answers keyed on a phrase from each agent call's system message
+MOCK_COMPLETIONS = {
+    "market research expert": MOCK_MARKET_ANALYSIS,
+    "detailed user personas": MOCK_PERSONAS,
+    "comprehensive feature lists": MOCK_FEATURES,
+    "designing technical solutions": MOCK_TECH_STACK,
+    "database design": MOCK_DATABASE_SCHEMA,
+    "API design": MOCK_API_ENDPOINTS,
+    "deployment strategies": MOCK_DEPLOYMENT_STRATEGY,
+    "specialized in security": MOCK_SECURITY_CONSIDERATIONS,
+    "third-party services": MOCK_THIRD_PARTY_SERVICES,
+    "development tools": MOCK_DEVELOPMENT_TOOLS,
+    "project planning": MOCK_IMPLEMENTATION_ROADMAP,
+    "system design": MOCK_ARCHITECTURE_DIAGRAM
+}
+
+
+class MockLLMClient:
+    """
+    Answers `chat.completions.create` like the OpenAI client, from MOCK_COMPLETIONS.
+
+    Args:
+        latency (float): Seconds each call sleeps, to imitate API response times
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+        self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=self.create))
+
+    def create(self, model: str = None, messages=None, stream: bool = False, **kwargs):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        system_message = (messages or [{}])[0].get('content') or ''
+        answer = next((value for phrase, value in MOCK_COMPLETIONS.items() if phrase in system_message), {})
+        content = answer if isinstance(answer, str) else json.dumps(answer, indent=2)
+        if stream:
+            return self._stream(content)
+        choice = types.SimpleNamespace(message=types.SimpleNamespace(content=content), finish_reason="stop")
+        return types.SimpleNamespace(choices=[choice])
+
+    @staticmethod
+    def _stream(content: str, chunk_size: int = 64) -> Iterator[Any]:
+        for start in range(0, len(content), chunk_size):
+            finish_reason = "stop" if start + chunk_size >= len(content) else None
+            delta = types.SimpleNamespace(content=content[start:start + chunk_size])
+            yield types.SimpleNamespace(choices=[types.SimpleNamespace(delta=delta, finish_reason=finish_reason)])
+
+
+class _MockResponse:
+    """The subset of a requests/httpx response the market research agent reads."""
+
+    def __init__(self, body: bytes, content_type: str, status_code: int = 200):
+        self.status_code = status_code
+        self.headers = {'Content-Type': content_type}
+        self.content = body
+        self.text = body.decode('utf-8')
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+    def iter_content(self, chunk_size: int = 16384) -> Iterator[bytes]:
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def close(self):
+        pass
+
+
+class MockHTTPClient:
+    """
+    Stands in for `HTTPClient`: Google Custom Search requests get a handful of fake competitor
+    results derived from the query, and any other URL gets a small competitor marketing page.
+
+    Args:
+        latency (float): Seconds each request sleeps, to imitate network round trips
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.requests = 0
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None, **kwargs) -> _MockResponse:
+        self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if params and 'q' in params:
+            return _MockResponse(json.dumps(self._search(params['q'], params.get('num', 10))).encode('utf-8'),
+                                 'application/json')
+        return _MockResponse(self._page(urlparse(url).netloc).encode('utf-8'), 'text/html; charset=utf-8')
+
+    def request(self, method: str, url: str, **kwargs) -> _MockResponse:
+        return self.get(url, **kwargs)
+
+    @staticmethod
+    def _search(query: str, num_results: int) -> Dict[str, Any]:
+        seed = hashlib.sha1(query.encode('utf-8')).hexdigest()
+        items = []
+        for i in range(min(num_results, 3)):
+            host = f"competitor-{seed[i * 4:i * 4 + 4]}.example.com"
+            items.append({
+                'title': f"Competitor {seed[i * 4:i * 4 + 4]} - {query[:40]}",
+                'link': f"https://{host}/",
+                'snippet': _SENTENCE,
+                'displayLink': host
+            })
+        return {'items': items}
+
+    @staticmethod
+    def _page(host: str) -> str:
+        return (
+            f"<html><head><title>{host}</title><meta name=\"description\" content=\"{_SENTENCE}\"></head><body>"
+            "<h1>Reach your goals faster</h1>"
+            "<ul class=\"features\"><li>Personalised plans</li><li>Progress tracking</li><li>Reminders</li></ul>"
+            "<div class=\"pricing\">Pro plan $9.99/month, free trial included</div>"
+            "<div class=\"about\"><p>Founded in 2018 by a small team.</p></div>"
+            f"<a href=\"https://twitter.com/{host.split('.')[0]}\">Twitter</a>"
+            "</body></html>"
+        )
+
+    def close(self):
+        pass
+
+
+def _split_top_level(text: str) -> List[str]:
+    """Split a PostgREST list on the commas that are not inside parentheses or quotes"""
+    parts, depth, quoted, start = [], 0, False, 0
+    for i, char in enumerate(text):
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == '(':
+            depth += 1
+        elif not quoted and char == ')':
+            depth -= 1
+        elif not quoted and depth == 0 and char == ',':
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return [part.strip() for part in parts if part.strip()]
+
+
+_COMPARISONS: Dict[str, Callable[[Any, Any], bool]] = {
+    'eq': lambda a, b: a == b,
+    'neq': lambda a, b: a != b,
+    'lt': lambda a, b: a is not None and a < b,
+    'lte': lambda a, b: a is not None and a <= b,
+    'gt': lambda a, b: a is not None and a > b,
+    'gte': lambda a, b: a is not None and a >= b
+}
+
+
+def _parse_filter(text: str) -> Callable[[Dict[str, Any]], bool]:
+    """Turn a PostgREST logic tree such as `a.lt."x",and(a.eq."x",b.lt.y)` into a predicate on rows"""
+    for operator, combine in (('and(', all), ('or(', any)):
+        if text.startswith(operator):
+            terms = [_parse_filter(term) for term in _split_top_level(text[len(operator):-1])]
+            return lambda row, terms=terms, combine=combine: combine(term(row) for term in terms)
+    column, operator, value = text.split('.', 2)
+    if value.startswith('"') and value.endswith('"'):
+        value = value[1:-1]
+    compare = _COMPARISONS[operator]
+    return lambda row: compare(row.get(column), value)
+
+
+def _project(row: Dict[str, Any], columns: str) -> Dict[str, Any]:
+    """Apply a PostgREST select list (`*`, `column`, `alias:column->key`, `alias:column->>key`)"""
+    result = {}
+    for item in _split_top_level(columns):
+        if item == '*':
+            result.update(row)
+            continue
+        alias, _, path = item.rpartition(':')
+        column, *keys = re.split(r'->>?', path)
+        value = row.get(column)
+        for key in keys:
+            value = value.get(key) if isinstance(value, dict) else None
+        # ->> returns text, -> returns JSON
+        if re.findall(r'->>?', path)[-1:] == ['->>'] and value is not None and not isinstance(value, str):
+            value = json.dumps(value)
+        result[alias or (keys[-1] if keys else column)] = value
+    return json.loads(json.dumps(result))
+
+
+class _MockQuery:
+    """One query against a `MockSupabaseClient` table, built like a postgrest request."""
+
+    def __init__(self, client: "MockSupabaseClient", name: str):
+        self.client = client
+        self.name = name
+        self.columns = '*'
+        self.filters: List[Callable[[Dict[str, Any]], bool]] = []
+        self.ordering: List[tuple] = []
+        self.row_limit: Optional[int] = None
+        self.write: Optional[tuple] = None
+
+    def select(self, columns: str = '*', **kwargs) -> "_MockQuery":
+        self.columns = columns
+        return self
+
+    def eq(self, column: str, value: Any) -> "_MockQuery":
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def gt(self, column: str, value: Any) -> "_MockQuery":
+        self.filters.append(lambda row: _COMPARISONS['gt'](row.get(column), value))
+        return self
+
+    def or_(self, filters: str, **kwargs) -> "_MockQuery":
+        self.filters.append(_parse_filter(f"or({filters})"))
+        return self
+
+    def order(self, column: str, desc: bool = False, **kwargs) -> "_MockQuery":
+        self.ordering.append((column, desc))
+        return self
+
+    def limit(self, size: int, **kwargs) -> "_MockQuery":
+        self.row_limit = size
+        return self
+
+    def insert(self, rows, **kwargs) -> "_MockQuery":
+        self.write = ('insert', rows, None)
+        return self
+
+    def upsert(self, rows, on_conflict: str = 'id', **kwargs) -> "_MockQuery":
+        self.write = ('upsert', rows, on_conflict)
+        return self
+
+    def execute(self) -> Any:
+        return self.client._execute(self)
+
+
+class MockSupabaseClient:
+    """
+    Stands in for the Supabase client: tables are in-memory lists of rows, and queries support
+    the filters, ordering, JSON projections, inserts and upserts supabase_client uses.
+    `created_at` values of 'now()' are replaced with the current time, as Postgres would.
+
+    Args:
+        latency (float): Seconds each query sleeps, to imitate database round trips
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.requests = 0
+        self.tables: Dict[str, List[Dict[str, Any]]] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def table(self, name: str) -> _MockQuery:
+        return _MockQuery(self, name)
+
+    def _execute(self, query: _MockQuery) -> Any:
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.requests += 1
+            table = self.tables.setdefault(query.name, [])
+            if query.write is not None:
+                return types.SimpleNamespace(data=self._write(table, *query.write))
+            rows = [row for row in table if all(check(row) for check in query.filters)]
+            for column, desc in reversed(query.ordering):
+                rows.sort(key=lambda row: (row.get(column) is not None, row.get(column)), reverse=desc)
+            if query.row_limit is not None:
+                rows = rows[:query.row_limit]
+            return types.SimpleNamespace(data=[_project(row, query.columns) for row in rows])
+
+    def _write(self, table: List[Dict[str, Any]], mode: str, rows, on_conflict: Optional[str]) -> List[Dict[str, Any]]:
+        written = []
+        for row in rows if isinstance(rows, list) else [rows]:
+            row = json.loads(json.dumps(row))
+            if row.get('created_at') == 'now()':
+                row['created_at'] = datetime.now(timezone.utc).isoformat()
+            existing = None
+            if mode == 'upsert':
+                keys = on_conflict.split(',')
+                existing = next((r for r in table if all(r.get(key) == row.get(key) for key in keys)), None)
+            if existing is not None:
+                existing.update(row)
+                written.append(existing)
+                continue
+            row.setdefault('id', next(self._ids))
+            row.setdefault('created_at', datetime.now(timezone.utc).isoformat())
+            table.append(row)
+            written.append(row)
+        return json.loads(json.dumps(written))
+
+
+def install_mock_services(latency: float = 0.0):
+    """
+    Route searches, scraping, OpenAI and Supabase calls made from now on to the offline stubs.
+
+    Agents pick up their LLM client when they are constructed, so call this before creating any.
+    Point SEARCH_CACHE_PATH and LLM_CACHE_BACKEND away from the real caches (or disable them)
+    before importing the agents, otherwise canned answers end up in them.
+
+    Args:
+        latency (float): Seconds every stubbed call sleeps
+    """
+    set_http_client(MockHTTPClient(latency))
+    set_llm_client(MockLLMClient(latency))
+    set_supabase_client(MockSupabaseClient(latency))
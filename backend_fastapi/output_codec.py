@@ -0,0 +1,119 @@
+"""Compact encoding of the agent output documents stored in Supabase.
+
+An encoded output is still a JSON object, so it fits the existing JSONB columns:
+
+    {"_encoding": "gzip", "_version": 1, "data": "<base64 of the compressed canonical JSON>",
+     "startup_idea": ..., "opportunity_score": ...}
+
+The summary keys the history listing projects (see supabase_client.HISTORY_SUMMARY_COLUMNS) are
+copied next to the payload so listings keep working on encoded rows. Plain documents are left
+as they are by `decode_output`, so encoded and unencoded rows can live side by side.
+"""
+import base64
+import gzip
+import json
+import os
+from typing import Any, Dict, Optional
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# "json" stores outputs as plain JSONB (the default); "gzip" or "zstd" compress them
+OUTPUT_ENCODING = os.getenv("OUTPUT_ENCODING", "json").lower()
+OUTPUT_COMPRESSION_LEVEL = int(os.getenv("OUTPUT_COMPRESSION_LEVEL", "6"))
+# Smaller documents are stored plain; base64 and the header would outweigh the savings
+OUTPUT_COMPRESS_MIN_BYTES = int(os.getenv("OUTPUT_COMPRESS_MIN_BYTES", "1024"))
+
+ENCODING_KEY = "_encoding"
+VERSION_KEY = "_version"
+ENCODING_VERSION = 1
+PLAIN = "json"
+ENCODINGS = (PLAIN, "gzip", "zstd")
+
+# Kept readable in encoded documents for the history listing
+SUMMARY_KEYS = ("startup_idea", "opportunity_score")
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+if OUTPUT_ENCODING == "zstd" and zstandard is None:
+    print("OUTPUT_ENCODING=zstd but zstandard is not installed; using gzip", flush=True)
+
+
+def canonical_json(value: Any) -> bytes:
+    """Serialize `value` with sorted keys and no whitespace, so equal documents give equal bytes"""
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def is_encoded(value: Any) -> bool:
+    """Return True if `value` is a document produced by `encode_output` with a compressing encoding"""
+    return isinstance(value, dict) and ENCODING_KEY in value
+
+
+def _resolve(encoding: str) -> str:
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unknown output encoding '{encoding}', expected one of {', '.join(ENCODINGS)}")
+    if encoding == "zstd" and zstandard is None:
+        # Reported once at import for OUTPUT_ENCODING
+        return "gzip"
+    return encoding
+
+
+def encode_output(value: Optional[Dict[str, Any]], encoding: str = OUTPUT_ENCODING,
+                  level: int = OUTPUT_COMPRESSION_LEVEL) -> Optional[Dict[str, Any]]:
+    """
+    Encode an agent output for storage.
+
+    Args:
+        value (dict): The output (None, and already encoded documents, are returned unchanged)
+        encoding (str): "json" (plain), "gzip" or "zstd"
+        level (int): Compression level
+
+    Returns:
+        dict: The document to store
+    """
+    encoding = _resolve(encoding)
+    if encoding == PLAIN or not isinstance(value, dict) or is_encoded(value):
+        return value
+    raw = canonical_json(value)
+    if len(raw) < OUTPUT_COMPRESS_MIN_BYTES:
+        return value
+    if encoding == "zstd":
+        compressed = zstandard.ZstdCompressor(level=level).compress(raw)
+    else:
+        compressed = gzip.compress(raw, compresslevel=level, mtime=0)
+    document = {ENCODING_KEY: encoding, VERSION_KEY: ENCODING_VERSION,
+                "data": base64.b64encode(compressed).decode("ascii")}
+    for key in SUMMARY_KEYS:
+        if key in value:
+            document[key] = value[key]
+    return document
+
+
+def decode_output(value: Any) -> Any:
+    """
+    Return the original output of a stored document; plain documents are returned unchanged.
+
+    Raises:
+        ValueError: If the document uses an unknown encoding or a newer version
+    """
+    if not is_encoded(value):
+        return value
+    encoding = value[ENCODING_KEY]
+    version = value.get(VERSION_KEY)
+    if version != ENCODING_VERSION:
+        raise ValueError(f"Unsupported output encoding version {version}")
+    compressed = base64.b64decode(value["data"])
+    if encoding == "gzip":
+        raw = gzip.decompress(compressed)
+    elif encoding == "zstd":
+        if zstandard is None:
+            raise ValueError("Output is zstd-encoded but zstandard is not installed")
+        raw = zstandard.ZstdDecompressor().decompress(compressed)
+    else:
+        raise ValueError(f"Unknown output encoding '{encoding}'")
+    return json.loads(raw)
@@ -1,13 +1,15 @@
-from openai import OpenAI
 import os
 import json
-from typing import List, Dict, Optional, Union, Any
+from typing import List, Dict, Optional, Union, Any, Callable
 from pydantic import BaseModel, Field
 from datetime import datetime
 from dotenv import load_dotenv
 
 # Import the EnhancedMarketAnalysisReport model from market_agent
 from market_agent import EnhancedMarketAnalysisReport
+from llm_stream import complete_chat, StreamCallback
+from llm_client import get_llm_client
+from llm_scheduler import INTERACTIVE
 
 # Load environment variables
 load_dotenv()
@@ -45,9 +47,13 @@ class ProductRoadmap(BaseModel):
     success_metrics: Dict[str, str] = Field(description="Key metrics to measure product success")
 
 class ProductManagerAgent:
-    def __init__(self):
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    agent_name = "product_manager"  # label for shared completion cache statistics
+    
+    def __init__(self, stream_callback: Optional[StreamCallback] = None, priority: int = INTERACTIVE):
+        self.client = get_llm_client()
         self.model = "gpt-4o-mini"  # Using the same model as the market analysis agent
+        self.stream_callback = stream_callback  # set to stream personas and features as they are generated
+        self.priority = priority  # scheduling priority of this agent's OpenAI calls
     
     def generate_user_personas(self, market_report: EnhancedMarketAnalysisReport) -> List[UserPersona]:
         """Generate detailed user personas based on market analysis"""
@@ -96,7 +102,8 @@ class ProductManagerAgent:
         """
         
         try:
-            response = self.client.chat.completions.create(
+            content = complete_chat(
+                self, "personas",
                 model=self.model,
                 response_format={"type": "json_object"},
                 messages=[
@@ -107,7 +114,7 @@ class ProductManagerAgent:
                 max_tokens=3000
             )
             
-            result = json.loads(response.choices[0].message.content)
+            result = json.loads(content)
             personas = [UserPersona(**persona) for persona in result["personas"]]
             return personas
             
@@ -201,7 +208,8 @@ class ProductManagerAgent:
         """
         
         try:
-            response = self.client.chat.completions.create(
+            content = complete_chat(
+                self, "features",
                 model=self.model,
                 response_format={"type": "json_object"},
                 messages=[
@@ -212,7 +220,7 @@ class ProductManagerAgent:
                 max_tokens=4000
             )
             
-            result = json.loads(response.choices[0].message.content)
+            result = json.loads(content)
             features = [Feature(**feature) for feature in result["features"]]
             return features
             
@@ -325,19 +333,32 @@ class ProductManagerAgent:
         
         return experiments
     
-    def create_product_roadmap(self, market_report: EnhancedMarketAnalysisReport) -> ProductRoadmap:
-        """Create complete product roadmap based on market analysis"""
+    def create_product_roadmap(self, market_report: EnhancedMarketAnalysisReport, progress_callback: Optional[Callable[[str, str], None]] = None,
+                               prioritization_callback: Optional[Callable[[Dict], None]] = None) -> ProductRoadmap:
+        """Create complete product roadmap based on market analysis
+
+        progress_callback, if given, is called as progress_callback(step, message) when each
+        step finishes. prioritization_callback, if given, receives the output of
+        `prioritize_features` as soon as it is ready, so a caller can start work that only
+        needs the MVP and milestone feature lists before the roadmap is assembled.
+        """
         print(f"🗺️ Creating product roadmap for: {market_report.startup_idea}", flush=True)
         print("=" * 80, flush=True)
+        progress = progress_callback or (lambda step, message="": None)
         
         # Step 1: Generate user personas
         personas = self.generate_user_personas(market_report)
+        progress("personas", f"Generated {len(personas)} user personas")
         
         # Step 2: Generate features based on personas and market analysis
         features = self.generate_features(market_report, personas)
+        progress("features", f"Generated {len(features)} product features")
         
         # Step 3: Prioritize features
         prioritization = self.prioritize_features(features, personas)
+        progress("prioritization", f"Prioritized {len(prioritization['mvp_features'])} MVP features")
+        if prioritization_callback:
+            prioritization_callback(prioritization)
         
         # Step 4: Generate validation experiments
         validation_experiments = self.generate_validation_experiments(personas, prioritization["mvp_features"])
@@ -365,11 +386,13 @@ class ProductManagerAgent:
         
         return roadmap
 
-def run_product_planning(market_analysis_result: EnhancedMarketAnalysisReport) -> ProductRoadmap:
+def run_product_planning(market_analysis_result: EnhancedMarketAnalysisReport, progress_callback: Optional[Callable[[str, str], None]] = None,
+                         stream_callback: Optional[StreamCallback] = None, priority: int = INTERACTIVE,
+                         prioritization_callback: Optional[Callable[[Dict], None]] = None) -> ProductRoadmap:
     """Run the complete product planning process"""
-    agent = ProductManagerAgent()
+    agent = ProductManagerAgent(stream_callback, priority)
     try:
-        roadmap = agent.create_product_roadmap(market_analysis_result)
+        roadmap = agent.create_product_roadmap(market_analysis_result, progress_callback, prioritization_callback)
         return roadmap
         
     except Exception as e:
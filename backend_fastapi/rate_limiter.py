@@ -0,0 +1,69 @@
+"""Thread-safe token bucket rate limiter shared by the outbound API clients."""
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Classic token bucket: holds up to `capacity` tokens and refills at `rate` tokens per second.
+    
+    Callers block in `acquire` until enough tokens are available, which lets concurrent workers
+    share a single quota without sleeping a fixed amount after every call.
+    """
+    
+    def __init__(self, rate: float, capacity: float):
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("rate and capacity must be positive")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+    
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """Take `tokens` without waiting. Returns False if the bucket does not hold enough."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+    
+    def wait_time(self, tokens: float = 1) -> float:
+        """Seconds until `tokens` will be available, without taking them (0 if available now)"""
+        with self._lock:
+            self._refill()
+            return max(0.0, (tokens - self._tokens) / self.rate)
+    
+    def acquire(self, tokens: float = 1, timeout: float = None) -> bool:
+        """
+        Block until `tokens` are available and take them.
+        
+        Args:
+            tokens (float): Number of tokens to take (at most the bucket capacity)
+            timeout (float): Maximum seconds to wait, or None to wait indefinitely
+            
+        Returns:
+            bool: True if the tokens were taken, False if the timeout expired first
+        """
+        if tokens > self.capacity:
+            raise ValueError("Cannot acquire more tokens than the bucket capacity")
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return True
+                wait_time = (tokens - self._tokens) / self.rate
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait_time = min(wait_time, remaining)
+            time.sleep(wait_time)
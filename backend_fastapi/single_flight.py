@@ -0,0 +1,159 @@
+"""Coalescing of identical agent runs that are in flight at the same time."""
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+SINGLE_FLIGHT_ENABLED = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() in ("1", "true", "yes")
+
+
+def normalize_idea(startup_idea: str) -> str:
+    """Case- and whitespace-insensitive form of an idea, so a resubmitted idea maps to the same key"""
+    return " ".join(startup_idea.lower().split())
+
+
+def fingerprint(value: Any) -> str:
+    """Stable hash of a JSON document regardless of key order"""
+    encoded = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class _Call:
+    """One in-flight run, the callbacks of every caller attached to it and the events sent so far."""
+
+    def __init__(self, leader_callbacks: Dict[str, Optional[Callable]]):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.leader_callbacks = leader_callbacks
+        self.followers: Dict[str, list] = {}
+        self.events: list = []
+        self.lock = threading.Lock()
+        # Held while events are delivered to followers, so a replay cannot interleave with a broadcast
+        self.delivery = threading.RLock()
+
+    def attach(self, callbacks: Dict[str, Optional[Callable]]):
+        with self.delivery:
+            with self.lock:
+                for name, callback in callbacks.items():
+                    if callback is not None:
+                        self.followers.setdefault(name, []).append(callback)
+                events = list(self.events)
+            # Bring the new caller up to date with what the others have already seen
+            for name, args in events:
+                callback = callbacks.get(name)
+                if callback is not None:
+                    self._deliver(name, callback, args)
+
+    def broadcaster(self, name: str) -> Callable:
+        leader = self.leader_callbacks.get(name)
+
+        def broadcast(*args):
+            with self.delivery:
+                with self.lock:
+                    self.events.append((name, args))
+                    followers = list(self.followers.get(name, ()))
+                for callback in followers:
+                    self._deliver(name, callback, args)
+            if leader is not None:
+                leader(*args)
+        return broadcast
+
+    @staticmethod
+    def _deliver(name: str, callback: Callable, args: tuple):
+        try:
+            callback(*args)
+        except Exception as e:
+            # A follower that went away must not break the run everyone else waits for
+            print(f"Error in coalesced {name}: {str(e)}", flush=True)
+
+
+class SingleFlight:
+    """
+    Runs at most one computation per key at a time.
+
+    The first caller for a key (the leader) runs the computation; callers that arrive with the
+    same key while it is running wait for it and receive the same result, or the same exception.
+    Once it finishes the key is released, so later calls compute afresh (completed results are
+    the caches' job, see llm_cache).
+
+    Callbacks are shared too: `func` is called with a broadcaster for every callback name, even
+    where the leader's own callback is None, so a streaming caller joining a non-streaming run
+    still gets its events. Each broadcaster forwards a call to the leader's callback and to those
+    of the callers attached so far, and records it; a caller that joins late first receives the
+    recorded events in order, then the live ones. Callers of one key must therefore pass the
+    same callback names.
+
+    Usage:
+        report = single_flight.run(key, lambda progress_callback: work(progress_callback),
+                                   progress_callback=progress_callback)
+    """
+
+    def __init__(self):
+        self.leaders = 0
+        self.coalesced = 0
+        self._calls: Dict[Any, _Call] = {}
+        self._lock = threading.Lock()
+
+    def run(self, key: Any, func: Callable[..., Any], **callbacks: Optional[Callable]) -> Any:
+        """
+        Run `func`, or wait for the identical run already in flight.
+
+        Args:
+            key: Identifies identical runs; must be hashable
+            func (callable): Called as func(**callbacks) with a broadcaster in place of each callback
+            **callbacks: This caller's callbacks (None where it has none)
+
+        Returns:
+            The result of the run
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call(callbacks)
+                self._calls[key] = call
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            # Outside the lock: replaying the earlier events may take a while
+            call.attach(callbacks)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(**{name: call.broadcaster(name) for name in callbacks})
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self) -> Dict[str, int]:
+        """Return the runs started, the calls that joined a run in flight and the runs in flight"""
+        with self._lock:
+            return {'leaders': self.leaders, 'coalesced': self.coalesced, 'in_flight': len(self._calls)}
+
+
+# Shared by every request in the process
+single_flight = SingleFlight() if SINGLE_FLIGHT_ENABLED else None
+
+
+def coalesce(key: Any, func: Callable[..., Any], **callbacks: Optional[Callable]) -> Any:
+    """Run `func` through the shared SingleFlight, or directly if SINGLE_FLIGHT_ENABLED is off"""
+    if single_flight is None:
+        return func(**callbacks)
+    return single_flight.run(key, func, **callbacks)
@@ -1,7 +1,8 @@
-from openai import OpenAI
 import os
 import json
-from typing import List, Dict, Optional, Any, Tuple
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import List, Dict, Optional, Any, Tuple, Callable
 from pydantic import BaseModel, Field
 from datetime import datetime
 from dotenv import load_dotenv
@@ -10,10 +11,23 @@ from dotenv import load_dotenv
 from product_manager import ProductRoadmap
 # Import the JSON helper functions
 from json_helper_updated import extract_json_from_response, normalize_tech_stack_json, normalize_api_endpoints, normalize_deployment_strategy, normalize_security_considerations, normalize_third_party_services
+# Import the streaming completion helper
+from llm_stream import complete_chat, StreamCallback
+from llm_client import get_llm_client
+from llm_scheduler import INTERACTIVE
 
 # Load environment variables
 load_dotenv()
 
+# Blueprint sections are independent OpenAI calls, so they run on a shared, bounded worker pool.
+# Each call is capped at BLUEPRINT_SECTION_TIMEOUT seconds; a section that times out or fails
+# falls back to the default returned by its own method.
+BLUEPRINT_MAX_WORKERS = int(os.getenv("BLUEPRINT_MAX_WORKERS", "18"))
+BLUEPRINT_SECTION_TIMEOUT = float(os.getenv("BLUEPRINT_SECTION_TIMEOUT", "60"))
+BLUEPRINT_SECTION_RETRIES = int(os.getenv("BLUEPRINT_SECTION_RETRIES", "1"))
+
+_blueprint_executor = ThreadPoolExecutor(max_workers=BLUEPRINT_MAX_WORKERS, thread_name_prefix="blueprint")
+
 # Model definitions for the Technical Architect
 
 class TechStackComponent(BaseModel):
@@ -81,9 +95,17 @@ class TechnicalBlueprint(BaseModel):
 class TechnicalArchitectAgent:
     """Technical Architect agent that generates a technical blueprint based on a product roadmap."""
     
-    def __init__(self):
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    agent_name = "technical_architect"  # label for shared completion cache statistics
+    
+    def __init__(self, stream_callback: Optional[StreamCallback] = None, priority: int = INTERACTIVE):
+        # Shares the process-wide connection pool, with the blueprint's own timeout and retries
+        self.client = get_llm_client(timeout=BLUEPRINT_SECTION_TIMEOUT)
+        self.llm_retries = BLUEPRINT_SECTION_RETRIES
+        self.priority = priority  # scheduling priority of this agent's OpenAI calls
         self.model = "gpt-4o-mini"  # Using the same model as the other agents
+        # Set to stream sections as they are generated; sections run concurrently, so events
+        # from different sections interleave and carry the section name as their step
+        self.stream_callback = stream_callback
     
     def recommend_tech_stack(self, product_roadmap: ProductRoadmap) -> Dict[str, List[TechStackComponent]]:
         """Recommend a technology stack based on the product roadmap."""
@@ -122,7 +144,8 @@ class TechnicalArchitectAgent:
             Format as a JSON object with categories as keys and arrays of technology objects as values.
             """
             
-            response = self.client.chat.completions.create(
+            content = complete_chat(
+                self, "tech_stack",
                 model=self.model,
                 messages=[{"role": "system", "content": "You are a Technical Architect specialized in designing technical solutions for startups."},
                           {"role": "user", "content": prompt}],
@@ -130,7 +153,7 @@ class TechnicalArchitectAgent:
                 temperature=0.7
             )
             
-            tech_stack_json = extract_json_from_response(response.choices[0].message.content)
+            tech_stack_json = extract_json_from_response(content)
             # Apply normalization to ensure all required fields are present
             normalized_tech_stack = normalize_tech_stack_json(tech_stack_json)
             tech_stack = {}
@@ -196,14 +219,15 @@ class TechnicalArchitectAgent:
             Format as a JSON array of database objects.
             """
             
-            response = self.client.chat.completions.create(
+            content = complete_chat(
+                self, "database_schema",
                 model=self.model,
                 messages=[{"role": "system", "content": "You are a Technical Architect specialized in database design."},
                           {"role": "user", "content": prompt}],
                 max_tokens=2000,
                 temperature=0.7            )
             
-            schema_json = extract_json_from_response(response.choices[0].message.content)
+            schema_json = extract_json_from_response(content)
             
             # Handle the case where the model returns a wrapper object
             if isinstance(schema_json, dict) and "tables" in schema_json:
@@ -361,7 +385,8 @@ class TechnicalArchitectAgent:
             Format as a JSON array of endpoint objects.
             """
             
-            response = self.client.chat.completions.create(
+            content = complete_chat(
+                self, "api_endpoints",
                 model=self.model,
                 messages=[{"role": "system", "content": "You are a Technical Architect specialized in API design."},
                           {"role": "user", "content": prompt}],
@@ -369,7 +394,7 @@ class TechnicalArchitectAgent:
                 temperature=0.7
             )
             
-            endpoints_json = extract_json_from_response(response.choices[0].message.content)
+            endpoints_json = extract_json_from_response(content)
             # Apply normalization to ensure all required fields are present
             normalized_endpoints = normalize_api_endpoints(endpoints_json)
             return [APIEndpoint(**endpoint) for endpoint in normalized_endpoints]
@@ -418,7 +443,8 @@ class TechnicalArchitectAgent:
             Format as a JSON object with these properties.
             """
             
-            response = self.client.chat.completions.create(
+            content = complete_chat(
+                self, "deployment_strategy",
                 model=self.model,
                 messages=[{"role": "system", "content": "You are a Technical Architect specialized in deployment strategies."},
                           {"role": "user", "content": prompt}],
@@ -426,7 +452,7 @@ class TechnicalArchitectAgent:
                 temperature=0.7
             )
             
-            deployment_json = extract_json_from_response(response.choices[0].message.content)
+            deployment_json = extract_json_from_response(content)
             # Apply normalization to ensure all required fields are present
             normalized_deployment = normalize_deployment_strategy(deployment_json)
             
@@ -479,7 +505,8 @@ class TechnicalArchitectAgent:
             Format as a JSON object with these properties.
             """
             
-            response = self.client.chat.completions.create(
+            content = complete_chat(
+                self, "security_considerations",
                 model=self.model,
                 messages=[{"role": "system", "content": "You are a Technical Architect specialized in security."},
                           {"role": "user", "content": prompt}],
@@ -487,7 +514,7 @@ class TechnicalArchitectAgent:
                 temperature=0.7
             )
             
-            security_json = extract_json_from_response(response.choices[0].message.content)
+            security_json = extract_json_from_response(content)
             # Apply normalization to ensure all required fields are present
             normalized_security = normalize_security_considerations(security_json)
             return SecurityConsiderations(**normalized_security)
@@ -537,7 +564,8 @@ class TechnicalArchitectAgent:
             Format as a JSON object with categories as keys and arrays of service objects as values.
             """
             
-            response = self.client.chat.completions.create(
+            content = complete_chat(
+                self, "third_party_services",
                 model=self.model,
                 messages=[{"role": "system", "content": "You are a Technical Architect specialized in third-party services."},
                           {"role": "user", "content": prompt}],
@@ -545,7 +573,7 @@ class TechnicalArchitectAgent:
                 temperature=0.7
             )
             
-            services_json = extract_json_from_response(response.choices[0].message.content)
+            services_json = extract_json_from_response(content)
             # Apply normalization to ensure all required fields are present
             normalized_services = normalize_third_party_services(services_json)
             return normalized_services
@@ -599,7 +627,8 @@ class TechnicalArchitectAgent:
             Format as a JSON array of tool objects.
             """
             
-            response = self.client.chat.completions.create(
+            content = complete_chat(
+                self, "development_tools",
                 model=self.model,
                 messages=[{"role": "system", "content": "You are a Technical Architect specialized in development tools."},
                           {"role": "user", "content": prompt}],
@@ -607,7 +636,7 @@ class TechnicalArchitectAgent:
                 temperature=0.7
             )
             
-            tools_json = extract_json_from_response(response.choices[0].message.content)
+            tools_json = extract_json_from_response(content)
             
             # Handle the case where the model returns a wrapper object
             if isinstance(tools_json, dict) and "tools" in tools_json:
@@ -677,7 +706,8 @@ class TechnicalArchitectAgent:
             Format as a JSON array of phase objects.
             """
             
-            response = self.client.chat.completions.create(
+            content = complete_chat(
+                self, "implementation_roadmap",
                 model=self.model,
                 messages=[{"role": "system", "content": "You are a Technical Architect specialized in project planning."},
                           {"role": "user", "content": prompt}],
@@ -685,7 +715,7 @@ class TechnicalArchitectAgent:
                 temperature=0.7
             )
             
-            roadmap_json = extract_json_from_response(response.choices[0].message.content)
+            roadmap_json = extract_json_from_response(content)
             
             # Handle the case where the model returns a wrapper object
             if isinstance(roadmap_json, dict) and "roadmap" in roadmap_json:
@@ -757,7 +787,8 @@ class TechnicalArchitectAgent:
               Important: Make the diagram clean and professional, avoiding too much detail that would make it cluttered.
             """
             
-            response = self.client.chat.completions.create(
+            content = complete_chat(
+                self, "architecture_diagram",
                 model=self.model,
                 messages=[{"role": "system", "content": "You are a Technical Architect specialized in system design."},
                           {"role": "user", "content": prompt}],
@@ -765,7 +796,7 @@ class TechnicalArchitectAgent:
                 temperature=0.7
             )
             
-            diagram_code = response.choices[0].message.content.strip()
+            diagram_code = content.strip()
             
             # If the model wrapped the code in markdown code blocks, remove them
             if diagram_code.startswith("```mermaid"):
@@ -826,32 +857,61 @@ class TechnicalArchitectAgent:
                - Monitoring and Logging: Tracks system performance and issues
             """
     
-    def generate_technical_blueprint(self, product_roadmap: ProductRoadmap) -> TechnicalBlueprint:
-        """Generate a complete technical blueprint based on the product roadmap."""
+    def start_sections(self, product_roadmap: ProductRoadmap) -> Dict[str, Future]:
+        """Submit every blueprint section to the blueprint worker pool and return their futures.
+
+        Sections only read the roadmap's startup_idea, mvp_features and milestone feature lists,
+        so they can be started from a partial roadmap as soon as features are prioritized.
+        """
+        sections = {
+            "tech_stack": self.recommend_tech_stack,
+            "database_schema": self.design_database_schema,
+            "api_endpoints": self.define_api_endpoints,
+            "deployment_strategy": self.define_deployment_strategy,
+            "security_considerations": self.define_security_considerations,
+            "third_party_services": self.recommend_third_party_services,
+            "development_tools": self.recommend_development_tools,
+            "implementation_roadmap": self.create_implementation_roadmap,
+            "architecture_diagram": self.design_architecture_diagram,
+        }
+        return {name: _blueprint_executor.submit(method, product_roadmap) for name, method in sections.items()}
+    
+    def finish_blueprint(self, startup_idea: str, futures: Dict[str, Future],
+                         progress_callback: Optional[Callable[[str, str], None]] = None) -> TechnicalBlueprint:
+        """Wait for the sections started by `start_sections` and assemble the blueprint.
+
+        progress_callback, if given, is called as progress_callback(section, message) as each
+        section finishes, in completion order.
+        """
+        start_time = time.perf_counter()
+        if progress_callback:
+            names = {future: name for name, future in futures.items()}
+            for future in as_completed(names):
+                progress_callback(names[future], f"Generated {names[future].replace('_', ' ')}")
         
-        tech_stack = self.recommend_tech_stack(product_roadmap)
-        database_schema = self.design_database_schema(product_roadmap)
-        api_endpoints = self.define_api_endpoints(product_roadmap)
-        deployment_strategy = self.define_deployment_strategy(product_roadmap)
-        security_considerations = self.define_security_considerations(product_roadmap)
-        third_party_services = self.recommend_third_party_services(product_roadmap)
-        development_tools = self.recommend_development_tools(product_roadmap)
-        implementation_roadmap = self.create_implementation_roadmap(product_roadmap)
-        architecture_diagram = self.design_architecture_diagram(product_roadmap)
+        # Each section method catches its own errors (including OpenAI timeouts) and returns a
+        # default value, so gathering only has to wait for the results.
+        results = {name: future.result() for name, future in futures.items()}
+        print(f"🏗️ Generated {len(results)} blueprint sections in {time.perf_counter() - start_time:.1f}s", flush=True)
         
         return TechnicalBlueprint(
-            startup_idea=product_roadmap.startup_idea,
-            tech_stack=tech_stack,
-            database_schema=database_schema,
-            api_endpoints=api_endpoints,
-            deployment_strategy=deployment_strategy,
-            security_considerations=security_considerations,
-            third_party_services=third_party_services,
-            development_tools=development_tools,
-            implementation_roadmap=implementation_roadmap,
-            architecture_diagram=architecture_diagram
+            startup_idea=startup_idea,
+            **results
         )
     
+    def generate_technical_blueprint(self, product_roadmap: ProductRoadmap, progress_callback: Optional[Callable[[str, str], None]] = None) -> TechnicalBlueprint:
+        """Generate a complete technical blueprint based on the product roadmap.
+
+        Every section depends only on the product roadmap, so all of them are submitted to the
+        blueprint worker pool at once and gathered afterwards. Wall-clock time is therefore close
+        to the slowest single section instead of the sum of all nine.
+
+        progress_callback, if given, is called as progress_callback(section, message) as each
+        section finishes, in completion order.
+        """
+        futures = self.start_sections(product_roadmap)
+        return self.finish_blueprint(product_roadmap.startup_idea, futures, progress_callback)
+    
     def _extract_json_from_response(self, text: str) -> Any:
         """
         Helper method to extract JSON from model responses that may include explanatory text.
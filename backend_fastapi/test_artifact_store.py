@@ -0,0 +1,39 @@
+"""Tests of SessionArtifactStore eviction to and restoring from its spill."""
+from artifact_store import MARKET_ANALYSIS, SessionArtifactStore
+from disk_cache import MemoryCache
+
+
+def _report(idea):
+    return {"startup_idea": idea}
+
+
+def test_least_recently_used_session_is_spilled_and_restored():
+    store = SessionArtifactStore(max_sessions=2, ttl=60, spill=MemoryCache(ttl=60, max_entries=10))
+    for session_id in ("s1", "s2", "s3"):
+        store.put("u1", session_id, MARKET_ANALYSIS, _report(session_id))
+
+    assert store.stats()["spilled"] == 1
+    assert store.get("u1", "s1", MARKET_ANALYSIS) == _report("s1")
+    assert store.stats()["spill_hits"] == 1
+
+
+def test_session_restored_from_the_spill_keeps_memory_within_max_sessions():
+    store = SessionArtifactStore(max_sessions=2, ttl=60, spill=MemoryCache(ttl=60, max_entries=10))
+    for session_id in ("s1", "s2", "s3"):
+        store.put("u1", session_id, MARKET_ANALYSIS, _report(session_id))
+
+    store.get("u1", "s1", MARKET_ANALYSIS)
+
+    assert store.stats()["sessions_in_memory"] == 2
+    # s2 was the least recently used, so it made room for s1 and is still found
+    assert store.stats()["spilled"] == 2
+    assert store.get("u1", "s2", MARKET_ANALYSIS) == _report("s2")
+    assert store.stats()["sessions_in_memory"] == 2
+
+
+def test_session_of_another_user_is_not_found():
+    store = SessionArtifactStore(max_sessions=2, ttl=60)
+    store.put("u1", "s1", MARKET_ANALYSIS, _report("s1"))
+
+    assert store.get("u2", "s1", MARKET_ANALYSIS) is None
+    assert store.get_all("u2", "s1") == {}
@@ -0,0 +1,131 @@
+"""Tests of batch_runner: resuming after a crash and rerunning failed ideas."""
+import json
+import os
+import subprocess
+import sys
+import time
+
+# Keep the scraper's persistent caches out of the working tree
+for setting in ("SEARCH_CACHE_ENABLED", "PAGE_CACHE_ENABLED", "IDEA_INDEX_ENABLED", "LLM_CACHE_ENABLED"):
+    os.environ.setdefault(setting, "false")
+
+import batch_runner
+
+IDEAS = [
+    "Dog walking app",
+    "Meal planner for families",
+    "Plant care reminders",
+    "AI fitness coach",
+    "Language exchange marketplace",
+    "Budgeting app for students",
+]
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _write_ideas(path, ideas):
+    with open(path, "w", encoding="utf-8") as f:
+        for number, idea in enumerate(ideas):
+            f.write(json.dumps({"id": f"idea-{number}", "startup_idea": idea}) + "\n")
+
+
+def _output_lines(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.endswith("\n")]
+
+
+def _run_mock_batch(input_path, output_path, **popen_kwargs):
+    env = dict(os.environ, MOCK_LATENCY="0.05", PYTHONUNBUFFERED="1")
+    return subprocess.Popen(
+        [sys.executable, os.path.join(BACKEND_DIR, "batch_runner.py"), input_path, "-o", output_path,
+         "--mock", "--parallelism", "1"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, **popen_kwargs
+    )
+
+
+def test_killed_run_resumes_and_writes_each_idea_once(tmp_path):
+    input_path, output_path = str(tmp_path / "ideas.jsonl"), str(tmp_path / "results.jsonl")
+    _write_ideas(input_path, IDEAS)
+
+    process = _run_mock_batch(input_path, output_path)
+    deadline = time.monotonic() + 60
+    while len(_output_lines(output_path)) < 2 and process.poll() is None and time.monotonic() < deadline:
+        time.sleep(0.02)
+    process.kill()
+    process.wait()
+    written = len(_output_lines(output_path))
+    assert 2 <= written < len(IDEAS)
+
+    assert _run_mock_batch(input_path, output_path).wait(timeout=120) == 0
+
+    lines = _output_lines(output_path)
+    assert sorted(line["id"] for line in lines) == [f"idea-{number}" for number in range(len(IDEAS))]
+    assert all(line["status"] == "completed" and line["technical_blueprint"] for line in lines)
+
+
+def test_failed_idea_is_retried_without_duplicate_lines(tmp_path, monkeypatch):
+    input_path, output_path = str(tmp_path / "ideas.jsonl"), str(tmp_path / "results.jsonl")
+    _write_ideas(input_path, IDEAS[:3])
+    failing = {"idea-1"}
+
+    def process_idea(item, checkpoints):
+        if item["id"] in failing:
+            return {"id": item["id"], "startup_idea": item["startup_idea"], "status": "failed",
+                    "error": "RuntimeError: no search quota", "elapsed_seconds": 0}
+        return {"id": item["id"], "startup_idea": item["startup_idea"], "status": "completed",
+                "error": None, "elapsed_seconds": 0}
+
+    monkeypatch.setattr(batch_runner, "process_idea", process_idea)
+
+    for _ in range(2):
+        summary = batch_runner.run_batch(input_path, output_path, parallelism=2)
+        assert summary["failed"] == 1
+        assert sorted(line["id"] for line in _output_lines(output_path)) == ["idea-0", "idea-2"]
+
+    failing.clear()
+    summary = batch_runner.run_batch(input_path, output_path, parallelism=2)
+
+    assert summary == {"completed": 1, "failed": 0, "skipped": 2}
+    assert sorted(line["id"] for line in _output_lines(output_path)) == ["idea-0", "idea-1", "idea-2"]
+
+
+def test_cut_off_last_line_is_dropped_and_rerun(tmp_path, monkeypatch):
+    input_path, output_path = str(tmp_path / "ideas.jsonl"), str(tmp_path / "results.jsonl")
+    _write_ideas(input_path, IDEAS[:2])
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"id": "idea-0", "status": "completed"}) + "\n" + '{"id": "idea-1", "sta')
+
+    monkeypatch.setattr(batch_runner, "process_idea", lambda item, checkpoints: {
+        "id": item["id"], "startup_idea": item["startup_idea"], "status": "completed", "error": None,
+        "elapsed_seconds": 0})
+    summary = batch_runner.run_batch(input_path, output_path)
+
+    assert summary == {"completed": 1, "failed": 0, "skipped": 1}
+    assert [line["id"] for line in _output_lines(output_path)] == ["idea-0", "idea-1"]
+
+
+def test_failed_market_analysis_is_not_recorded_as_completed(tmp_path, monkeypatch):
+    import market_agent
+    from http_client import set_http_client
+    from llm_client import set_llm_client
+    from mock_services import MockHTTPClient, MockLLMClient
+
+    # The AI analysis answers with something that is not JSON
+    monkeypatch.setattr(market_agent, "complete_chat", lambda *args, **kwargs: "Sorry, I can't help with that.")
+    # Wait for every competitor, so none is still being fetched once the stubs are removed
+    monkeypatch.setattr(market_agent, "COMPETITORS_NEEDED", market_agent.MAX_COMPETITOR_CANDIDATES)
+    set_http_client(MockHTTPClient())
+    set_llm_client(MockLLMClient())
+    checkpoints = batch_runner.CheckpointStore(str(tmp_path / "checkpoints.sqlite3"))
+    try:
+        line = batch_runner.process_idea({"id": "idea-0", "startup_idea": IDEAS[0]}, checkpoints)
+        assert checkpoints.load("idea-0") == {}
+    finally:
+        checkpoints.close()
+        set_http_client(None)
+        set_llm_client(None)
+
+    assert line["status"] == "failed"
+    assert line["error"].startswith("JSONDecodeError")
+    assert line["market_analysis"] is None
@@ -0,0 +1,89 @@
+"""Tests of Accept-Encoding handling in the response compression middleware."""
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from compression import CompressionMiddleware, _accepts
+
+
+@pytest.mark.parametrize("header, accepted", [
+    ("gzip", True),
+    ("GZIP;Q=1", True),
+    ("br, gzip ; q = 0.8", True),
+    ("gzip;q=0.5;x=y", True),
+    ("gzip;level=1", True),
+    ("gzip;q=0", False),
+    ("gzip;q=high", False),
+    ("gzip;q=", False),
+    ("gzip;q=nan", False),
+    ("gzip;q=2", False),
+    ("deflate, br", False),
+    ("", False),
+])
+def test_accepts(header, accepted):
+    assert _accepts(header, "gzip") is accepted
+
+
+@pytest.fixture
+def client():
+    app = Starlette(routes=[Route("/", lambda request: PlainTextResponse("x" * 4096))])
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+    return TestClient(app)
+
+
+def test_malformed_q_value_is_served_uncompressed(client):
+    response = client.get("/", headers={"Accept-Encoding": "gzip;q=high"})
+
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert response.text == "x" * 4096
+
+
+def test_extra_parameters_do_not_prevent_gzip(client):
+    response = client.get("/", headers={"Accept-Encoding": "gzip;q=0.5;x=y"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text == "x" * 4096
+
+
+@pytest.fixture
+def app_client():
+    async def chunks():
+        for number in range(50):
+            yield f"chunk {number} ".encode() * 20
+
+    async def events():
+        yield b"data: hello\n\n" * 200
+
+    app = Starlette(routes=[
+        Route("/small", lambda request: PlainTextResponse("tiny")),
+        Route("/stream", lambda request: StreamingResponse(chunks(), media_type="text/plain")),
+        Route("/events", lambda request: StreamingResponse(events(), media_type="text/event-stream")),
+    ])
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+    return TestClient(app)
+
+
+def test_small_response_is_not_compressed(app_client):
+    response = app_client.get("/small", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert response.headers["content-length"] == "4"
+
+
+def test_streamed_response_is_compressed_chunk_by_chunk(app_client):
+    response = app_client.get("/stream", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.text == "".join(f"chunk {number} " * 20 for number in range(50))
+
+
+def test_event_streams_are_passed_through(app_client):
+    response = app_client.get("/events", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert response.text == "data: hello\n\n" * 200
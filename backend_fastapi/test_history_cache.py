@@ -0,0 +1,188 @@
+"""Tests of the history read cache in supabase_client, run against the in-memory MockSupabaseClient."""
+import time
+
+import pytest
+
+import supabase_client as sc
+from mock_services import MockSupabaseClient
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """A fresh mock database and history cache, with writes sent straight to the database"""
+    client = MockSupabaseClient()
+    monkeypatch.setattr(sc, "supabase_client", client)
+    monkeypatch.setattr(sc, "history_cache", sc.HistoryCache(ttl=60, max_entries=100))
+    monkeypatch.setattr(sc, "SUPABASE_WRITE_BEHIND_ENABLED", False)
+    return client
+
+
+def _market(idea):
+    return {"startup_idea": idea, "opportunity_score": 7.0}
+
+
+def _store(user_id, session_id, idea):
+    sc.store_agent_outputs(user_id, session_id, _market(idea), None, None)
+
+
+def test_session_read_is_served_from_cache_after_a_miss(db):
+    _store("u1", "s1", "Dog walking app")
+    requests = db.requests
+
+    first = sc.get_agent_output_by_session("s1")
+    second = sc.get_agent_output_by_session("s1")
+
+    assert first == second
+    assert first[sc.MARKET_ANALYST_COLUMN]["startup_idea"] == "Dog walking app"
+    assert db.requests == requests + 1
+    stats = sc.history_cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_history_page_is_served_from_cache_after_a_miss(db):
+    _store("u1", "s1", "Dog walking app")
+    requests = db.requests
+
+    assert sc.get_agent_outputs_by_user("u1") == sc.get_agent_outputs_by_user("u1")
+    assert db.requests == requests + 1
+
+
+def test_missing_session_is_not_cached(db):
+    assert sc.get_agent_output_by_session("nope") is None
+    _store("u1", "nope", "Late idea")
+    assert sc.get_agent_output_by_session("nope") is not None
+
+
+def test_store_agent_outputs_invalidates_the_users_pages(db):
+    _store("u1", "s1", "Dog walking app")
+    _store("u2", "s2", "Meal planner")
+    rows, _ = sc.get_agent_outputs_by_user("u1")
+    sc.get_agent_outputs_by_user("u2")
+    assert [row["session_id"] for row in rows] == ["s1"]
+
+    _store("u1", "s3", "Plant care reminders")
+
+    rows, _ = sc.get_agent_outputs_by_user("u1")
+    assert sorted(row["session_id"] for row in rows) == ["s1", "s3"]
+    # Other users' pages stay cached
+    requests = db.requests
+    sc.get_agent_outputs_by_user("u2")
+    assert db.requests == requests
+
+
+def test_write_behind_writer_invalidates_session_and_pages(db):
+    writer = sc.AgentOutputWriter(flush_interval=0.01, backoff=0.01)
+    writer.enqueue("u1", "s1", market_analyst_response=_market("Dog walking app"))
+    assert writer.flush(5)
+    assert sc.get_agent_output_by_session("s1").get(sc.PRODUCT_MANAGER_COLUMN) is None
+    assert len(sc.get_agent_outputs_by_user("u1")[0]) == 1
+
+    writer.enqueue("u1", "s1", product_manager_response={"mvp_features": ["Booking"]})
+    writer.enqueue("u1", "s2", market_analyst_response=_market("Meal planner"))
+    assert writer.flush(5)
+
+    assert sc.get_agent_output_by_session("s1")[sc.PRODUCT_MANAGER_COLUMN] == {"mvp_features": ["Booking"]}
+    assert len(sc.get_agent_outputs_by_user("u1")[0]) == 2
+    assert sc.history_cache.stats()["invalidations"] >= 2
+
+
+def test_read_overlapping_an_invalidation_is_not_cached():
+    cache = sc.HistoryCache(ttl=60, max_entries=10)
+    loads = []
+
+    def load():
+        loads.append(1)
+        # A write lands while this read is in flight
+        cache.invalidate("u1", "s1")
+        return {"stale": True}
+
+    assert cache.read_through("session:s1", load) == {"stale": True}
+    assert cache.read_through("session:s1", lambda: {"fresh": True}) == {"fresh": True}
+    assert cache.read_through("session:s1", load) == {"fresh": True}
+    assert len(loads) == 1
+
+
+def test_entries_expire_after_the_ttl():
+    cache = sc.HistoryCache(ttl=0.05, max_entries=10)
+    loads = []
+    cache.read_through("session:s1", lambda: loads.append(1) or {"n": len(loads)})
+    cache.read_through("session:s1", lambda: loads.append(1) or {"n": len(loads)})
+    time.sleep(0.1)
+
+    assert cache.read_through("session:s1", lambda: loads.append(1) or {"n": len(loads)}) == {"n": 2}
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = sc.HistoryCache(ttl=60, max_entries=2)
+    cache.read_through("a", lambda: "A")
+    cache.read_through("b", lambda: "B")
+    cache.read_through("a", lambda: "A2")
+    cache.read_through("c", lambda: "C")
+
+    assert cache.read_through("a", lambda: "A3") == "A"
+    assert cache.read_through("b", lambda: "B2") == "B2"
+
+
+def test_stats_report_hit_ratio_and_invalidations():
+    cache = sc.HistoryCache(ttl=60, max_entries=10)
+    for _ in range(4):
+        cache.read_through("session:s1", lambda: {"n": 1})
+    cache.invalidate("u1", "s1")
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["invalidations"]) == (3, 1, 1)
+    assert stats["hit_ratio"] == pytest.approx(0.75)
+
+    cache.clear()
+    assert cache.stats()["invalidations"] == 0
+
+
+def test_flush_waits_only_for_the_requested_users_writes(db):
+    writes = []
+
+    def slow_write(rows):
+        writes.append([row["user_id"] for row in rows])
+        time.sleep(0.3)
+        sc.upsert_agent_outputs(rows)
+
+    writer = sc.AgentOutputWriter(write=slow_write, flush_interval=5)
+    writer.enqueue("u1", "s1", market_analyst_response=_market("Dog walking app"))
+    writer.enqueue("u2", "s2", market_analyst_response=_market("Meal planner"))
+
+    start = time.monotonic()
+    assert not writer.has_pending(user_id="u3")
+    assert writer.flush(5, user_id="u3")
+    assert time.monotonic() - start < 0.1
+
+    # A waiting reader makes the writer send at once instead of waiting for a full batch
+    assert writer.flush(5, user_id="u1")
+    assert time.monotonic() - start < 1
+    assert writer.flush(5, session_id="s2")
+    assert not writer.has_pending()
+    assert writes == [["u1", "u2"]]
+
+
+def test_history_pages_follow_the_cursor(db):
+    for number in range(3):
+        _store("u1", f"s{number}", f"Idea {number}")
+
+    first, cursor = sc.get_agent_outputs_by_user("u1", limit=2)
+    second, last_cursor = sc.get_agent_outputs_by_user("u1", limit=2, cursor=cursor)
+
+    assert [row["session_id"] for row in first + second] == ["s2", "s1", "s0"]
+    assert last_cursor is None
+
+
+@pytest.mark.parametrize("created_at, session_id", [
+    ("2024-05-01T12:00:00+00:00", 's1",user_id.neq."x'),
+    ("2024-05-01T12:00:00+00:00", "s1),or(user_id.neq.x"),
+    ("2024-05-01T12:00:00+00:00", "s1\\"),
+    ('2024-05-01",user_id.neq."x', "s1"),
+    ("yesterday", "s1"),
+    (1714564800, "s1"),
+])
+def test_cursor_values_that_could_alter_the_filter_are_rejected(db, created_at, session_id):
+    cursor = sc.encode_history_cursor({"created_at": created_at, "session_id": session_id})
+
+    with pytest.raises(ValueError):
+        sc.get_agent_outputs_by_user("u1", cursor=cursor)
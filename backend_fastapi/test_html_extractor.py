@@ -0,0 +1,53 @@
+"""Tests that the single-pass extractor matches the BeautifulSoup-based extraction it replaces.
+
+html_extractor drives bs4's internal html.parser tokenizer, so run these before raising the
+beautifulsoup4 upper bound in requirements.txt.
+"""
+import os
+
+import pytest
+
+# Keep the scraper's persistent caches out of the working tree
+for setting in ("SEARCH_CACHE_ENABLED", "PAGE_CACHE_ENABLED", "IDEA_INDEX_ENABLED"):
+    os.environ.setdefault(setting, "false")
+
+import market_agent
+from benchmarks import _synthetic_competitor_page
+from html_extractor import PageExtractor
+from llm_client import set_llm_client
+from mock_services import MockLLMClient
+
+PAGES = [
+    _synthetic_competitor_page(20),
+    "<html><head><title>Plans &amp; Pricing</title></head><body><div class='Pricing-Table'>"
+    "<p>Basic &#169; $9/month<br/>Pro &nbsp; $19</p></div></body></html>",
+    "<div class='about us'><p>Founded in 1999<p>Our team<li>stray item</div></span>"
+    "<![CDATA[raw]]><!-- note --><h2>Key Benefits</h2><ul><li>Fast</li><li>Cheap</ul>",
+    "<title>Unclosed<body><pre>\n  spaced  </pre><textarea> kept </textarea>"
+    "<a href='https://twitter.com/acme'>t</a><a href='/about'>About the company</a>",
+    "",
+]
+
+
+@pytest.fixture(scope="module")
+def agent():
+    set_llm_client(MockLLMClient())
+    yield market_agent.EnhancedMarketResearchAgent()
+    set_llm_client(None)
+
+
+@pytest.mark.parametrize("html", PAGES)
+def test_extractor_matches_beautifulsoup(agent, html):
+    url = "https://acme.example"
+
+    assert agent._parse_page(html, url) == agent._parse_page_with_soup(html, url)
+
+
+@pytest.mark.parametrize("html", PAGES)
+def test_chunked_feeding_matches_a_single_feed(agent, html):
+    extractor = PageExtractor()
+    for start in range(0, len(html), 7):
+        extractor.feed(html[start:start + 7])
+
+    url = "https://acme.example"
+    assert agent._build_page_result(extractor.close(), url) == agent._parse_page_with_soup(html, url)
@@ -0,0 +1,142 @@
+"""Tests of HTTPClient retries, timeouts and connection reuse against a local http.server."""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from http_client import HTTPClient
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Answers each request with the next (status, headers, delay) of the server's script."""
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.clients.append(self.client_address)
+            status, headers, delay = server.script.pop(0) if server.script else (200, {}, 0)
+        time.sleep(delay)
+        body = b"ok" if status == 200 else b"error"
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    """A local server; set `server.script` to the responses it should give, in order"""
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.daemon_threads = True
+    httpd.script = []
+    httpd.clients = []
+    httpd.lock = threading.Lock()
+    httpd.url = f"http://127.0.0.1:{httpd.server_port}/"
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def client():
+    http = HTTPClient(connect_timeout=1, read_timeout=2, max_retries=3, backoff_factor=0.01)
+    yield http
+    http.close()
+
+
+@pytest.mark.parametrize("status", [429, 500, 502, 503, 504])
+def test_retryable_status_is_retried_until_success(server, client, status):
+    server.script = [(status, {}, 0), (status, {}, 0), (200, {}, 0)]
+
+    response = client.get(server.url)
+
+    assert response.status_code == 200
+    assert response.text == "ok"
+    assert len(server.clients) == 3
+
+
+def test_other_errors_are_not_retried(server, client):
+    server.script = [(404, {}, 0)]
+
+    assert client.get(server.url).status_code == 404
+    assert len(server.clients) == 1
+
+
+def test_last_response_is_returned_when_retries_run_out(server, client):
+    server.script = [(503, {}, 0)] * 4
+
+    assert client.get(server.url).status_code == 503
+    assert len(server.clients) == 4
+
+
+def test_backoff_grows_exponentially(server):
+    http = HTTPClient(max_retries=3, backoff_factor=0.05)
+    server.script = [(503, {}, 0)] * 3
+    start = time.monotonic()
+
+    http.get(server.url)
+
+    # 0.05 + 0.1 + 0.2 seconds, each with up to the same again in jitter
+    assert 0.35 <= time.monotonic() - start < 1.5
+    http.close()
+
+
+def test_retry_after_is_honoured(server, client):
+    server.script = [(429, {"Retry-After": "1"}, 0)]
+    start = time.monotonic()
+
+    assert client.get(server.url).status_code == 200
+    assert time.monotonic() - start >= 0.9
+
+
+def test_retry_after_is_capped(server):
+    http = HTTPClient(max_retries=1, backoff_factor=0.01, max_retry_after=0.2)
+    server.script = [(503, {"Retry-After": "3600"}, 0)]
+    start = time.monotonic()
+
+    assert http.get(server.url).status_code == 200
+    assert time.monotonic() - start < 2
+    http.close()
+
+
+def test_read_timeout_is_retried_then_raised(server):
+    http = HTTPClient(connect_timeout=1, read_timeout=0.2, max_retries=1, backoff_factor=0.01)
+    server.script = [(200, {}, 1), (200, {}, 1)]
+
+    with pytest.raises(requests.Timeout):
+        http.get(server.url)
+    assert len(server.clients) == 2
+    http.close()
+
+
+def test_read_timeout_then_success(server, client):
+    server.script = [(200, {}, 1)]
+
+    assert client.get(server.url, timeout=(1, 0.2)).status_code == 200
+    assert len(server.clients) == 2
+
+
+def test_connections_are_reused(server, client):
+    for _ in range(5):
+        assert client.get(server.url).status_code == 200
+
+    assert len(server.clients) == 5
+    assert len(set(server.clients)) == 1
+
+
+def test_connections_are_reused_across_retries(server, client):
+    server.script = [(503, {}, 0), (200, {}, 0)]
+
+    client.get(server.url)
+
+    assert len(set(server.clients)) == 1
@@ -0,0 +1,72 @@
+"""Tests of IdeaIndex matching thresholds, expiry and rebuilding from its cache."""
+import time
+
+import pytest
+
+from disk_cache import MemoryCache, SQLiteCache
+from idea_index import IdeaIndex, normalize_idea
+
+SEARCH_RESULTS = {"competitors": [{"link": "https://acme.example", "title": "Acme"}]}
+COMPETITORS = [{"search_result": {"link": "https://acme.example"}, "scraped_data": {"title": "Acme"}}]
+
+
+def _index(cache):
+    return IdeaIndex(cache, reuse_threshold=0.85, warm_start_threshold=0.5)
+
+
+@pytest.fixture
+def index():
+    index = _index(MemoryCache(ttl=60, max_entries=10))
+    index.add("AI fitness coach app", SEARCH_RESULTS, COMPETITORS)
+    index.add("Marketplace for used cars", SEARCH_RESULTS, COMPETITORS)
+    return index
+
+
+def test_rewording_is_reused(index):
+    similar = index.find_similar("AI-powered fitness coaching app")
+
+    assert similar["startup_idea"] == "AI fitness coach app"
+    assert similar["reusable"] is True
+    assert similar["search_results"] == SEARCH_RESULTS
+    assert similar["competitor_data"] == COMPETITORS
+
+
+def test_related_idea_is_only_a_warm_start(index):
+    similar = index.find_similar("marketplace for used bikes")
+
+    assert similar["startup_idea"] == "Marketplace for used cars"
+    assert 0.5 <= similar["similarity"] < 0.85
+    assert similar["reusable"] is False
+
+
+def test_unrelated_idea_has_no_match(index):
+    assert index.find_similar("Recipe sharing network") is None
+
+
+def test_expired_entry_is_dropped_from_the_index():
+    index = _index(MemoryCache(ttl=0.01, max_entries=10))
+    index.add("AI fitness coach app", SEARCH_RESULTS, COMPETITORS)
+    time.sleep(0.02)
+
+    assert index.find_similar("AI fitness coach app") is None
+    assert normalize_idea("AI fitness coach app") not in index._terms
+
+
+def test_evicted_entry_is_dropped_from_the_index():
+    index = _index(MemoryCache(ttl=60, max_entries=1))
+    index.add("AI fitness coach app", SEARCH_RESULTS, COMPETITORS)
+    index.add("Marketplace for used cars", SEARCH_RESULTS, COMPETITORS)
+
+    assert index.find_similar("AI fitness coach app") is None
+    assert list(index._terms) == [normalize_idea("Marketplace for used cars")]
+
+
+def test_index_is_rebuilt_from_the_cache_keys(tmp_path):
+    path = str(tmp_path / "ideas.sqlite3")
+    _index(SQLiteCache(path, "idea_index", ttl=60, max_entries=10)).add(
+        "AI fitness coach app", SEARCH_RESULTS, COMPETITORS)
+
+    reopened = _index(SQLiteCache(path, "idea_index", ttl=60, max_entries=10))
+
+    assert list(reopened._terms) == [normalize_idea("AI fitness coach app")]
+    assert reopened.find_similar("AI-powered fitness coaching app")["reusable"] is True
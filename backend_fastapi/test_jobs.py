@@ -0,0 +1,84 @@
+"""Tests of JobManager status transitions and progress on both job backends."""
+import threading
+import time
+
+import pytest
+
+from jobs import (COMPLETED, FAILED, QUEUED, RUNNING, InMemoryJobBackend, JobManager, JobRecord,
+                  SQLiteJobBackend, _now)
+
+
+def _wait_for_status(manager, job_id, status, timeout=5):
+    deadline = time.monotonic() + timeout
+    while manager.get(job_id).status != status:
+        assert time.monotonic() < deadline, f"job never became {status}"
+        time.sleep(0.005)
+    return manager.get(job_id)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def manager(request, tmp_path):
+    backend = InMemoryJobBackend() if request.param == "memory" else SQLiteJobBackend(str(tmp_path / "jobs.sqlite3"))
+    return JobManager(backend, max_workers=1)
+
+
+def test_job_goes_from_queued_to_running_to_completed(manager):
+    release = threading.Event()
+
+    def blocking(idea, progress):
+        release.wait()
+        return {"startup_idea": idea}
+
+    first = manager.submit("market-analyst", blocking, "Dog walking app", user_id="u1", session_id="s1")
+    second = manager.submit("market-analyst", blocking, "Plant care reminders")
+
+    assert _wait_for_status(manager, first.job_id, RUNNING).result is None
+    # The single worker is busy, so the second job waits its turn
+    assert manager.get(second.job_id).status == QUEUED
+
+    release.set()
+    job = _wait_for_status(manager, first.job_id, COMPLETED)
+    assert job.result == {"startup_idea": "Dog walking app"}
+    assert (job.user_id, job.session_id, job.error) == ("u1", "s1", None)
+    assert _wait_for_status(manager, second.job_id, COMPLETED).result == {"startup_idea": "Plant care reminders"}
+
+
+def test_exception_marks_the_job_failed(manager):
+    def failing(progress):
+        raise RuntimeError("no search quota")
+
+    job = manager.submit("market-analyst", failing)
+
+    job = _wait_for_status(manager, job.job_id, FAILED)
+    assert job.error == "no search quota"
+    assert job.result is None
+
+
+def test_progress_events_are_recorded_in_order(manager):
+    def reporting(progress):
+        progress("search", "Completed 5 searches")
+        progress("competitor_analysis")
+        return {}
+
+    job = _wait_for_status(manager, manager.submit("market-analyst", reporting).job_id, COMPLETED)
+
+    assert [(event["step"], event["message"]) for event in job.progress] == [
+        ("search", "Completed 5 searches"), ("competitor_analysis", "")]
+    assert all(event["elapsed_seconds"] >= 0 for event in job.progress)
+
+
+def test_jobs_interrupted_by_a_restart_are_marked_failed(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    backend = SQLiteJobBackend(path)
+    now = _now()
+    for job_id, status in (("queued", QUEUED), ("running", RUNNING), ("done", COMPLETED)):
+        backend.save(JobRecord(job_id=job_id, kind="market-analyst", status=status, created_at=now, updated_at=now))
+
+    restarted = SQLiteJobBackend(path)
+    restarted.fail_unfinished("Interrupted by a server restart")
+
+    for job_id in ("queued", "running"):
+        job = restarted.get(job_id)
+        assert (job.status, job.error) == (FAILED, "Interrupted by a server restart")
+    assert restarted.get("done").status == COMPLETED
+    assert restarted.get("done").error is None
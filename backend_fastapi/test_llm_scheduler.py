@@ -0,0 +1,140 @@
+"""Tests of LLMScheduler admission order, budgets, concurrency and retries."""
+import threading
+import time
+
+import httpx
+import openai
+import pytest
+
+from llm_scheduler import BATCH, INTERACTIVE, LLMScheduler
+
+REQUEST = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+
+
+def _rate_limit_error(retry_after):
+    response = httpx.Response(429, headers={"retry-after": retry_after}, request=REQUEST)
+    return openai.RateLimitError("Rate limit reached", response=response, body=None)
+
+
+def _wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def _timed_admit(scheduler, **kwargs):
+    start = time.perf_counter()
+    with scheduler.admit(**kwargs):
+        pass
+    return time.perf_counter() - start
+
+
+def test_interactive_call_is_admitted_before_queued_batch_calls():
+    scheduler = LLMScheduler(max_concurrency=1)
+    release = threading.Event()
+    admitted = []
+
+    def call(name, priority):
+        with scheduler.admit(priority):
+            admitted.append(name)
+            if name == "holder":
+                release.wait()
+
+    threads = [threading.Thread(target=call, args=("holder", BATCH))]
+    threads[0].start()
+    _wait_until(lambda: admitted == ["holder"])
+    for number in range(2):
+        threads.append(threading.Thread(target=call, args=(f"batch-{number}", BATCH)))
+        threads[-1].start()
+        _wait_until(lambda: scheduler.stats()["queued"] == number + 1)
+    threads.append(threading.Thread(target=call, args=("interactive", INTERACTIVE)))
+    threads[-1].start()
+    _wait_until(lambda: scheduler.stats()["queued"] == 3)
+
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert admitted == ["holder", "interactive", "batch-0", "batch-1"]
+
+
+def test_requests_per_minute_budget_delays_admission():
+    # 10 requests per second with a burst of 100
+    scheduler = LLMScheduler(requests_per_minute=600)
+    for _ in range(100):
+        assert _timed_admit(scheduler, estimated_tokens=1) < 0.05
+
+    assert _timed_admit(scheduler, estimated_tokens=1) >= 0.08
+
+
+def test_tokens_per_minute_budget_delays_admission():
+    # 100 tokens per second with a burst of 1000
+    scheduler = LLMScheduler(tokens_per_minute=6000)
+    assert _timed_admit(scheduler, estimated_tokens=1000) < 0.05
+
+    assert _timed_admit(scheduler, estimated_tokens=20) >= 0.15
+
+
+def test_max_concurrency_is_respected():
+    scheduler = LLMScheduler(max_concurrency=2)
+    lock = threading.Lock()
+    running = []
+    peak = []
+
+    def call():
+        with scheduler.admit():
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            time.sleep(0.02)
+            with lock:
+                running.pop()
+
+    threads = [threading.Thread(target=call) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max(peak) == 2
+    assert scheduler.stats()["completed"] == 6
+
+
+def test_rate_limit_pauses_admissions_and_caps_retry_after():
+    scheduler = LLMScheduler(backoff_base=0.001, backoff_max=0.2)
+    calls = []
+
+    def func():
+        calls.append(time.perf_counter())
+        if len(calls) == 1:
+            raise _rate_limit_error("120")
+        return "answer"
+
+    result = []
+    thread = threading.Thread(target=lambda: result.append(scheduler.run(func)))
+    thread.start()
+    _wait_until(lambda: scheduler.stats()["retries"] == 1)
+
+    # Another caller waits out the pause as well
+    assert _timed_admit(scheduler) >= 0.1
+    thread.join()
+
+    assert result == ["answer"]
+    assert 0.2 <= calls[1] - calls[0] < 1
+    assert scheduler.stats()["rate_limited"] == 1
+
+
+def test_call_is_not_retried_when_can_retry_says_no():
+    scheduler = LLMScheduler(backoff_base=0.001)
+    calls = []
+
+    def func():
+        calls.append(1)
+        raise openai.APIConnectionError(request=REQUEST)
+
+    with pytest.raises(openai.APIConnectionError):
+        scheduler.run(func, max_retries=3, can_retry=lambda: False)
+
+    assert len(calls) == 1
+    assert scheduler.stats()["retries"] == 0
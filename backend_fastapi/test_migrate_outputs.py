@@ -0,0 +1,59 @@
+"""Tests of migrate_outputs against the in-memory MockSupabaseClient."""
+import pytest
+
+import migrate_outputs
+import supabase_client as sc
+from mock_services import MockSupabaseClient
+from output_codec import ENCODING_KEY
+
+REPORT = {"startup_idea": "Dog walking app", "opportunity_score": 7.5, "summary": "x" * 4000}
+
+
+@pytest.fixture
+def db(monkeypatch):
+    client = MockSupabaseClient()
+    monkeypatch.setattr(sc, "supabase_client", client)
+    return client
+
+
+def _stored(db, session_id):
+    return next(row for row in db.tables["agent_outputs"] if row["session_id"] == session_id)
+
+
+def test_rows_are_reencoded_and_read_back_unchanged(db):
+    sc.upsert_agent_outputs([{"user_id": "u1", "session_id": "s1", sc.MARKET_ANALYST_COLUMN: REPORT}], "json")
+
+    summary = migrate_outputs.migrate_outputs("gzip")
+
+    assert (summary["migrated"], summary["skipped"]) == (1, 0)
+    assert _stored(db, "s1")[sc.MARKET_ANALYST_COLUMN][ENCODING_KEY] == "gzip"
+    assert sc.decode_row(_stored(db, "s1"))[sc.MARKET_ANALYST_COLUMN] == REPORT
+    assert migrate_outputs.migrate_outputs("gzip")["skipped"] == 1
+
+
+def test_columns_written_during_the_migration_are_kept(db, monkeypatch):
+    sc.upsert_agent_outputs([{"user_id": "u1", "session_id": "s1", sc.MARKET_ANALYST_COLUMN: REPORT}], "json")
+    blueprint = {"tech_stack": ["FastAPI"], "notes": "y" * 4000}
+    upsert = migrate_outputs.upsert_agent_outputs
+
+    def upsert_after_server_write(rows, encoding):
+        # The server finishes the session's blueprint between the migration's read and write
+        sc.upsert_agent_outputs([{"user_id": "u1", "session_id": "s1", sc.TECH_ARCHITECT_COLUMN: blueprint}], "json")
+        upsert(rows, encoding)
+
+    monkeypatch.setattr(migrate_outputs, "upsert_agent_outputs", upsert_after_server_write)
+    migrate_outputs.migrate_outputs("gzip")
+
+    row = sc.decode_row(_stored(db, "s1"))
+    assert row[sc.MARKET_ANALYST_COLUMN] == REPORT
+    assert row[sc.TECH_ARCHITECT_COLUMN] == blueprint
+
+
+def test_dry_run_writes_nothing(db):
+    sc.upsert_agent_outputs([{"user_id": "u1", "session_id": "s1", sc.MARKET_ANALYST_COLUMN: REPORT}], "json")
+
+    summary = migrate_outputs.migrate_outputs("gzip", dry_run=True)
+
+    assert summary["migrated"] == 1
+    assert summary["bytes_after"] < summary["bytes_before"]
+    assert ENCODING_KEY not in _stored(db, "s1")[sc.MARKET_ANALYST_COLUMN]
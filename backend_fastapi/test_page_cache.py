@@ -0,0 +1,94 @@
+"""Tests of scraped page caching and revalidation against a local http.server."""
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# Keep the scraper's persistent caches out of the working tree; tests install their own
+for setting in ("SEARCH_CACHE_ENABLED", "PAGE_CACHE_ENABLED", "IDEA_INDEX_ENABLED"):
+    os.environ.setdefault(setting, "false")
+
+import market_agent
+from disk_cache import MemoryCache
+from http_client import HTTPClient, set_http_client
+from llm_client import set_llm_client
+from mock_services import MockLLMClient
+
+ETAG = '"v1"'
+
+
+class _PageHandler(BaseHTTPRequestHandler):
+    """Serves `server.pages[path]` with an ETag, answering a matching If-None-Match with 304."""
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.conditional.append(self.headers.get("If-None-Match"))
+        if self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.send_header("ETag", ETAG)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = self.server.pages[self.path].encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("ETag", ETAG)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _page(paragraphs):
+    return "<html><head><title>Acme</title></head><body>" + "".join(
+        f"<p>Paragraph {number} about the product.</p>" for number in range(paragraphs)) + "</body></html>"
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _PageHandler)
+    httpd.daemon_threads = True
+    httpd.pages = {"/small": _page(3), "/large": _page(2000)}
+    httpd.conditional = []
+    httpd.url = f"http://127.0.0.1:{httpd.server_port}"
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    """A market agent scraping over a real HTTPClient, with a page cache whose entries go stale at once"""
+    monkeypatch.setattr(market_agent, "page_cache", MemoryCache(ttl=0.01, max_entries=10))
+    monkeypatch.setattr(market_agent, "SCRAPER_MAX_BYTES", 4096)
+    set_http_client(HTTPClient(max_retries=0))
+    set_llm_client(MockLLMClient())
+    yield market_agent.EnhancedMarketResearchAgent()
+    set_http_client(None)
+    set_llm_client(None)
+
+
+def test_complete_page_is_revalidated_with_its_etag(server, agent):
+    first = agent.enhanced_scrape_website(f"{server.url}/small")
+    time.sleep(0.02)
+    second = agent.enhanced_scrape_website(f"{server.url}/small")
+
+    assert server.conditional == [None, ETAG]
+    assert second == first
+    assert market_agent.page_cache.stats()["revalidations"] == 1
+
+
+def test_truncated_page_is_fetched_again_instead_of_revalidated(server, agent):
+    first = agent.enhanced_scrape_website(f"{server.url}/large")
+    assert market_agent.page_cache.get_entry(f"{server.url}/large")["value"]["etag"] is None
+    time.sleep(0.02)
+    agent.enhanced_scrape_website(f"{server.url}/large")
+
+    assert first['content_length'] > 0
+    assert server.conditional == [None, None]
+    assert market_agent.page_cache.stats()["revalidations"] == 0
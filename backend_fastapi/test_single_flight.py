@@ -0,0 +1,118 @@
+"""Tests of SingleFlight: one run per key, shared results, errors and callbacks."""
+import threading
+import time
+
+import pytest
+
+from single_flight import SingleFlight
+
+
+def _wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def _start(target):
+    thread = threading.Thread(target=target)
+    thread.start()
+    return thread
+
+
+def test_concurrent_identical_calls_run_once():
+    flight = SingleFlight()
+    release = threading.Event()
+    runs = []
+
+    def func(progress_callback):
+        runs.append(1)
+        release.wait()
+        return "report"
+
+    results = []
+    threads = [_start(lambda: results.append(flight.run("key", func, progress_callback=None)))
+               for _ in range(5)]
+    _wait_until(lambda: flight.stats()["coalesced"] == 4)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert runs == [1]
+    assert results == ["report"] * 5
+    assert flight.stats() == {"leaders": 1, "coalesced": 4, "in_flight": 0}
+
+
+def test_every_joiner_receives_the_exception():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def func(progress_callback):
+        release.wait()
+        raise RuntimeError("no search quota")
+
+    errors = []
+
+    def call():
+        with pytest.raises(RuntimeError) as error:
+            flight.run("key", func, progress_callback=None)
+        errors.append(str(error.value))
+
+    threads = [_start(call) for _ in range(3)]
+    _wait_until(lambda: flight.stats()["coalesced"] == 2)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert errors == ["no search quota"] * 3
+    # The key is released, so the next call runs afresh
+    assert flight.run("key", lambda progress_callback: "retried", progress_callback=None) == "retried"
+
+
+def test_late_joiner_receives_earlier_and_later_callbacks():
+    flight = SingleFlight()
+    halfway, release = threading.Event(), threading.Event()
+    leader_events, joiner_events = [], []
+
+    def func(progress_callback):
+        progress_callback("search", "Completed 5 searches")
+        halfway.set()
+        release.wait()
+        progress_callback("ai_analysis", "Generated report")
+        return "report"
+
+    leader = _start(lambda: flight.run("key", func, progress_callback=lambda *args: leader_events.append(args)))
+    halfway.wait()
+    joiner = _start(lambda: flight.run("key", func, progress_callback=lambda *args: joiner_events.append(args)))
+    _wait_until(lambda: len(joiner_events) == 1)
+    release.set()
+    leader.join()
+    joiner.join()
+
+    expected = [("search", "Completed 5 searches"), ("ai_analysis", "Generated report")]
+    assert leader_events == expected
+    assert joiner_events == expected
+
+
+def test_failing_joiner_callback_does_not_break_the_run():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def func(progress_callback):
+        release.wait()
+        progress_callback("search", "done")
+        return "report"
+
+    def broken(*args):
+        raise ConnectionError("client went away")
+
+    results = []
+    leader = _start(lambda: results.append(flight.run("key", func, progress_callback=None)))
+    _wait_until(lambda: flight.stats()["in_flight"] == 1)
+    joiner = _start(lambda: results.append(flight.run("key", func, progress_callback=broken)))
+    _wait_until(lambda: flight.stats()["coalesced"] == 1)
+    release.set()
+    leader.join()
+    joiner.join()
+
+    assert results == ["report", "report"]
@@ -16,6 +16,6 @@ export async function generateSessionId() {
   
   return {
     userId,
-    sessionId: `session_${Date.now()}`
+    sessionId: `session_${crypto.randomUUID()}`
   };
 }
@@ -6,24 +6,38 @@ import { useRouter } from 'next/navigation';
 import { Search, Sparkles, Rocket, ChevronRight, RefreshCw } from 'lucide-react';
 import { getApiErrorMessage } from '../utils/apiUtils';
 
+// One history entry; the full outputs are loaded on the details page
 interface AgentOutput {
-  id: string;
-  user_id: string;
   session_id: string;
-  market_analyst_response: any;
-  product_manager_response: any;
-  tech_architect_response: any;
   created_at: string;
+  startup_idea: string | null;
+  opportunity_score: number | null;
 }
 
 export default function MainDashboard({ userId }: { userId: string }) {
   const [outputs, setOutputs] = useState<AgentOutput[]>([]);
   const [filteredOutputs, setFilteredOutputs] = useState<AgentOutput[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const [searchTerm, setSearchTerm] = useState('');
   const router = useRouter();
 
+  const fetchPage = async (cursor: string | null) => {
+    const params = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+    const response = await fetch(`${process.env.NEXT_PUBLIC_API_URL}/outputs/user/${userId}${params}`, {
+      // Adding a timeout to avoid long waiting periods
+      signal: AbortSignal.timeout(10000) // 10 seconds timeout
+    });
+    
+    if (!response.ok) {
+      throw new Error(`API error: ${response.statusText}`);
+    }
+    
+    return response.json();
+  };
+
   useEffect(() => {
     const fetchOutputs = async () => {
       try {
@@ -37,19 +51,11 @@ export default function MainDashboard({ userId }: { userId: string }) {
           throw new Error('API URL is not defined. Make sure the NEXT_PUBLIC_API_URL environment variable is set.');
         }
         
-        const response = await fetch(`${process.env.NEXT_PUBLIC_API_URL}/outputs/user/${userId}`, {
-          // Adding a timeout to avoid long waiting periods
-          signal: AbortSignal.timeout(10000) // 10 seconds timeout
-        });
-        
-        if (!response.ok) {
-          throw new Error(`API error: ${response.statusText}`);
-        }
-        
-        const data = await response.json();
+        const data = await fetchPage(null);
         const outputsData = data.outputs || [];
         setOutputs(outputsData);
         setFilteredOutputs(outputsData);
+        setNextCursor(data.next_cursor || null);
       } catch (err) {
         // Use our utility function to get a formatted error message
         setError(getApiErrorMessage(err));
@@ -62,12 +68,28 @@ export default function MainDashboard({ userId }: { userId: string }) {
     fetchOutputs();
   }, [userId]);
 
+  // Search filters the pages loaded so far; Load More brings in older projects
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    try {
+      setLoadingMore(true);
+      const data = await fetchPage(nextCursor);
+      setOutputs((previous) => [...previous, ...(data.outputs || [])]);
+      setNextCursor(data.next_cursor || null);
+    } catch (err) {
+      setError(getApiErrorMessage(err));
+      console.error('Error fetching outputs:', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     if (searchTerm.trim() === '') {
       setFilteredOutputs(outputs);
     } else {
       const filtered = outputs.filter(output => 
-        (output.market_analyst_response?.startup_idea || '').toLowerCase().includes(searchTerm.toLowerCase())
+        (output.startup_idea || '').toLowerCase().includes(searchTerm.toLowerCase())
       );
       setFilteredOutputs(filtered);
     }
@@ -90,13 +112,8 @@ export default function MainDashboard({ userId }: { userId: string }) {
     return new Date(dateString).toLocaleString();
   };
 
-  const truncateDescription = (text: string, length = 120) => {
-    if (!text) return 'No description available';
-    return text.length > length ? text.substring(0, length) + '...' : text;
-  };
-
   const getMarketScore = (output: AgentOutput) => {
-    return output.market_analyst_response?.opportunity_score || 'N/A';
+    return output.opportunity_score || 'N/A';
   };
 
   return (
@@ -215,11 +232,11 @@ export default function MainDashboard({ userId }: { userId: string }) {
                 </div>
                 
                 <h3 className="text-xl font-semibold text-white mb-2 line-clamp-2 group-hover:text-pink-300 transition-colors duration-300">
-                  {output.market_analyst_response?.startup_idea || 'Unnamed Project'}
+                  {output.startup_idea || 'Unnamed Project'}
                 </h3>
                 
                 <p className="text-gray-400 text-sm line-clamp-3 mb-5">
-                  {truncateDescription(output.market_analyst_response?.description || 'No description available')}
+                  No description available
                 </p>
                 
                 <div className="flex justify-end">
@@ -239,6 +256,18 @@ export default function MainDashboard({ userId }: { userId: string }) {
           ))}
         </div>
       )}
+
+      {!loading && !error && nextCursor && (
+        <div className="flex justify-center pt-10">
+          <button
+            onClick={loadMore}
+            disabled={loadingMore}
+            className="inline-flex items-center px-6 py-3 border border-pink-500/40 rounded-lg text-pink-300 font-medium hover:bg-pink-500/10 hover:border-pink-400/60 transition-all duration-200 disabled:opacity-50"
+          >
+            {loadingMore ? 'Loading...' : searchTerm.trim() ? 'Search older projects' : 'Load More'}
+          </button>
+        </div>
+      )}
     </div>
   );
 }
@@ -4,34 +4,40 @@ import { useState, useEffect } from 'react';
 import Link from 'next/link';
 import { useRouter } from 'next/navigation';
 
-interface AgentOutput {
-  id: string;
-  user_id: string;
+// One history entry; the full outputs are loaded on the details page
+interface AgentOutputSummary {
   session_id: string;
-  market_analyst_response: any;
-  product_manager_response: any;
-  tech_architect_response: any;
   created_at: string;
+  startup_idea: string | null;
+  opportunity_score: number | null;
 }
 
 export default function HistoryComponent({ userId }: { userId: string }) {
-  const [outputs, setOutputs] = useState<AgentOutput[]>([]);
+  const [outputs, setOutputs] = useState<AgentOutputSummary[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const router = useRouter();
 
+  const fetchPage = async (cursor: string | null) => {
+    const params = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+    const response = await fetch(`${process.env.NEXT_PUBLIC_API_URL}/outputs/user/${userId}${params}`);
+    
+    if (!response.ok) {
+      throw new Error(`API error: ${response.statusText}`);
+    }
+    
+    return response.json();
+  };
+
   useEffect(() => {
     const fetchOutputs = async () => {
       try {
         setLoading(true);
-        const response = await fetch(`${process.env.NEXT_PUBLIC_API_URL}/outputs/user/${userId}`);
-        
-        if (!response.ok) {
-          throw new Error(`API error: ${response.statusText}`);
-        }
-        
-        const data = await response.json();
+        const data = await fetchPage(null);
         setOutputs(data.outputs || []);
+        setNextCursor(data.next_cursor || null);
       } catch (err) {
         setError(err instanceof Error ? err.message : 'An error occurred');
         console.error('Error fetching outputs:', err);
@@ -43,6 +49,21 @@ export default function HistoryComponent({ userId }: { userId: string }) {
     fetchOutputs();
   }, [userId]);
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    try {
+      setLoadingMore(true);
+      const data = await fetchPage(nextCursor);
+      setOutputs((previous) => [...previous, ...(data.outputs || [])]);
+      setNextCursor(data.next_cursor || null);
+    } catch (err) {
+      setError(err instanceof Error ? err.message : 'An error occurred');
+      console.error('Error fetching outputs:', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const viewDetails = (sessionId: string) => {
     router.push(`/dashboard/history/${sessionId}`);
   };
@@ -91,11 +112,11 @@ export default function HistoryComponent({ userId }: { userId: string }) {
                     {formatDate(output.created_at)}
                   </td>
                   <td className="px-6 py-4 text-sm text-gray-900">
-                    {output.market_analyst_response?.startup_idea || 'Unnamed Project'}
+                    {output.startup_idea || 'Unnamed Project'}
                   </td>
                   <td className="px-6 py-4 whitespace-nowrap text-sm">
                     <span className="px-2 inline-flex text-xs leading-5 font-semibold rounded-full bg-green-100 text-green-800">
-                      {output.market_analyst_response?.opportunity_score || 'N/A'}/10
+                      {output.opportunity_score || 'N/A'}/10
                     </span>
                   </td>
                   <td className="px-6 py-4 whitespace-nowrap text-sm text-center">
@@ -110,6 +131,17 @@ export default function HistoryComponent({ userId }: { userId: string }) {
               ))}
             </tbody>
           </table>
+          {nextCursor && (
+            <div className="flex justify-center py-4 border-t">
+              <button
+                onClick={loadMore}
+                disabled={loadingMore}
+                className="px-4 py-2 text-sm font-medium text-indigo-600 hover:text-indigo-900 disabled:opacity-50"
+              >
+                {loadingMore ? 'Loading...' : 'Load More'}
+              </button>
+            </div>
+          )}
         </div>
       )}
     </div>
@@ -223,19 +223,43 @@ export async function runTechArchitectAgent(productRoadmap: ProductManagerRespon
   return await response.json() as TechArchitectResponse;
 }
 
+export type PipelineResponse = {
+  market_analysis: MarketAnalystResponse;
+  product_roadmap: Omit<ProductManagerResponse, '_market_analyst_data'>;
+  technical_blueprint: TechArchitectResponse;
+  user_id: string;
+  session_id: string;
+};
+
 export async function runFullAgentChain(startupIdea: string) {
-  // Step 1: Run market analysis
-  const marketAnalysis = await runMarketAnalysisAgent(startupIdea);
+  // Get authentication info and session ID using the server action
+  const { userId, sessionId } = await generateSessionId();
+  
+  // Run all three agents server-side in one request; intermediate reports stay on the server
+  const response = await fetch(`${process.env.NEXT_PUBLIC_API_URL}/pipeline`, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+    },
+    body: JSON.stringify({
+      startup_idea: startupIdea,
+      user_id: userId,
+      session_id: sessionId,
+    }),
+  });
   
-  // Step 2: Run product manager
-  const productRoadmap = await runProductManagerAgent(marketAnalysis);
+  if (!response.ok) {
+    throw new Error(`API error: ${response.statusText}`);
+  }
   
-  // Step 3: Run technical architect
-  const techBlueprint = await runTechArchitectAgent(productRoadmap);
+  const pipeline = await response.json() as PipelineResponse;
   
   return {
-    marketAnalysis,
-    productRoadmap,
-    techBlueprint,
+    marketAnalysis: pipeline.market_analysis,
+    productRoadmap: {
+      ...pipeline.product_roadmap,
+      _market_analyst_data: pipeline.market_analysis
+    } as ProductManagerResponse,
+    techBlueprint: pipeline.technical_blueprint,
   };
 }
@@ -13,12 +13,8 @@ export async function fetchMVPDetails(sessionId: string) {
   }
   
   try {
-    const response = await fetch(`${process.env.NEXT_PUBLIC_API_URL}/outputs/session`, {
-      method: 'POST',
-      headers: {
-        'Content-Type': 'application/json',
-      },
-      body: JSON.stringify({ session_id: sessionId }),
+    // GET so the browser cache revalidates with the ETag and unchanged sessions come back as 304
+    const response = await fetch(`${process.env.NEXT_PUBLIC_API_URL}/outputs/session/${encodeURIComponent(sessionId)}`, {
       signal: AbortSignal.timeout(10000) // 10 seconds timeout
     });
     